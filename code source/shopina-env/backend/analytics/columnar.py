@@ -0,0 +1,202 @@
+"""
+Append-only column files read through ``numpy.memmap``.
+
+A table is a directory holding one raw little-endian file per column and a
+``meta.json`` with the column dtypes, the committed row count and the ID
+watermark of the last export. Appends write the column bytes first and
+commit by atomically replacing ``meta.json``, so readers (which only map
+``rows`` entries) never see a partially written batch.
+"""
+import json
+import os
+import shutil
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+META_FILE = 'meta.json'
+
+
+class ColumnTable:
+    """
+    One table of fixed-width columns.
+
+    Args:
+        path: Table directory
+        schema: Column name -> NumPy dtype, used when the table is created
+    """
+
+    def __init__(self, path: str, schema: Dict[str, str]):
+        self.path = str(path)
+        self.schema = {name: np.dtype(dtype).newbyteorder('<') for name, dtype in schema.items()}
+        self._meta = self._load_meta()
+
+    # ------------------------------------------------------------------
+    # Metadata
+    # ------------------------------------------------------------------
+    def _empty_meta(self) -> dict:
+        return {'rows': 0, 'watermark': 0, 'columns': {n: d.str for n, d in self.schema.items()}}
+
+    def _load_meta(self) -> dict:
+        try:
+            with open(os.path.join(self.path, META_FILE), encoding='utf-8') as fh:
+                meta = json.load(fh)
+        except FileNotFoundError:
+            return self._empty_meta()
+        if meta['columns'] != {n: d.str for n, d in self.schema.items()}:
+            raise ValueError(f'{self.path} was written with a different schema; rebuild it')
+        return meta
+
+    def _commit_meta(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp = os.path.join(self.path, f'{META_FILE}.tmp')
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(self._meta, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+
+    def refresh(self) -> None:
+        """Re-read the committed row count (after another process appended)."""
+        self._meta = self._load_meta()
+
+    @property
+    def rows(self) -> int:
+        return self._meta['rows']
+
+    @property
+    def watermark(self) -> int:
+        """Highest source ID already exported."""
+        return self._meta['watermark']
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def append(self, columns: Dict[str, np.ndarray], watermark: int) -> int:
+        """
+        Append rows and commit them with a new watermark.
+
+        Args:
+            columns: One equally long array per schema column
+            watermark: Highest source ID contained in the batch
+
+        Returns:
+            Number of rows appended
+        """
+        lengths = {len(columns[name]) for name in self.schema}
+        if len(lengths) != 1:
+            raise ValueError('All columns of a batch must have the same length')
+        count = lengths.pop()
+
+        os.makedirs(self.path, exist_ok=True)
+        for name, dtype in self.schema.items():
+            filename = self._column_file(name)
+            # Bytes past the committed row count belong to an interrupted append
+            with open(filename, 'ab') as fh:
+                fh.truncate(self.rows * dtype.itemsize)
+                fh.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        self._meta['rows'] += count
+        self._meta['watermark'] = max(self._meta['watermark'], int(watermark))
+        self._commit_meta()
+        return count
+
+    def patch(self, name: str, positions: np.ndarray, values: np.ndarray) -> None:
+        """
+        Overwrite values of one column in place.
+
+        Args:
+            name: Column name
+            positions: Row positions
+            values: New values, aligned with ``positions``
+        """
+        if len(positions) == 0:
+            return
+        column = np.memmap(self._column_file(name), dtype=self.schema[name], mode='r+', shape=(self.rows,))
+        column[positions] = values
+        column.flush()
+        del column
+
+    def drop(self) -> None:
+        """Delete every column file and reset the table."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        self._meta = self._empty_meta()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def _column_file(self, name: str) -> str:
+        return os.path.join(self.path, f'{name}.bin')
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Map one column read-only.
+
+        Args:
+            name: Column name
+
+        Returns:
+            Array of the committed rows (backed by the file, not loaded)
+        """
+        dtype = self.schema[name]
+        if self.rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._column_file(name), dtype=dtype, mode='r', shape=(self.rows,))
+
+    def columns(self, names: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """Map several columns (all by default)."""
+        return {name: self.column(name) for name in (names or self.schema)}
+
+
+# Keys below this bound are summed with a direct bincount instead of sorting them
+DENSE_KEY_LIMIT = 1 << 24
+
+
+def _grouped(keys: np.ndarray, values: Optional[np.ndarray]):
+    """Distinct keys and the sum of ``values`` (or row count) for each."""
+    low, high = int(keys.min()), int(keys.max())
+    if low >= 0 and high < DENSE_KEY_LIMIT:
+        # IDs and day numbers are small non-negative integers: no sort needed
+        sums = np.bincount(keys, weights=values, minlength=high + 1)
+        present = np.flatnonzero(np.bincount(keys, minlength=high + 1)) if values is not None else np.flatnonzero(sums)
+        return present, sums[present]
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=values, minlength=len(unique))
+
+
+def group_sum(keys: np.ndarray, values: Optional[np.ndarray] = None) -> Dict[int, float]:
+    """
+    Sum values per distinct key (counts rows when ``values`` is None).
+
+    Args:
+        keys: Integer group keys
+        values: Values to add up, aligned with ``keys``
+
+    Returns:
+        Dictionary of key -> sum
+    """
+    if len(keys) == 0:
+        return {}
+    unique, sums = _grouped(keys, values)
+    return dict(zip(unique.tolist(), sums.tolist()))
+
+
+def top_k(keys: np.ndarray, values: np.ndarray, k: int) -> list:
+    """
+    Keys with the largest summed values.
+
+    Args:
+        keys: Integer group keys
+        values: Values to add up, aligned with ``keys``
+        k: Number of groups to return
+
+    Returns:
+        List of ``(key, sum)`` tuples, largest first
+    """
+    if len(keys) == 0 or k <= 0:
+        return []
+    unique, sums = _grouped(keys, values)
+    k = min(k, len(unique))
+    best = np.argpartition(-sums, k - 1)[:k]
+    best = best[np.argsort(-sums[best], kind='stable')]
+    return list(zip(unique[best].tolist(), sums[best].tolist()))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('users', '0006_user_user_role_joined_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSegment',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='customer_segment', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('recency_days', models.PositiveIntegerField()),
+                ('frequency', models.PositiveIntegerField()),
+                ('monetary', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('r_score', models.PositiveSmallIntegerField()),
+                ('f_score', models.PositiveSmallIntegerField()),
+                ('m_score', models.PositiveSmallIntegerField()),
+                ('segment', models.CharField(choices=[('champions', 'Champions'), ('loyal', 'Loyal customers'), ('potential_loyalist', 'Potential loyalists'), ('new', 'New customers'), ('promising', 'Promising'), ('need_attention', 'Need attention'), ('about_to_sleep', 'About to sleep'), ('at_risk', 'At risk'), ('cant_lose', "Can't lose them"), ('hibernating', 'Hibernating')], max_length=20)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['segment'], name='segment_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+"""Analytics models: batch-computed customer insights."""
+from django.conf import settings
+from django.db import models
+
+
+class CustomerSegment(models.Model):
+    """
+    Recency / frequency / monetary scores and segment of one customer.
+
+    Rebuilt wholesale by ``manage.py compute_rfm``; customers without a
+    paid order have no row.
+    """
+
+    SEGMENT_CHOICES = [
+        ('champions', 'Champions'),
+        ('loyal', 'Loyal customers'),
+        ('potential_loyalist', 'Potential loyalists'),
+        ('new', 'New customers'),
+        ('promising', 'Promising'),
+        ('need_attention', 'Need attention'),
+        ('about_to_sleep', 'About to sleep'),
+        ('at_risk', 'At risk'),
+        ('cant_lose', "Can't lose them"),
+        ('hibernating', 'Hibernating'),
+    ]
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='customer_segment'
+    )
+    recency_days = models.PositiveIntegerField()
+    frequency = models.PositiveIntegerField()
+    monetary = models.DecimalField(max_digits=12, decimal_places=2)
+    r_score = models.PositiveSmallIntegerField()
+    f_score = models.PositiveSmallIntegerField()
+    m_score = models.PositiveSmallIntegerField()
+    segment = models.CharField(max_length=20, choices=SEGMENT_CHOICES)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['segment'], name='segment_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.segment} (R{self.r_score}F{self.f_score}M{self.m_score})"
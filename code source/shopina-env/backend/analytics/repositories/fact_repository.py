@@ -0,0 +1,76 @@
+"""
+Order fact repository: streams order rows for the columnar snapshot.
+"""
+from datetime import datetime
+from typing import Iterator, List, Sequence
+
+from core.repositories.base import BaseRepository
+from orders.models import Order, OrderItem
+
+
+ORDER_FACT_FIELDS = ('id', 'user_id', 'status', 'total', 'created_at')
+ITEM_FACT_FIELDS = (
+    'id', 'order_id', 'order__user_id', 'product_id', 'quantity', 'price', 'order__status', 'order__created_at',
+)
+
+
+class OrderFactRepository(BaseRepository[Order]):
+    """
+    Repository reading orders and order items past an ID watermark.
+    """
+
+    def __init__(self):
+        super().__init__(Order)
+
+    def _iter_after(self, queryset, fields: Sequence[str], after_id: int, chunk_size: int) -> Iterator[List[tuple]]:
+        # Keyset chunks on the primary key: each one is a short, index-driven read
+        while True:
+            chunk = list(queryset.filter(id__gt=after_id).order_by('id').values_list(*fields)[:chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            after_id = chunk[-1][0]
+
+    def iter_orders(self, after_id: int = 0, chunk_size: int = 50000) -> Iterator[List[tuple]]:
+        """
+        Stream orders with an ID above the watermark, in ID order.
+
+        Args:
+            after_id: Last exported order ID
+            chunk_size: Rows per chunk
+
+        Yields:
+            Lists of ``(id, user_id, status, total, created_at)`` tuples
+        """
+        return self._iter_after(self.model.objects.all(), ORDER_FACT_FIELDS, after_id, chunk_size)
+
+    def iter_items(self, after_id: int = 0, chunk_size: int = 50000) -> Iterator[List[tuple]]:
+        """
+        Stream order items with an ID above the watermark, with their order's columns.
+
+        Args:
+            after_id: Last exported order item ID
+            chunk_size: Rows per chunk
+
+        Yields:
+            Lists of ``(id, order_id, user_id, product_id, quantity, price,
+            status, created_at)`` tuples
+        """
+        return self._iter_after(OrderItem.objects.all(), ITEM_FACT_FIELDS, after_id, chunk_size)
+
+    def get_statuses_since(self, since: datetime, max_id: int) -> List[tuple]:
+        """
+        Get the current status of recent, already exported orders.
+
+        Args:
+            since: Oldest creation time to re-read
+            max_id: Export watermark (newer orders are appended, not patched)
+
+        Returns:
+            List of ``(id, status)`` tuples in ID order
+        """
+        return list(
+            self.model.objects.filter(created_at__gte=since, id__lte=max_id)
+            .order_by('id')
+            .values_list('id', 'status')
+        )
@@ -0,0 +1,75 @@
+"""
+Customer segment repository for data access operations.
+"""
+from typing import Dict, Iterator, List, Sequence
+
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+
+from analytics.models import CustomerSegment
+from core.repositories.base import BaseRepository
+from orders.models import Order
+
+
+class CustomerSegmentRepository(BaseRepository[CustomerSegment]):
+    """
+    Repository for CustomerSegment model data access.
+    """
+
+    def __init__(self):
+        super().__init__(CustomerSegment)
+
+    def iter_order_aggregates(self, statuses: Sequence[str], chunk_size: int = 50000) -> Iterator[List[tuple]]:
+        """
+        Stream per-customer order aggregates in chunks.
+
+        The grouping runs in the database; Python only sees one
+        ``(user_id, last_order_at, order_count, total_spent)`` tuple per customer.
+
+        Args:
+            statuses: Order statuses that count as purchases
+            chunk_size: Rows per yielded chunk
+
+        Yields:
+            Lists of tuples, at most ``chunk_size`` long
+        """
+        rows = (
+            Order.objects.filter(status__in=statuses)
+            .values('user_id')
+            .annotate(last_order_at=Max('created_at'), order_count=Count('id'), total_spent=Sum('total'))
+            .order_by('user_id')
+            .values_list('user_id', 'last_order_at', 'order_count', 'total_spent')
+        )
+        chunk = []
+        for row in rows.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def replace_all(self, segments: List[CustomerSegment], batch_size: int = 2000) -> int:
+        """
+        Atomically replace every stored segment.
+
+        Args:
+            segments: New segment rows
+            batch_size: Rows per INSERT
+
+        Returns:
+            Number of rows stored
+        """
+        with transaction.atomic():
+            self.model.objects.all().delete()
+            self.bulk_create(segments, batch_size=batch_size)
+        return len(segments)
+
+    def get_segment_counts(self) -> Dict[str, int]:
+        """
+        Count customers per segment.
+
+        Returns:
+            Dictionary of segment -> customer count
+        """
+        return dict(self.model.objects.values_list('segment').annotate(count=Count('pk')).order_by())
@@ -0,0 +1,376 @@
+"""
+Columnar order-facts snapshot and the analytics queries served from it.
+
+``export`` copies new orders and order items (past the ID watermark of each
+table) into memory-mapped column files; statuses of recent orders are
+re-read and patched in place since they change after creation. Queries
+then filter and aggregate whole columns with NumPy without touching the
+transactional database.
+"""
+import os
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from analytics.columnar import ColumnTable, group_sum, top_k
+from analytics.repositories.fact_repository import OrderFactRepository
+from core.services.base import BaseService
+from orders.models import Order
+
+
+DEFAULTS = {
+    'PATH': 'order_facts',
+    'CHUNK_SIZE': 50000,
+    # Orders created this recently get their status re-read on every export
+    'STATUS_REFRESH_DAYS': 30,
+}
+
+STATUSES = [code for code, _ in Order.STATUS_CHOICES]
+PURCHASE_STATUSES = ['processing', 'completed']
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+ORDER_SCHEMA = {
+    'order_id': 'i8',
+    'user_id': 'i8',
+    'status': 'i1',
+    'total_cents': 'i8',
+    'created_at': 'i8',  # Unix seconds
+    'day': 'i4',  # local date, days since 1970-01-01
+}
+
+ITEM_SCHEMA = {
+    'item_id': 'i8',
+    'order_id': 'i8',
+    'user_id': 'i8',
+    'product_id': 'i8',  # -1 once the product is deleted
+    'quantity': 'i4',
+    'price_cents': 'i8',
+    'status': 'i1',
+    'created_at': 'i8',
+    'day': 'i4',
+}
+
+
+def get_order_facts_settings() -> dict:
+    """
+    Get the order-facts snapshot settings.
+
+    Returns:
+        Settings ``ORDER_FACTS`` merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'ORDER_FACTS', {})}
+
+
+def status_code(status: str) -> int:
+    """Column code of an order status (-1 when unknown)."""
+    return STATUSES.index(status) if status in STATUSES else -1
+
+
+def day_number(value: date) -> int:
+    """Column value of a local date."""
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def _cents(amount) -> int:
+    return int((amount or 0) * 100)
+
+
+def _times(datetimes: Sequence[datetime]):
+    created_at = np.fromiter((int(d.timestamp()) for d in datetimes), dtype=np.int64, count=len(datetimes))
+    days = np.fromiter((day_number(timezone.localtime(d).date()) for d in datetimes), dtype=np.int32, count=len(datetimes))
+    return created_at, days
+
+
+class FactQuery:
+    """
+    Filtered view of a fact table with group-by, sum and top-k.
+
+    Filters are combined with AND and evaluated lazily over whole columns.
+    """
+
+    def __init__(self, table: ColumnTable, derived: Optional[dict] = None, filters: Optional[list] = None):
+        self.table = table
+        self.derived = derived or {}
+        self.filters = filters or []
+        self._mask_cache = None
+
+    def where(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        **equals,
+    ) -> 'FactQuery':
+        """
+        Narrow the query.
+
+        Args:
+            statuses: Keep these order statuses
+            since: Keep rows on or after this local date
+            until: Keep rows on or before this local date
+            **equals: Column equality filters (e.g. ``user_id=3``)
+
+        Returns:
+            New FactQuery
+        """
+        filters = list(self.filters)
+        if statuses is not None:
+            # Lookup table indexed by status code; the extra last slot catches unknown (-1) codes
+            keep = np.zeros(len(STATUSES) + 1, dtype=bool)
+            keep[[status_code(s) for s in statuses]] = True
+            keep[-1] = False
+            filters.append(lambda t: keep[t.column('status')])
+        if since is not None:
+            filters.append(lambda t: t.column('day') >= day_number(since))
+        if until is not None:
+            filters.append(lambda t: t.column('day') <= day_number(until))
+        for name, value in equals.items():
+            filters.append(lambda t, name=name, value=value: t.column(name) == value)
+        return FactQuery(self.table, self.derived, filters)
+
+    def filter(self, condition: Callable[[ColumnTable], np.ndarray]) -> 'FactQuery':
+        """
+        Narrow the query with an arbitrary vectorized condition.
+
+        Args:
+            condition: Callable returning a boolean array over the whole table
+
+        Returns:
+            New FactQuery
+        """
+        return FactQuery(self.table, self.derived, self.filters + [condition])
+
+    def _mask(self) -> Optional[np.ndarray]:
+        if not self.filters:
+            return None
+        if self._mask_cache is None:
+            mask = np.ones(self.table.rows, dtype=bool)
+            for condition in self.filters:
+                mask &= condition(self.table)
+            self._mask_cache = mask
+        return self._mask_cache
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a (possibly derived) column restricted to the matching rows.
+        """
+        values = self.derived[name](self.table) if name in self.derived else self.table.column(name)
+        mask = self._mask()
+        return values if mask is None else values[mask]
+
+    def count(self) -> int:
+        mask = self._mask()
+        return self.table.rows if mask is None else int(np.count_nonzero(mask))
+
+    def sum(self, name: str) -> int:
+        return int(self.column(name).sum(dtype=np.int64))
+
+    def group_sum(self, key: str, value: Optional[str] = None) -> Dict[int, float]:
+        """Sum ``value`` (or count rows) per distinct ``key``."""
+        return group_sum(self.column(key), None if value is None else self.column(value))
+
+    def top_k(self, key: str, value: str, k: int = 10) -> list:
+        """The ``k`` keys with the largest summed ``value``."""
+        return top_k(self.column(key), self.column(value), k)
+
+
+class OrderFactsService(BaseService[Order]):
+    """
+    Service maintaining the columnar order-facts snapshot and querying it.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.fact_repository = OrderFactRepository()
+        super().__init__(self.fact_repository)
+        self.config = get_order_facts_settings()
+        root = str(path or self.config['PATH'])
+        self.orders = ColumnTable(os.path.join(root, 'orders'), ORDER_SCHEMA)
+        self.items = ColumnTable(os.path.join(root, 'items'), ITEM_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    def export(self, chunk_size: Optional[int] = None, rebuild: bool = False) -> Dict[str, int]:
+        """
+        Append new orders and items to the snapshot and refresh recent statuses.
+
+        Run it from a single process at a time (e.g. cron or ``export_order_facts --every``).
+
+        Args:
+            chunk_size: Rows read and appended per batch
+            rebuild: Drop the snapshot and export everything again
+
+        Returns:
+            Dictionary with appended orders, appended items and status updates
+        """
+        chunk_size = chunk_size or self.config['CHUNK_SIZE']
+        if rebuild:
+            self.orders.drop()
+            self.items.drop()
+
+        # Statuses first: only rows already in the snapshot can be stale
+        status_updates = self.refresh_statuses()
+        appended_orders = 0
+        for chunk in self.fact_repository.iter_orders(self.orders.watermark, chunk_size):
+            ids, user_ids, statuses, totals, created = zip(*chunk)
+            created_at, days = _times(created)
+            appended_orders += self.orders.append({
+                'order_id': np.array(ids, dtype=np.int64),
+                'user_id': np.array(user_ids, dtype=np.int64),
+                'status': np.array([status_code(s) for s in statuses], dtype=np.int8),
+                'total_cents': np.array([_cents(t) for t in totals], dtype=np.int64),
+                'created_at': created_at,
+                'day': days,
+            }, watermark=ids[-1])
+
+        appended_items = 0
+        for chunk in self.fact_repository.iter_items(self.items.watermark, chunk_size):
+            ids, order_ids, user_ids, product_ids, quantities, prices, statuses, created = zip(*chunk)
+            created_at, days = _times(created)
+            appended_items += self.items.append({
+                'item_id': np.array(ids, dtype=np.int64),
+                'order_id': np.array(order_ids, dtype=np.int64),
+                'user_id': np.array(user_ids, dtype=np.int64),
+                'product_id': np.array([-1 if p is None else p for p in product_ids], dtype=np.int64),
+                'quantity': np.array(quantities, dtype=np.int32),
+                'price_cents': np.array([_cents(p) for p in prices], dtype=np.int64),
+                'status': np.array([status_code(s) for s in statuses], dtype=np.int8),
+                'created_at': created_at,
+                'day': days,
+            }, watermark=ids[-1])
+
+        result = {'orders': appended_orders, 'items': appended_items, 'status_updates': status_updates}
+        self.log_operation('order_facts_exported', result)
+        return result
+
+    def refresh_statuses(self) -> int:
+        """
+        Patch the status of recently created orders (and their items) in place.
+
+        Returns:
+            Number of orders whose status changed
+        """
+        if self.orders.rows == 0:
+            return 0
+        since = timezone.now() - timedelta(days=self.config['STATUS_REFRESH_DAYS'])
+        current = self.fact_repository.get_statuses_since(since, self.orders.watermark)
+        if not current:
+            return 0
+
+        ids = np.array([row[0] for row in current], dtype=np.int64)
+        codes = np.array([status_code(row[1]) for row in current], dtype=np.int8)
+        order_ids = self.orders.column('order_id')
+        positions = np.minimum(np.searchsorted(order_ids, ids), len(order_ids) - 1)
+        found = order_ids[positions] == ids
+        changed = found & (self.orders.column('status')[positions] != codes)
+        if not changed.any():
+            return 0
+
+        changed_ids, changed_codes = ids[changed], codes[changed]
+        self.orders.patch('status', positions[changed], changed_codes)
+        if self.items.rows:
+            item_order_ids = self.items.column('order_id')
+            item_positions = np.flatnonzero(np.isin(item_order_ids, changed_ids))
+            lookup = np.searchsorted(changed_ids, item_order_ids[item_positions])
+            self.items.patch('status', item_positions, changed_codes[lookup])
+        return int(changed.sum())
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def order_facts(self) -> FactQuery:
+        """Query over order rows."""
+        self.orders.refresh()
+        return FactQuery(self.orders)
+
+    def item_facts(self) -> FactQuery:
+        """Query over order item rows (with a derived ``revenue_cents`` column)."""
+        self.items.refresh()
+        return FactQuery(self.items, derived={
+            'revenue_cents': lambda t: t.column('quantity').astype(np.int64) * t.column('price_cents'),
+        })
+
+    def get_order_statistics(self, now: Optional[datetime] = None) -> Dict[str, object]:
+        """
+        Same figures as ``OrderRepository.get_order_statistics``, from the snapshot.
+
+        Args:
+            now: Reference time for the 30-day window (defaults to now)
+
+        Returns:
+            Dictionary with statistics
+        """
+        now = now or timezone.now()
+        orders = self.order_facts()
+        recent = orders.column('created_at') >= int((now - timedelta(days=30)).timestamp())
+        by_status = orders.group_sum('status')
+        return {
+            'total_orders': orders.count(),
+            'total_revenue': orders.sum('total_cents') / 100,
+            'orders_by_status': {STATUSES[code]: int(count) for code, count in by_status.items() if code >= 0},
+            'recent_orders_30_days': int(np.count_nonzero(recent)),
+        }
+
+    def get_revenue_by_day(
+        self,
+        since: date,
+        until: Optional[date] = None,
+        user_id: Optional[int] = None,
+        statuses: Sequence[str] = PURCHASE_STATUSES,
+    ) -> Dict[date, float]:
+        """
+        Order revenue per local day.
+
+        Args:
+            since: First day
+            until: Last day (defaults to today)
+            user_id: Restrict to one buyer
+            statuses: Order statuses counted as revenue
+
+        Returns:
+            Dictionary of date -> revenue, days without orders omitted
+        """
+        until = until or timezone.localdate()
+        equals = {} if user_id is None else {'user_id': user_id}
+        orders = self.order_facts().where(statuses=statuses, since=since, until=until, **equals)
+        return {
+            date.fromordinal(day + EPOCH_ORDINAL): cents / 100
+            for day, cents in orders.group_sum('day', 'total_cents').items()
+        }
+
+    def get_top_products(
+        self,
+        limit: int = 10,
+        since: Optional[date] = None,
+        statuses: Sequence[str] = PURCHASE_STATUSES,
+    ) -> List[dict]:
+        """
+        Best-selling products by revenue.
+
+        Args:
+            limit: Number of products
+            since: First local day counted (all history by default)
+            statuses: Order statuses counted as sales
+
+        Returns:
+            List of dictionaries with product_id, quantity and revenue, best first
+        """
+        items = (
+            self.item_facts()
+            .where(statuses=statuses, since=since)
+            .filter(lambda t: t.column('product_id') >= 0)
+        )
+        ranked = items.top_k('product_id', 'revenue_cents', limit)
+        if not ranked:
+            return []
+        product_ids = items.column('product_id')
+        best = np.isin(product_ids, [product_id for product_id, _ in ranked])
+        quantities = group_sum(product_ids[best], items.column('quantity')[best])
+        return [
+            {'product_id': product_id, 'quantity': int(quantities[product_id]), 'revenue': cents / 100}
+            for product_id, cents in ranked
+        ]
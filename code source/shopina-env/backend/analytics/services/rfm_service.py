@@ -0,0 +1,146 @@
+"""
+RFM (recency, frequency, monetary) segmentation service.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional
+
+import numpy as np
+from django.utils import timezone
+
+from analytics.models import CustomerSegment
+from analytics.repositories.segment_repository import CustomerSegmentRepository
+from core.services.base import BaseService
+
+
+# Orders that count as purchases (same as the dashboard revenue figures)
+PURCHASE_STATUSES = ['processing', 'completed']
+
+SEGMENTS = [code for code, _ in CustomerSegment.SEGMENT_CHOICES]
+
+# Segment by recency score (rows, 1..5) and combined frequency/monetary score (columns, 1..5)
+_GRID_NAMES = [
+    ['hibernating', 'hibernating', 'at_risk', 'at_risk', 'cant_lose'],                             # R=1
+    ['hibernating', 'hibernating', 'at_risk', 'at_risk', 'cant_lose'],                             # R=2
+    ['about_to_sleep', 'about_to_sleep', 'need_attention', 'loyal', 'loyal'],                      # R=3
+    ['promising', 'potential_loyalist', 'potential_loyalist', 'loyal', 'champions'],               # R=4
+    ['new', 'potential_loyalist', 'potential_loyalist', 'champions', 'champions'],                 # R=5
+]
+SEGMENT_GRID = np.array([[SEGMENTS.index(name) for name in row] for row in _GRID_NAMES], dtype=np.int8)
+
+
+def quintile_scores(values: np.ndarray) -> np.ndarray:
+    """
+    Score values 1..5 by quintile, higher values scoring higher.
+
+    Ties get the same score: each distinct value is placed at the midpoint
+    of the ranks it occupies, so a mass of one-order customers does not get
+    split across scores arbitrarily.
+
+    Args:
+        values: 1-D array
+
+    Returns:
+        Array of int8 scores, same length as ``values``
+    """
+    if values.size == 0:
+        return np.empty(0, dtype=np.int8)
+    unique, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    midpoint = (np.cumsum(counts) - counts / 2) / values.size
+    scores = np.minimum((midpoint * 5).astype(np.int8) + 1, 5)
+    return scores[inverse]
+
+
+class RFMService(BaseService[CustomerSegment]):
+    """
+    Service computing customer segments from order history in one batch.
+    """
+
+    def __init__(self):
+        self.segment_repository = CustomerSegmentRepository()
+        super().__init__(self.segment_repository)
+
+    def load_arrays(self, as_of: datetime, chunk_size: int = 50000) -> Dict[str, np.ndarray]:
+        """
+        Load per-customer aggregates into compact column arrays, chunk by chunk.
+
+        Args:
+            as_of: Reference time for recency
+            chunk_size: Rows fetched per chunk
+
+        Returns:
+            Dictionary of user_id, recency_days, frequency and monetary arrays
+        """
+        as_of_ts = as_of.timestamp()
+        columns = {'user_id': [], 'recency_days': [], 'frequency': [], 'monetary': []}
+        for chunk in self.segment_repository.iter_order_aggregates(PURCHASE_STATUSES, chunk_size):
+            user_ids, last_orders, counts, totals = zip(*chunk)
+            last_ts = np.fromiter((d.timestamp() for d in last_orders), dtype=np.float64, count=len(chunk))
+            columns['user_id'].append(np.array(user_ids, dtype=np.int64))
+            columns['recency_days'].append(np.maximum((as_of_ts - last_ts) // 86400, 0).astype(np.int32))
+            columns['frequency'].append(np.array(counts, dtype=np.int32))
+            columns['monetary'].append(np.array([float(t or 0) for t in totals], dtype=np.float64))
+
+        empty = {'user_id': np.int64, 'recency_days': np.int32, 'frequency': np.int32, 'monetary': np.float64}
+        return {
+            name: np.concatenate(parts) if parts else np.empty(0, dtype=empty[name])
+            for name, parts in columns.items()
+        }
+
+    def score(self, arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Compute R, F, M scores and segment indexes, vectorized.
+
+        Args:
+            arrays: Output of :meth:`load_arrays`
+
+        Returns:
+            Dictionary with r, f, m score arrays and segment index array
+        """
+        # Recent is good: score the negated age
+        r = quintile_scores(-arrays['recency_days'])
+        f = quintile_scores(arrays['frequency'])
+        m = quintile_scores(arrays['monetary'])
+        # Halves round up (np.rint would send 2.5 to 2 but 3.5 to 4)
+        fm = np.floor((f.astype(np.float32) + m) / 2 + 0.5).astype(np.int8)
+        return {'r': r, 'f': f, 'm': m, 'segment': SEGMENT_GRID[r - 1, fm - 1]}
+
+    def compute_segments(self, as_of: Optional[datetime] = None, chunk_size: int = 50000) -> Dict[str, int]:
+        """
+        Recompute and store every customer's segment.
+
+        Args:
+            as_of: Reference time for recency (defaults to now)
+            chunk_size: Rows fetched per chunk
+
+        Returns:
+            Dictionary of segment -> customer count
+        """
+        as_of = as_of or timezone.now()
+        arrays = self.load_arrays(as_of, chunk_size)
+        scores = self.score(arrays)
+
+        rows = [
+            CustomerSegment(
+                user_id=int(user_id),
+                recency_days=int(recency),
+                frequency=int(frequency),
+                monetary=Decimal(f'{monetary:.2f}'),
+                r_score=int(r),
+                f_score=int(f),
+                m_score=int(m),
+                segment=SEGMENTS[segment],
+                computed_at=as_of,
+            )
+            for user_id, recency, frequency, monetary, r, f, m, segment in zip(
+                arrays['user_id'].tolist(), arrays['recency_days'].tolist(), arrays['frequency'].tolist(),
+                arrays['monetary'].tolist(), scores['r'].tolist(), scores['f'].tolist(), scores['m'].tolist(),
+                scores['segment'].tolist(),
+            )
+        ]
+        stored = self.segment_repository.replace_all(rows)
+
+        counts = dict(zip(*np.unique(scores['segment'], return_counts=True))) if stored else {}
+        result = {SEGMENTS[index]: int(count) for index, count in counts.items()}
+        self.log_operation('rfm_segments_computed', {'customers': stored, 'segments': result})
+        return result
@@ -0,0 +1,107 @@
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from analytics.models import CustomerSegment
+from analytics.services.order_facts_service import OrderFactsService
+from analytics.services.rfm_service import SEGMENT_GRID, RFMService, quintile_scores
+from orders.models import Order, OrderItem
+from orders.repositories.order_repository import OrderRepository
+from shop.models import Category, Product
+
+
+class QuintileScoreTests(TestCase):
+    def test_scores_spread_over_quintiles(self):
+        scores = quintile_scores(np.arange(10))
+        self.assertEqual(scores.tolist(), [1, 1, 2, 2, 3, 3, 4, 4, 5, 5])
+
+    def test_ties_share_a_score(self):
+        scores = quintile_scores(np.array([1, 1, 1, 1, 1, 1, 2, 3, 4, 5]))
+        self.assertEqual(len(set(scores[:6].tolist())), 1)
+        self.assertEqual(scores[-1], 5)
+
+
+class RFMScoreTests(TestCase):
+    def test_fm_halves_round_up(self):
+        scores = [np.array([3, 3]), np.array([2, 3]), np.array([3, 4])]  # r, f, m
+        with patch('analytics.services.rfm_service.quintile_scores', side_effect=scores):
+            result = RFMService().score(dict.fromkeys(('recency_days', 'frequency', 'monetary'), np.zeros(2)))
+        # (2 + 3) / 2 and (3 + 4) / 2 both round up, to 3 and 4
+        self.assertEqual(result['segment'].tolist(), SEGMENT_GRID[2, [2, 3]].tolist())
+
+
+class RFMServiceTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        now = timezone.now()
+        self.loyal = User.objects.create_user(username='loyal', email='loyal@example.com', password='pass')
+        self.lapsed = User.objects.create_user(username='lapsed', email='lapsed@example.com', password='pass')
+        self.browser = User.objects.create_user(username='browser', email='browser@example.com', password='pass')
+
+        for _ in range(5):
+            Order.objects.create(user=self.loyal, status='completed', total=200)
+        old = Order.objects.create(user=self.lapsed, status='completed', total=20)
+        Order.objects.filter(pk=old.pk).update(created_at=now - timedelta(days=400))
+        # Cancelled orders are not purchases
+        Order.objects.create(user=self.browser, status='cancelled', total=500)
+
+    def test_compute_segments_stores_one_row_per_buyer(self):
+        counts = RFMService().compute_segments()
+
+        self.assertEqual(sum(counts.values()), 2)
+        loyal = CustomerSegment.objects.get(user=self.loyal)
+        lapsed = CustomerSegment.objects.get(user=self.lapsed)
+        self.assertEqual((loyal.frequency, loyal.monetary), (5, 1000))
+        self.assertGreater(lapsed.recency_days, 390)
+        self.assertGreater(loyal.r_score, lapsed.r_score)
+        # With only two buyers the scores sit at the 2nd and 4th quintiles
+        self.assertEqual(loyal.segment, 'loyal')
+        self.assertEqual(lapsed.segment, 'hibernating')
+        self.assertFalse(CustomerSegment.objects.filter(user=self.browser).exists())
+
+        # Recomputing replaces rows instead of adding to them
+        RFMService().compute_segments()
+        self.assertEqual(CustomerSegment.objects.count(), 2)
+
+
+class OrderFactsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        User = get_user_model()
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass')
+        category = Category.objects.create(name='Facts')
+        self.mug = Product.objects.create(name='Mug', category=category, price=8)
+        self.lamp = Product.objects.create(name='Lamp', category=category, price=40)
+
+    def _order(self, status, *items):
+        order = Order.objects.create(user=self.buyer, status=status,
+                                     total=sum(price * quantity for _, price, quantity in items))
+        for product, price, quantity in items:
+            OrderItem.objects.create(order=order, product=product, price=price, quantity=quantity)
+        return order
+
+    def test_incremental_export_matches_orm_statistics(self):
+        self._order('completed', (self.mug, 8, 3))
+        pending = self._order('pending', (self.lamp, 40, 1))
+        service = OrderFactsService(path=self.directory.name)
+        self.assertEqual(service.export(), {'orders': 2, 'items': 2, 'status_updates': 0})
+        self.assertEqual(service.get_order_statistics(), OrderRepository().get_order_statistics())
+
+        # New rows are appended past the watermark; a changed status is patched in place
+        self._order('processing', (self.lamp, 40, 2), (self.mug, 8, 1))
+        Order.objects.filter(pk=pending.pk).update(status='completed')
+        service = OrderFactsService(path=self.directory.name)
+        self.assertEqual(service.export(), {'orders': 1, 'items': 2, 'status_updates': 1})
+        self.assertEqual(service.get_order_statistics(), OrderRepository().get_order_statistics())
+
+        self.assertEqual(service.get_top_products(limit=1), [
+            {'product_id': self.lamp.pk, 'quantity': 3, 'revenue': 120.0},
+        ])
+        today = timezone.localdate()
+        self.assertEqual(service.get_revenue_by_day(since=today, user_id=self.buyer.pk), {today: 152.0})
@@ -0,0 +1,4 @@
+"""
+Benchmarks package initialization.
+Performance benchmarks, load-test tooling and their committed baselines.
+"""
@@ -0,0 +1,412 @@
+"""
+Synthetic dataset generation for benchmarks and index work.
+
+Work is split into chunks that are generated and inserted independently
+(``generate_chunk`` runs in pool workers). Users, products and orders get
+explicit primary keys from ranges fixed up front, so chunks can reference
+each other without querying, and every chunk draws from its own seeded
+random stream: the same ``seed`` and volumes give the same rows whatever
+the number of workers.
+
+Distributions:
+
+- Users and products are created evenly over the time span, in ID order
+  (as with autoincrement keys); each order, review and notification falls
+  between its user's sign-up and the end of the span, skewed towards recent.
+- Product popularity is Zipfian over a seeded random ranking of products;
+  customer activity follows a milder power law.
+- Orders have 1-8 items, an hour-of-day profile peaking in the evening,
+  and a status that depends on their age.
+"""
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+
+from notifications.models import Notification
+from orders.models import Order, OrderItem
+from reviews.models import Review
+from shop.models import Category, Product
+
+
+User = get_user_model()
+
+DAY = 86400
+
+CATEGORY_NAMES = [
+    'Mode', 'Électronique', 'Maison & Jardin', 'Sport & Loisirs', 'Beauté & Santé', 'Livres & Médias',
+    'Jouets', 'Alimentation', 'Auto & Moto', 'Bricolage', 'Bijoux', 'Informatique',
+]
+ADJECTIVES = ['Premium', 'Classique', 'Compact', 'Design', 'Pro', 'Léger', 'Vintage', 'Éco', 'Smart', 'Luxe']
+NOUNS = [
+    'T-shirt', 'Casque', 'Chaise', 'Montre', 'Ballon', 'Sérum', 'Lampe', 'Livre', 'Sac', 'Veste',
+    'Sneakers', 'Clavier', 'Tapis', 'Gourde', 'Parfum', 'Enceinte', 'Table', 'Coussin', 'Robe', 'Caméra',
+]
+FIRST_NAMES = ['Amine', 'Sara', 'Yacine', 'Lina', 'Karim', 'Nour', 'Walid', 'Imane', 'Rayan', 'Meriem', 'Adel', 'Ines']
+LAST_NAMES = ['Benali', 'Haddad', 'Mansouri', 'Cherif', 'Kaci', 'Boudiaf', 'Saidi', 'Ziani', 'Belkacem', 'Amrani']
+
+# Relative order volume per hour of the day
+HOURLY_PROFILE = np.array([1, 1, 1, 1, 1, 2, 3, 4, 5, 6, 6, 7, 8, 7, 6, 6, 7, 8, 10, 12, 12, 10, 6, 3], dtype=float)
+HOURLY_PROFILE /= HOURLY_PROFILE.sum()
+
+REVIEW_RATINGS = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+REVIEW_RATING_WEIGHTS = np.array([0.05, 0.07, 0.15, 0.33, 0.40])
+
+NOTIFICATION_TYPES = [code for code, _ in Notification.TYPE_CHOICES]
+NOTIFICATION_TYPE_WEIGHTS = np.array([0.5, 0.2, 0.2, 0.1])
+
+MAX_ITEMS_PER_ORDER = 8
+
+# How long a worker waits for the SQLite write lock held by another worker
+WRITER_BUSY_TIMEOUT_MS = 10 * 60 * 1000
+
+# Stream identifiers mixed into chunk seeds
+STREAMS = {'users': 1, 'products': 2, 'orders': 3, 'reviews': 4, 'notifications': 5, 'ranking': 6, 'prices': 7}
+
+
+@dataclass(frozen=True)
+class DatasetPlan:
+    """Volumes, ID ranges and distribution parameters shared by every chunk."""
+
+    seed: int
+    prefix: str
+    users: int
+    products: int
+    orders: int
+    user_start: int
+    product_start: int
+    order_start: int
+    start_ts: float
+    end_ts: float
+    category_ids: Tuple[int, ...]
+    password_hash: str
+    product_zipf: float = 1.1
+    user_zipf: float = 0.6
+    review_rate: float = 0.3
+    notifications_per_user: float = 2.0
+    batch_size: int = 5000
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def chunk_rng(plan: DatasetPlan, stream: str, index: int) -> np.random.Generator:
+    """Random stream of one chunk, independent of the other chunks and of scheduling."""
+    return np.random.default_rng(np.random.SeedSequence([plan.seed, STREAMS[stream], index]))
+
+
+def chunks(total: int, size: int) -> Iterator[Tuple[int, int, int]]:
+    """Split ``total`` rows into ``(index, offset, count)`` chunks."""
+    for index, offset in enumerate(range(0, total, size)):
+        yield index, offset, min(size, total - offset)
+
+
+# ----------------------------------------------------------------------
+# Distributions
+# ----------------------------------------------------------------------
+_popularity_cache: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _popularity(plan: DatasetPlan, kind: str, count: int, exponent: float) -> Tuple[np.ndarray, np.ndarray]:
+    """CDF over popularity ranks and the ID offset holding each rank (built once per process)."""
+    key = (plan.seed, kind, count, exponent)
+    if key not in _popularity_cache:
+        weights = 1.0 / np.arange(1, count + 1) ** exponent
+        cdf = np.cumsum(weights)
+        cdf /= cdf[-1]
+        ranking = chunk_rng(plan, 'ranking', STREAMS[kind]).permutation(count)
+        _popularity_cache[key] = (cdf, ranking)
+    return _popularity_cache[key]
+
+
+def sample_popular(plan: DatasetPlan, kind: str, rng: np.random.Generator, size: int) -> np.ndarray:
+    """
+    Draw user or product IDs by power-law popularity.
+
+    Args:
+        plan: Dataset plan
+        kind: ``'products'`` or ``'users'``
+        rng: Chunk random stream
+        size: Number of draws
+
+    Returns:
+        Array of primary keys
+    """
+    if kind == 'products':
+        count, exponent, start = plan.products, plan.product_zipf, plan.product_start
+    else:
+        count, exponent, start = plan.users, plan.user_zipf, plan.user_start
+    cdf, ranking = _popularity(plan, kind, count, exponent)
+    ranks = np.minimum(np.searchsorted(cdf, rng.random(size)), count - 1)
+    return start + ranking[ranks]
+
+
+def created_at(plan: DatasetPlan, offsets: np.ndarray, total: int) -> np.ndarray:
+    """Creation time of rows created evenly over the span in ID order."""
+    return plan.start_ts + (plan.end_ts - plan.start_ts) * offsets / max(total, 1)
+
+
+def user_joined(plan: DatasetPlan, user_ids: np.ndarray) -> np.ndarray:
+    return created_at(plan, user_ids - plan.user_start, plan.users)
+
+
+def activity_times(plan: DatasetPlan, rng: np.random.Generator, since: np.ndarray, daily_profile: bool = False) -> np.ndarray:
+    """
+    Event times between ``since`` and the end of the span, denser towards the end.
+
+    With ``daily_profile`` the time of day follows ``HOURLY_PROFILE``.
+    """
+    position = np.sqrt(rng.random(len(since)))
+    times = since + (plan.end_ts - since) * position
+    if daily_profile:
+        day_start = times - times % DAY
+        seconds = rng.choice(24, size=len(times), p=HOURLY_PROFILE) * 3600 + rng.random(len(times)) * 3600
+        times = np.clip(day_start + seconds, since, plan.end_ts)
+    return times
+
+
+def order_statuses(plan: DatasetPlan, rng: np.random.Generator, times: np.ndarray) -> List[str]:
+    """Older orders are mostly completed; the last week's are still in flight."""
+    age_days = (plan.end_ts - times) / DAY
+    draw = rng.random(len(times))
+    recent = age_days < 7
+    statuses = np.where(
+        recent,
+        np.select([draw < 0.35, draw < 0.75, draw < 0.95], ['pending', 'processing', 'completed'], 'cancelled'),
+        np.select([draw < 0.02, draw < 0.07, draw < 0.90], ['pending', 'processing', 'completed'], 'cancelled'),
+    )
+    return statuses.tolist()
+
+
+_price_cache: Dict[tuple, np.ndarray] = {}
+
+
+def product_prices(plan: DatasetPlan, product_ids: np.ndarray) -> np.ndarray:
+    """Price of each product in cents (drawn once per process, so any chunk can price any product)."""
+    key = (plan.seed, plan.products)
+    if key not in _price_cache:
+        rng = chunk_rng(plan, 'prices', 0)
+        # Log-normal around 3 000 DA, at least 100 DA, rounded to the dinar
+        cents = np.round(rng.lognormal(mean=np.log(3000), sigma=0.9, size=plan.products)) * 100
+        _price_cache[key] = np.maximum(cents, 10000).astype(np.int64)
+    return _price_cache[key][product_ids - plan.product_start]
+
+
+def _to_datetimes(timestamps: np.ndarray) -> List[datetime]:
+    return [datetime.fromtimestamp(ts, tz=dt_timezone.utc) for ts in timestamps.tolist()]
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let ``bulk_create`` keep the generated ``auto_now``/``auto_now_add`` values."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+# ----------------------------------------------------------------------
+# Chunk builders
+# ----------------------------------------------------------------------
+def build_users(plan: DatasetPlan, index: int, offset: int, count: int) -> Dict[str, int]:
+    rng = chunk_rng(plan, 'users', index)
+    ids = plan.user_start + offset + np.arange(count)
+    joined = _to_datetimes(user_joined(plan, ids))
+    first = rng.integers(len(FIRST_NAMES), size=count).tolist()
+    last = rng.integers(len(LAST_NAMES), size=count).tolist()
+    active = (rng.random(count) < 0.93).tolist()
+    users = [
+        User(
+            id=user_id,
+            username=f'{plan.prefix}_user_{user_id}',
+            email=f'{plan.prefix}_user_{user_id}@example.com',
+            password=plan.password_hash,
+            first_name=FIRST_NAMES[first[i]],
+            last_name=LAST_NAMES[last[i]],
+            role='CUSTOMER',
+            is_active=active[i],
+            date_joined=joined[i],
+        )
+        for i, user_id in enumerate(ids.tolist())
+    ]
+    User.objects.bulk_create(users, batch_size=plan.batch_size)
+    return {'users': count}
+
+
+def build_products(plan: DatasetPlan, index: int, offset: int, count: int) -> Dict[str, int]:
+    rng = chunk_rng(plan, 'products', index)
+    ids = plan.product_start + offset + np.arange(count)
+    created = _to_datetimes(created_at(plan, ids - plan.product_start, plan.products))
+    prices = product_prices(plan, ids).tolist()
+    adjectives = rng.integers(len(ADJECTIVES), size=count).tolist()
+    nouns = rng.integers(len(NOUNS), size=count).tolist()
+    categories = rng.choice(plan.category_ids, size=count).tolist()
+    stock = rng.integers(0, 500, size=count).tolist()
+    products = []
+    for i, product_id in enumerate(ids.tolist()):
+        name = f'{NOUNS[nouns[i]]} {ADJECTIVES[adjectives[i]]} {product_id}'
+        products.append(Product(
+            id=product_id,
+            name=name,
+            slug=f'{plan.prefix}-product-{product_id}',
+            category_id=categories[i],
+            description=f'{name} — article généré pour les benchmarks.',
+            price=Decimal(prices[i]) / 100,
+            stock=stock[i],
+            created_at=created[i],
+            updated_at=created[i],
+        ))
+    with explicit_timestamps(Product):
+        Product.objects.bulk_create(products, batch_size=plan.batch_size)
+    return {'products': count}
+
+
+def build_orders(plan: DatasetPlan, index: int, offset: int, count: int) -> Dict[str, int]:
+    rng = chunk_rng(plan, 'orders', index)
+    order_ids = plan.order_start + offset + np.arange(count)
+    user_ids = sample_popular(plan, 'users', rng, count)
+    times = activity_times(plan, rng, user_joined(plan, user_ids), daily_profile=True)
+    statuses = order_statuses(plan, rng, times)
+
+    # 1 + geometric number of lines per order, each on a Zipf-popular product
+    lines = np.minimum(rng.geometric(0.55, size=count), MAX_ITEMS_PER_ORDER)
+    line_orders = np.repeat(np.arange(count), lines)
+    product_ids = sample_popular(plan, 'products', rng, len(line_orders))
+    quantities = np.minimum(rng.geometric(0.7, size=len(line_orders)), 5)
+    prices = product_prices(plan, product_ids)
+    totals = np.bincount(line_orders, weights=prices * quantities, minlength=count).astype(np.int64)
+
+    created = _to_datetimes(times)
+    orders = [
+        Order(id=order_id, user_id=user_id, status=statuses[i], total=Decimal(int(totals[i])) / 100, created_at=created[i])
+        for i, (order_id, user_id) in enumerate(zip(order_ids.tolist(), user_ids.tolist()))
+    ]
+    items = [
+        OrderItem(order_id=order_id, product_id=product_id, price=Decimal(price) / 100, quantity=quantity)
+        for order_id, product_id, price, quantity in zip(
+            order_ids[line_orders].tolist(), product_ids.tolist(), prices.tolist(), quantities.tolist(),
+        )
+    ]
+    with explicit_timestamps(Order), transaction.atomic():
+        Order.objects.bulk_create(orders, batch_size=plan.batch_size)
+        OrderItem.objects.bulk_create(items, batch_size=plan.batch_size)
+    return {'orders': count, 'order_items': len(items)}
+
+
+def build_reviews_and_notifications(plan: DatasetPlan, index: int, offset: int, count: int) -> Dict[str, int]:
+    user_ids = plan.user_start + offset + np.arange(count)
+    joined = user_joined(plan, user_ids)
+
+    rng = chunk_rng(plan, 'reviews', index)
+    reviewers = rng.random(count) < plan.review_rate
+    per_user = np.where(reviewers, 1 + rng.poisson(1.0, size=count), 0)
+    review_users = np.repeat(user_ids, per_user)
+    review_products = sample_popular(plan, 'products', rng, len(review_users))
+    # A user reviews a product at most once
+    pairs = np.unique(np.stack([review_users, review_products], axis=1), axis=0)
+    review_times = activity_times(plan, rng, user_joined(plan, pairs[:, 0]))
+    ratings = rng.choice(REVIEW_RATINGS, size=len(pairs), p=REVIEW_RATING_WEIGHTS).tolist()
+    verified = (rng.random(len(pairs)) < 0.6).tolist()
+    review_created = _to_datetimes(review_times)
+    reviews = [
+        Review(user_id=user_id, product_id=product_id, rating=ratings[i], comment='',
+               is_verified=verified[i], created_at=review_created[i], updated_at=review_created[i])
+        for i, (user_id, product_id) in enumerate(pairs.tolist())
+    ]
+
+    rng = chunk_rng(plan, 'notifications', index)
+    per_user = rng.poisson(plan.notifications_per_user, size=count)
+    notification_users = np.repeat(user_ids, per_user)
+    notification_times = activity_times(plan, rng, np.repeat(joined, per_user))
+    types = rng.choice(len(NOTIFICATION_TYPES), size=len(notification_users), p=NOTIFICATION_TYPE_WEIGHTS).tolist()
+    # Older notifications have mostly been read
+    read = (rng.random(len(notification_users)) < np.where(plan.end_ts - notification_times > 7 * DAY, 0.9, 0.3)).tolist()
+    notification_created = _to_datetimes(notification_times)
+    notifications = [
+        Notification(user_id=user_id, type=NOTIFICATION_TYPES[types[i]], title='Mise à jour',
+                     message='Notification générée pour les benchmarks.', is_read=read[i],
+                     created_at=notification_created[i])
+        for i, user_id in enumerate(notification_users.tolist())
+    ]
+
+    with explicit_timestamps(Review, Notification), transaction.atomic():
+        Review.objects.bulk_create(reviews, batch_size=plan.batch_size)
+        Notification.objects.bulk_create(notifications, batch_size=plan.batch_size)
+    return {'reviews': len(reviews), 'notifications': len(notifications)}
+
+
+BUILDERS = {
+    'users': build_users,
+    'products': build_products,
+    'orders': build_orders,
+    'reviews': build_reviews_and_notifications,
+}
+
+
+def init_worker() -> None:
+    """Pool initializer: make sure Django is set up and no parent connection is reused."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def generate_chunk(task: Tuple[str, dict, int, int, int]) -> Dict[str, int]:
+    """
+    Pool entry point: build and insert one chunk.
+
+    Args:
+        task: ``(kind, plan as dict, chunk index, offset, count)``
+
+    Returns:
+        Row counts inserted, per table
+    """
+    kind, plan, index, offset, count = task
+    plan = DatasetPlan(**plan)
+    connection = connections['default']
+    if connection.vendor == 'sqlite':
+        # Writers serialize on SQLite: queue behind the other workers rather than fail
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA busy_timeout = {WRITER_BUSY_TIMEOUT_MS}')
+    try:
+        return BUILDERS[kind](plan, index, offset, count)
+    finally:
+        connections.close_all()
+
+
+def ensure_categories(prefix: str) -> Tuple[int, ...]:
+    """Create (or reuse) the generated categories and return their IDs."""
+    ids = []
+    for name in CATEGORY_NAMES:
+        category, _ = Category.objects.get_or_create(name=f'{name} ({prefix})')
+        ids.append(category.pk)
+    return tuple(ids)
+
+
+def refresh_product_ratings(product_start: int, product_end: int) -> None:
+    """Recompute ``rating`` and ``reviews`` of generated products from their reviews."""
+    with connections['default'].cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {Product._meta.db_table} SET
+                reviews = (SELECT COUNT(*) FROM {Review._meta.db_table} r WHERE r.product_id = {Product._meta.db_table}.id),
+                rating = COALESCE((SELECT ROUND(AVG(r.rating), 2) FROM {Review._meta.db_table} r
+                                   WHERE r.product_id = {Product._meta.db_table}.id), 0)
+            WHERE id >= %s AND id < %s
+            """,
+            [product_start, product_end],
+        )
@@ -0,0 +1,6 @@
+"""
+HTTP load-test driver for the Shopina API.
+
+Standalone (no Django import): run it from the backend directory against
+any running server with ``python -m benchmarks.loadtest --help``.
+"""
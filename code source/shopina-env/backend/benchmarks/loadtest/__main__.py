@@ -0,0 +1,99 @@
+"""
+Command line entry point: ``python -m benchmarks.loadtest``.
+
+Examples::
+
+    # 20 users for one minute, keeping the report as the new baseline
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8000 --users 20 --duration 60 \\
+        --save-baseline loadtest-baseline.json
+
+    # Same run after a change, failing if an endpoint regressed by more than 15%
+    python -m benchmarks.loadtest --users 20 --duration 60 \\
+        --compare loadtest-baseline.json --tolerance 15 --fail-on-regression
+"""
+import argparse
+import asyncio
+import sys
+
+from benchmarks.loadtest.runner import compare_reports, load_report, run_load, save_report
+from benchmarks.loadtest.scenarios import SCENARIOS
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.loadtest', description=__doc__.splitlines()[1])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server root URL')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30.0, help='Measured seconds after the ramp-up')
+    parser.add_argument('--ramp-up', type=float, default=5.0, help='Seconds over which users start (not measured)')
+    parser.add_argument('--think-time', type=float, default=0.5, help='Mean pause between scenarios, 0 for none')
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), help='Scenarios to run (default: all)')
+    parser.add_argument('--username', default='', help='Existing account shared by all users (default: register one per user)')
+    parser.add_argument('--password', default='Loadtest-Passw0rd!', help='Password of that account or of registered ones')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Seconds allowed per request')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the traffic mix')
+    parser.add_argument('--output', help='Write the full report as JSON')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Store the report as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='Compare with a stored baseline')
+    parser.add_argument('--tolerance', type=float, default=10.0, help='Allowed change in percent when comparing')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 on a regression')
+    return parser.parse_args(argv)
+
+
+def print_report(report: dict) -> None:
+    meta, total = report['meta'], report['total']
+    print(f"{meta['users']} users, {meta['elapsed_seconds']}s measured against {meta['base_url']}")
+    header = f"{'endpoint':<44} {'count':>7} {'req/s':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'fail':>6}"
+    print(header)
+    print('-' * len(header))
+    for label, stats in report['endpoints'].items():
+        failed = stats['errors'] + stats['failed_responses']
+        print(f"{label:<44} {stats['count']:>7} {stats['throughput']:>8} {stats['p50_ms']:>9} "
+              f"{stats['p90_ms']:>9} {stats['p99_ms']:>9} {failed:>6}")
+    print('-' * len(header))
+    print(f"{'total':<44} {total['count']:>7} {total['throughput']:>8} {total['p50_ms']:>9} "
+          f"{total['p90_ms']:>9} {total['p99_ms']:>9} {total['errors'] + total['failed_responses']:>6}")
+    for failure in meta['failed_users']:
+        print(f'user failed: {failure}', file=sys.stderr)
+
+
+def print_comparison(rows: list, tolerance: float) -> bool:
+    print(f"\nChange vs baseline (regression: p90/p99 > +{tolerance}% or req/s < -{tolerance}%)")
+    regressed = False
+    for row in rows:
+        flag = 'REGRESSED' if row['regressed'] else ''
+        regressed = regressed or row['regressed']
+        print(f"{row['endpoint']:<44} req/s {row['throughput']:>+7}%  p50 {row['p50_ms']:>+7}%  "
+              f"p90 {row['p90_ms']:>+7}%  p99 {row['p99_ms']:>+7}%  {flag}")
+    return regressed
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_load(
+        args.base_url,
+        users=args.users,
+        duration=args.duration,
+        ramp_up=args.ramp_up,
+        think_time=args.think_time,
+        scenarios=args.scenarios,
+        username=args.username,
+        password=args.password,
+        timeout=args.timeout,
+        seed=args.seed,
+    ))
+    print_report(report)
+
+    if args.output:
+        save_report(report, args.output)
+    if args.save_baseline:
+        save_report(report, args.save_baseline)
+        print(f'\nBaseline saved to {args.save_baseline}')
+    if args.compare:
+        regressed = print_comparison(compare_reports(report, load_report(args.compare), args.tolerance), args.tolerance)
+        if regressed and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
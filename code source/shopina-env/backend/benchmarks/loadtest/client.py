@@ -0,0 +1,169 @@
+"""
+Minimal asyncio HTTP/1.1 client for the load-test driver.
+
+Each virtual user owns one keep-alive connection, the way a browser tab
+would; the connection is reopened transparently when the server closes it.
+Only what the Shopina API needs is supported: JSON bodies, Content-Length
+and chunked responses, ``http`` and ``https``.
+"""
+import asyncio
+import json
+import ssl
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+
+class HTTPError(Exception):
+    """Transport-level failure (connection refused or reset, malformed response, timeout)."""
+
+
+class Response:
+    """Status, headers (lower-cased names) and body of one response."""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+    def json(self) -> Any:
+        return json.loads(self.body or b'null')
+
+
+class HTTPClient:
+    """
+    One persistent connection to ``base_url``.
+
+    Args:
+        base_url: Server root, e.g. ``http://127.0.0.1:8000``
+        timeout: Seconds allowed per request (connect, send and read)
+    """
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f'Unsupported URL scheme: {base_url}')
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.host_header = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json_body: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """
+        Send one request and read the whole response.
+
+        Args:
+            method: HTTP method
+            path: Path below the base URL
+            json_body: Body serialized as JSON
+            params: Query string parameters
+            headers: Extra request headers
+
+        Returns:
+            Response
+
+        Raises:
+            HTTPError: On connection failures, timeouts or unparsable responses
+        """
+        target = self.prefix + path
+        if params:
+            target += ('&' if '?' in target else '?') + urlencode(params)
+        body = b'' if json_body is None else json.dumps(json_body).encode('utf-8')
+        lines = [
+            f'{method} {target} HTTP/1.1',
+            f'Host: {self.host_header}',
+            'Accept: application/json',
+            'Connection: keep-alive',
+            f'Content-Length: {len(body)}',
+        ]
+        if json_body is not None:
+            lines.append('Content-Type: application/json')
+        lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+        # A kept-alive connection may have been closed by the server in the meantime: retry once on a fresh one
+        for attempt in (1, 2):
+            reused = self._writer is not None
+            try:
+                return await asyncio.wait_for(self._exchange(payload, method), self.timeout)
+            except asyncio.TimeoutError as exc:
+                await self.close()
+                raise HTTPError(f'{method} {path} timed out after {self.timeout}s') from exc
+            except (ConnectionError, asyncio.IncompleteReadError, OSError) as exc:
+                await self.close()
+                if not (reused and attempt == 1):
+                    raise HTTPError(f'{method} {path} failed: {exc!r}') from exc
+
+    async def _exchange(self, payload: bytes, method: str) -> Response:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        self._writer.write(payload)
+        await self._writer.drain()
+
+        status, headers = await self._read_head()
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._read_chunked()
+        elif 'content-length' in headers:
+            body = await self._reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self._reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return Response(status, headers, body)
+
+    async def _read_head(self) -> Tuple[int, Dict[str, str]]:
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Connection closed before the response')
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise HTTPError(f'Malformed status line: {status_line!r}')
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return status, headers
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+    async def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int((await self._reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                # Trailers end with an empty line
+                while (await self._reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await self._reader.readexactly(size))
+            await self._reader.readexactly(2)
+
+    async def close(self) -> None:
+        """Close the connection (the next request opens a new one)."""
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
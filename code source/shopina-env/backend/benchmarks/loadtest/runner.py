@@ -0,0 +1,211 @@
+"""
+Closed-loop load generator and its report.
+
+Every virtual user first registers (unless an account is given) and logs
+in, unmeasured. Users are then started over ``ramp_up`` seconds; each one
+repeatedly picks a scenario by weight, runs it and waits an exponentially
+distributed think time until the run ends. Samples taken during the
+ramp-up are discarded so the figures describe the steady state.
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence
+
+from benchmarks.loadtest.client import HTTPClient, HTTPError
+from benchmarks.loadtest.scenarios import SCENARIOS, Recorder, ScenarioError, VirtualUser
+from benchmarks.stats import summarize
+
+
+async def _authenticate(user: VirtualUser, register: bool, failures: List[str]) -> bool:
+    try:
+        if register:
+            await user.register()
+        await user.login()
+        return True
+    except (HTTPError, ScenarioError) as exc:
+        failures.append(str(exc))
+        await user.client.close()
+        return False
+
+
+async def _user_loop(user: VirtualUser, options: dict, start_at: float, stop_at: float) -> None:
+    rng = user.rng
+    scenarios = [SCENARIOS[name] for name in options['scenarios']]
+    weights = [s.weight for s in scenarios]
+
+    await asyncio.sleep(max(0.0, start_at - time.perf_counter()))
+    try:
+        while time.perf_counter() < stop_at:
+            scenario = rng.choices(scenarios, weights)[0]
+            try:
+                await scenario.run(user)
+            except (HTTPError, ScenarioError):
+                # Already recorded; back off a little so a dead server is not hammered
+                await asyncio.sleep(0.1)
+            if options['think_time']:
+                pause = rng.expovariate(1 / options['think_time'])
+                await asyncio.sleep(min(pause, max(0.0, stop_at - time.perf_counter())))
+    finally:
+        await user.client.close()
+
+
+async def run_load(
+    base_url: str,
+    users: int = 10,
+    duration: float = 30.0,
+    ramp_up: float = 5.0,
+    think_time: float = 0.5,
+    scenarios: Optional[Sequence[str]] = None,
+    username: str = '',
+    password: str = 'Loadtest-Passw0rd!',
+    timeout: float = 30.0,
+    seed: int = 42,
+) -> dict:
+    """
+    Run a load test against a running server.
+
+    Args:
+        base_url: Server root, e.g. ``http://127.0.0.1:8000``
+        users: Concurrent virtual users
+        duration: Seconds of steady state measured after the ramp-up
+        ramp_up: Seconds over which users are started
+        think_time: Mean pause between scenarios (0 for back-to-back)
+        scenarios: Scenario names (all by default)
+        username: Existing account shared by every user; without it each user registers its own
+        password: Password of that account, or of the registered ones
+        timeout: Seconds allowed per request
+        seed: Random seed for scenario choice and think times
+
+    Returns:
+        Report dictionary (see :func:`build_report`)
+    """
+    options = {
+        'think_time': think_time,
+        'scenarios': list(scenarios or SCENARIOS),
+        'run_id': uuid.uuid4().hex[:8],
+    }
+    unknown = set(options['scenarios']) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    failures: List[str] = []
+    # Nothing is recorded until the clock is started below
+    recorder = Recorder(measure_from=float('inf'))
+    virtual_users = [
+        VirtualUser(
+            HTTPClient(base_url, timeout=timeout),
+            recorder,
+            random.Random(seed + i),
+            username or f"loadtest-{options['run_id']}-{i}",
+            password,
+        )
+        for i in range(users)
+    ]
+    ready = await asyncio.gather(*(_authenticate(u, not username, failures) for u in virtual_users))
+    virtual_users = [u for u, ok in zip(virtual_users, ready) if ok]
+
+    started = time.perf_counter()
+    measure_from = started + ramp_up
+    stop_at = measure_from + duration
+    recorder.measure_from = measure_from
+    await asyncio.gather(*(
+        _user_loop(u, options, started + ramp_up * i / max(len(virtual_users), 1), stop_at)
+        for i, u in enumerate(virtual_users)
+    ))
+    elapsed = max(time.perf_counter() - measure_from, 1e-9)
+    return build_report(recorder, elapsed, {
+        'base_url': base_url,
+        'users': users,
+        'duration': duration,
+        'ramp_up': ramp_up,
+        'think_time': think_time,
+        'scenarios': options['scenarios'],
+        'seed': seed,
+        'failed_users': failures,
+    })
+
+
+def build_report(recorder: Recorder, elapsed: float, meta: dict) -> dict:
+    """
+    Summarize recorded samples per endpoint and overall.
+
+    Args:
+        recorder: Steady-state samples
+        elapsed: Measured wall time in seconds
+        meta: Run parameters stored with the report
+
+    Returns:
+        Dictionary with ``meta``, ``total`` and ``endpoints`` (label -> throughput,
+        latency percentiles, error and non-2xx/3xx counts, status codes)
+    """
+    endpoints = {}
+    for label in sorted(set(recorder.latencies) | set(recorder.errors)):
+        statuses = recorder.statuses.get(label, {})
+        endpoints[label] = {
+            **summarize(recorder.latencies.get(label, []), elapsed),
+            'errors': recorder.errors.get(label, 0),
+            'failed_responses': sum(n for code, n in statuses.items() if code >= 400),
+            'statuses': {str(code): n for code, n in sorted(statuses.items())},
+        }
+    samples = [value for values in recorder.latencies.values() for value in values]
+    return {
+        'meta': {**meta, 'elapsed_seconds': round(elapsed, 3)},
+        'total': {
+            **summarize(samples, elapsed),
+            'errors': sum(recorder.errors.values()),
+            'failed_responses': sum(e['failed_responses'] for e in endpoints.values()),
+        },
+        'endpoints': endpoints,
+    }
+
+
+def compare_reports(report: dict, baseline: dict, tolerance: float = 10.0) -> List[Dict[str, object]]:
+    """
+    Compare a report with a saved baseline, endpoint by endpoint.
+
+    An endpoint regresses when its p90 or p99 latency grew, or its throughput
+    dropped, by more than ``tolerance`` percent.
+
+    Args:
+        report: Current report
+        baseline: Baseline report
+        tolerance: Allowed change in percent
+
+    Returns:
+        One row per endpoint present in both, with percent changes and a ``regressed`` flag
+    """
+    def change(current: float, previous: float) -> float:
+        if not previous:
+            return 0.0
+        return round((current - previous) * 100 / previous, 1)
+
+    rows = []
+    for label, current in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(label)
+        if previous is None:
+            continue
+        row = {
+            'endpoint': label,
+            'throughput': change(current['throughput'], previous['throughput']),
+            'p50_ms': change(current['p50_ms'], previous['p50_ms']),
+            'p90_ms': change(current['p90_ms'], previous['p90_ms']),
+            'p99_ms': change(current['p99_ms'], previous['p99_ms']),
+        }
+        row['regressed'] = (
+            row['p90_ms'] > tolerance or row['p99_ms'] > tolerance or row['throughput'] < -tolerance
+        )
+        rows.append(row)
+    return rows
+
+
+def save_report(report: dict, path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+
+
+def load_report(path: str) -> dict:
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
@@ -0,0 +1,200 @@
+"""
+Scripted Shopina scenarios run by each virtual user.
+
+Every request goes through :meth:`VirtualUser.call`, which times it under a
+stable endpoint label (``METHOD /path/`` with IDs replaced by ``{id}``).
+"""
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from benchmarks.loadtest.client import HTTPClient, HTTPError, Response
+
+
+TOKEN_PATH = '/api/users/token/'
+REGISTER_PATH = '/api/users/register/'
+
+
+class ScenarioError(Exception):
+    """A step got a response the rest of the scenario cannot continue from."""
+
+
+class Recorder:
+    """
+    Latency samples, status codes and transport errors per endpoint label.
+
+    Args:
+        measure_from: ``time.perf_counter()`` value before which samples are ignored (warm-up)
+    """
+
+    def __init__(self, measure_from: float = 0.0):
+        self.measure_from = measure_from
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[int, int]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, label: str, seconds: float, status: Optional[int]) -> None:
+        if time.perf_counter() < self.measure_from:
+            return
+        if status is None:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            return
+        self.latencies.setdefault(label, []).append(seconds)
+        codes = self.statuses.setdefault(label, {})
+        codes[status] = codes.get(status, 0) + 1
+
+
+class VirtualUser:
+    """
+    One simulated customer: its connection, JWT and what it has seen so far.
+
+    Args:
+        client: Connection used for every request of this user
+        recorder: Shared sample recorder
+        rng: Random source (seeded per user for repeatable traffic)
+        username: Account to log in with
+        password: Its password
+    """
+
+    def __init__(self, client: HTTPClient, recorder: Recorder, rng: random.Random, username: str, password: str):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.username = username
+        self.password = password
+        self.access: Optional[str] = None
+        self.products: List[dict] = []
+
+    async def call(self, method: str, path: str, label: Optional[str] = None, auth: bool = True, **kwargs) -> Response:
+        """
+        Send a timed request, logging in again once if the access token was rejected.
+
+        Args:
+            method: HTTP method
+            path: API path
+            label: Endpoint label for the report (defaults to ``METHOD path``)
+            auth: Send the JWT
+            **kwargs: Passed to :meth:`HTTPClient.request`
+
+        Returns:
+            Response
+
+        Raises:
+            HTTPError: On transport failures (already recorded)
+        """
+        label = label or f'{method} {path}'
+        for attempt in (1, 2):
+            headers = {'Authorization': f'Bearer {self.access}'} if auth and self.access else {}
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, path, headers=headers, **kwargs)
+            except HTTPError:
+                self.recorder.add(label, time.perf_counter() - start, None)
+                raise
+            self.recorder.add(label, time.perf_counter() - start, response.status)
+            if response.status == 401 and auth and attempt == 1:
+                await self.login()
+                continue
+            return response
+
+    async def register(self) -> None:
+        """Create the account through the public registration endpoint."""
+        response = await self.call('POST', REGISTER_PATH, auth=False, json_body={
+            'username': self.username,
+            'email': f'{self.username}@loadtest.invalid',
+            'password': self.password,
+            'password_confirm': self.password,
+        })
+        if response.status not in (200, 201):
+            raise ScenarioError(f'Registration of {self.username} failed: {response.status} {response.body[:200]!r}')
+
+    async def login(self) -> None:
+        """Obtain a JWT pair from ``CustomTokenObtainPairView``."""
+        response = await self.call('POST', TOKEN_PATH, auth=False, json_body={
+            'identifier': self.username,
+            'password': self.password,
+        })
+        if response.status != 200:
+            raise ScenarioError(f'Login of {self.username} failed: {response.status} {response.body[:200]!r}')
+        self.access = response.json()['access']
+
+    async def pick_product(self) -> dict:
+        if not self.products:
+            await browse(self)
+        if not self.products:
+            raise ScenarioError('The catalog is empty')
+        return self.rng.choice(self.products)
+
+
+# ----------------------------------------------------------------------
+# Scenarios
+# ----------------------------------------------------------------------
+def _items(payload: Any) -> list:
+    # Lists may or may not be paginated
+    return payload.get('results', []) if isinstance(payload, dict) else payload or []
+
+
+async def browse(user: VirtualUser) -> None:
+    """Product list, then one product page."""
+    response = await user.call('GET', '/api/shop/products/')
+    user.products = [p for p in _items(response.json()) if p.get('stock', 1) > 0] if response.ok else []
+    if user.products:
+        product = user.rng.choice(user.products)
+        await user.call('GET', f"/api/shop/products/{product['id']}/", label='GET /api/shop/products/{id}/')
+
+
+async def search(user: VirtualUser) -> None:
+    """Search the catalog with a word taken from a product name."""
+    product = await user.pick_product()
+    words = [w for w in str(product.get('name', '')).split() if len(w) > 2] or ['a']
+    await user.call('GET', '/api/shop/products/', label='GET /api/shop/products/?search',
+                    params={'search': user.rng.choice(words)[:5]})
+
+
+async def add_to_cart(user: VirtualUser) -> None:
+    """Add a product through ``CartItemView`` and read the cart back."""
+    product = await user.pick_product()
+    await user.call('POST', '/api/carts/items/', json_body={'product_id': product['id'], 'quantity': 1})
+    await user.call('GET', '/api/carts/')
+
+
+async def checkout(user: VirtualUser) -> None:
+    """Fill the cart, validate it, place the order and empty the cart."""
+    product = await user.pick_product()
+    await user.call('POST', '/api/carts/items/', json_body={'product_id': product['id'], 'quantity': 1})
+    await user.call('GET', '/api/carts/validate/')
+    response = await user.call('POST', '/api/orders/', json_body={
+        'items': [{'product_id': product['id'], 'price': str(product.get('price', '0')), 'quantity': 1}],
+    })
+    if response.ok:
+        await user.call('DELETE', '/api/carts/')
+
+
+async def poll_notifications(user: VirtualUser) -> None:
+    """What the header badge does every few seconds."""
+    await user.call('GET', '/api/notifications/')
+
+
+async def dashboard(user: VirtualUser) -> None:
+    """Dashboard statistics."""
+    await user.call('GET', '/api/orders/dashboard/stats/')
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    weight: int
+    run: Callable[[VirtualUser], Awaitable[None]]
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    s.name: s for s in [
+        Scenario('browse', 40, browse),
+        Scenario('search', 15, search),
+        Scenario('add_to_cart', 15, add_to_cart),
+        Scenario('checkout', 5, checkout),
+        Scenario('notifications', 15, poll_notifications),
+        Scenario('dashboard', 10, dashboard),
+    ]
+}
@@ -0,0 +1,204 @@
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections
+from django.test.utils import override_settings
+
+from benchmarks.stats import summarize
+from carts.services.cart_service import CartService
+from core.db.sqlite import get_sqlite_profile
+from orders.services.order_service import OrderService
+from orders.views import DashboardStatsView
+from shop.models import Category, Product
+from shop.repositories.product_repository import ProductRepository
+
+
+User = get_user_model()
+
+# What a default sqlite3 connection looks like without the production profile
+STOCK_PROFILE = {
+    'ENABLED': True,
+    'JOURNAL_MODE': 'DELETE',
+    'SYNCHRONOUS': 'FULL',
+    'MMAP_SIZE': 0,
+    'CACHE_SIZE': -2000,
+    'BUSY_TIMEOUT': 5000,
+}
+
+# Relative weights of each operation in the traffic mix
+OPERATION_MIX = {
+    'browse': 50,
+    'dashboard': 20,
+    'add_to_cart': 20,
+    'checkout': 10,
+}
+
+PREFIX = 'bench_conc'
+
+
+class Command(BaseCommand):
+    help = (
+        'Mixed read/write concurrency benchmark (browse, dashboard, add-to-cart, checkout) '
+        'comparing the stock SQLite configuration with the production profile. '
+        'Creates and removes its own rows; run it against a disposable copy of the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent workers')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per profile')
+        parser.add_argument('--profiles', nargs='+', default=['stock', 'tuned'], choices=['stock', 'tuned'])
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the traffic mix')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark targets the SQLite backend')
+
+        users, products = self._setup(options['threads'])
+        results = {}
+        try:
+            for name in options['profiles']:
+                profile = STOCK_PROFILE if name == 'stock' else {**get_sqlite_profile(), 'ENABLED': True}
+                # Persistent connections are part of the tuned profile; stock reconnects per operation
+                persistent = name == 'tuned'
+                with override_settings(SQLITE_TUNING=profile), self._transaction_mode(persistent):
+                    connections.close_all()
+                    # Switch the journal mode once, before workers hold connections to the file
+                    connection.ensure_connection()
+                    connection.close()
+                    results[name] = self._run(users, products, options, persistent)
+                    connections.close_all()
+                self._report(name, results[name])
+        finally:
+            self._teardown()
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    @contextmanager
+    def _transaction_mode(self, immediate: bool):
+        """Apply the profile's transaction mode to connections opened during the run."""
+        db_settings = connections.settings[DEFAULT_DB_ALIAS]
+        saved = db_settings.get('OPTIONS', {})
+        options = {k: v for k, v in saved.items() if k != 'transaction_mode'}
+        if immediate:
+            options['transaction_mode'] = 'IMMEDIATE'
+        db_settings['OPTIONS'] = options
+        try:
+            yield
+        finally:
+            db_settings['OPTIONS'] = saved
+
+    # ------------------------------------------------------------------
+    # Fixture
+    # ------------------------------------------------------------------
+    def _setup(self, threads: int):
+        self._teardown()
+        category, _ = Category.objects.get_or_create(name=f'{PREFIX}-category')
+        products = [
+            Product.objects.create(
+                name=f'{PREFIX} product {i}', slug=f'{PREFIX}-product-{i}',
+                category=category, price=Decimal('10.00'), stock=10 ** 6,
+            )
+            for i in range(20)
+        ]
+        users = []
+        for i in range(threads):
+            user = User(username=f'{PREFIX}_user_{i}', email=f'{PREFIX}_{i}@example.com')
+            user.set_unusable_password()
+            user.save()
+            users.append(user)
+        return users, products
+
+    def _teardown(self):
+        User.objects.filter(username__startswith=f'{PREFIX}_user_').delete()
+        Product.objects.filter(slug__startswith=f'{PREFIX}-product-').delete()
+        Category.objects.filter(name=f'{PREFIX}-category').delete()
+
+    # ------------------------------------------------------------------
+    # Workload
+    # ------------------------------------------------------------------
+    def _run(self, users, products, options, persistent: bool) -> dict:
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['duration']
+        operations = list(OPERATION_MIX)
+        weights = list(OPERATION_MIX.values())
+
+        def worker(index: int):
+            rng = random.Random(options['seed'] + index)
+            user = users[index]
+            cart_service = CartService()
+            order_service = OrderService()
+            product_repository = ProductRepository()
+            dashboard = DashboardStatsView()
+            local_latencies = defaultdict(list)
+            local_errors = defaultdict(int)
+            try:
+                while time.perf_counter() < deadline:
+                    op = rng.choices(operations, weights)[0]
+                    product = rng.choice(products)
+                    start = time.perf_counter()
+                    try:
+                        if op == 'browse':
+                            list(product_repository.get_active_products()[:20])
+                        elif op == 'dashboard':
+                            dashboard._build_payload(user)
+                        elif op == 'add_to_cart':
+                            cart_service.add_to_cart(user, product.id, 1)
+                        else:
+                            cart_service.add_to_cart(user, product.id, 1)
+                            order_service.create_order_from_cart(user)
+                    except OperationalError:
+                        local_errors[op] += 1
+                        continue
+                    finally:
+                        if not persistent:
+                            connection.close()
+                    local_latencies[op].append(time.perf_counter() - start)
+            finally:
+                connections.close_all()
+                with lock:
+                    for op, values in local_latencies.items():
+                        latencies[op].extend(values)
+                    for op, count in local_errors.items():
+                        errors[op] += count
+
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(len(users))]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        all_samples = [value for values in latencies.values() for value in values]
+        return {
+            'elapsed_seconds': round(elapsed, 3),
+            'total': {**summarize(all_samples, elapsed), 'errors': sum(errors.values())},
+            'operations': {
+                op: {**summarize(latencies[op], elapsed), 'errors': errors[op]}
+                for op in operations
+            },
+        }
+
+    def _report(self, name: str, result: dict):
+        total = result['total']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"[{name}] {total['throughput']} ops/s, p99 {total['p99_ms']} ms, {total['errors']} lock errors"
+        ))
+        for op, stats in result['operations'].items():
+            self.stdout.write(
+                f"  {op:<12} {stats['count']:>7} ops  {stats['throughput']:>8} ops/s  "
+                f"p50 {stats['p50_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms  errors {stats['errors']}"
+            )
@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from benchmarks.stats import summarize
+from core.hashing import ProcessHashingExecutor
+
+
+PASSWORD = 'Benchmark-Passw0rd!'
+
+
+class Command(BaseCommand):
+    help = (
+        'Password verification cost of each configured hasher: latency and logins/s on one core, '
+        'then aggregate throughput through the process hashing executor with --workers processes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hashers', nargs='+', help='Algorithms to measure (default: all in PASSWORD_HASHERS)')
+        parser.add_argument('--iterations', type=int, default=20, help='Verifications per hasher on one core')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Executor processes for the throughput run (0: skip it)')
+        parser.add_argument('--per-worker', type=int, default=10, help='Verifications per worker in that run')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+
+    def handle(self, *args, **options):
+        available = {}
+        for path in settings.PASSWORD_HASHERS:
+            hasher = import_string(path)()
+            try:
+                encoded = hasher.encode(PASSWORD, hasher.salt())
+            except ValueError as e:
+                # Optional library (argon2-cffi, bcrypt) not installed
+                self.stdout.write(self.style.WARNING(f'{hasher.algorithm}: skipped ({e})'))
+                continue
+            available[hasher.algorithm] = encoded
+        selected = options['hashers'] or list(available)
+        unknown = sorted(set(selected) - set(available))
+        if unknown:
+            raise CommandError(f"Unavailable hashers: {', '.join(unknown)} (available: {', '.join(available)})")
+
+        results = {}
+        for algorithm in selected:
+            encoded = available[algorithm]
+            results[algorithm] = self._single_core(encoded, options['iterations'])
+            if options['workers'] > 0:
+                results[algorithm].update(self._executor(encoded, options['workers'], options['per_worker']))
+
+        self._print(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump({'cpu_count': os.cpu_count(), 'results': results}, fh, indent=2, sort_keys=True)
+                fh.write('\n')
+
+    def _single_core(self, encoded, iterations):
+        hashers.verify_password(PASSWORD, encoded)  # warm-up
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            hashers.verify_password(PASSWORD, encoded)
+            samples.append(time.perf_counter() - start)
+        stats = summarize(samples, sum(samples))
+        return {
+            'p50_ms': stats['p50_ms'],
+            'p90_ms': stats['p90_ms'],
+            'logins_per_core': stats['throughput'],
+        }
+
+    def _executor(self, encoded, workers, per_worker):
+        # Twice as many callers as workers, so requests queue like during a login burst
+        callers = workers * 2
+        executor = ProcessHashingExecutor(max_concurrent=workers, queue_timeout=60.0, workers=workers)
+        try:
+            # Start every worker process before timing
+            warmup = [threading.Thread(target=executor.run, args=(hashers.verify_password, PASSWORD, encoded))
+                      for _ in range(workers)]
+            for thread in warmup:
+                thread.start()
+            for thread in warmup:
+                thread.join()
+            before = executor.stats()
+
+            total = workers * per_worker
+            shares = [total // callers + (1 if i < total % callers else 0) for i in range(callers)]
+
+            def caller(count):
+                for _ in range(count):
+                    executor.run(hashers.verify_password, PASSWORD, encoded)
+
+            threads = [threading.Thread(target=caller, args=(count,)) for count in shares]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            after = executor.stats()
+        finally:
+            executor.shutdown()
+        throughput = total / elapsed
+        return {
+            'workers': workers,
+            'pool_logins_per_s': round(throughput, 2),
+            'pool_logins_per_core': round(throughput / workers, 2),
+            'pool_mean_wait_ms': round(
+                (after['mean_wait_ms'] * after['submitted'] - before['mean_wait_ms'] * before['submitted'])
+                / max(after['submitted'] - before['submitted'], 1), 3
+            ),
+        }
+
+    def _print(self, results):
+        header = (f"{'hasher':<22} {'p50 ms':>9} {'p90 ms':>9} {'logins/s/core':>14} "
+                  f"{'workers':>8} {'pool logins/s':>14} {'per core':>9} {'wait ms':>9}")
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for algorithm, row in results.items():
+            pool = ''
+            if 'workers' in row:
+                pool = (f" {row['workers']:>8} {row['pool_logins_per_s']:>14} "
+                        f"{row['pool_logins_per_core']:>9} {row['pool_mean_wait_ms']:>9}")
+            self.stdout.write(
+                f"{algorithm:<22} {row['p50_ms']:>9} {row['p90_ms']:>9} {row['logins_per_core']:>14}{pool}"
+            )
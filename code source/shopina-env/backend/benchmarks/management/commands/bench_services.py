@@ -0,0 +1,101 @@
+import json
+import platform
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from benchmarks.microbench import (
+    DEFAULT_TOLERANCES, FIXTURE_SIZES, SUITE, build_fixture, compare_results, run_suite,
+)
+
+
+BASELINE_PATH = Path(__file__).resolve().parents[2] / 'baselines' / 'services.json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Micro-benchmarks of service and repository methods (wall time, query count, allocations) '
+        'against a seeded fixture, compared with the committed baseline. '
+        'The fixture is created in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--benchmarks', nargs='+', choices=[b.name for b in SUITE], help='Subset to run')
+        parser.add_argument('--size', choices=sorted(FIXTURE_SIZES), default='small', help='Fixture volumes')
+        parser.add_argument('--repeat', type=int, help='Timed iterations per benchmark (default: per benchmark)')
+        parser.add_argument('--seed', type=int, default=42, help='Fixture seed')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+        parser.add_argument('--baseline', default=str(BASELINE_PATH), help='Baseline to compare with')
+        parser.add_argument('--save-baseline', action='store_true', help='Overwrite the baseline with these results')
+        parser.add_argument('--time-tolerance', type=float, default=DEFAULT_TOLERANCES['p50_ms'],
+                            help='Allowed p50 growth in percent (p90 gets twice as much)')
+        parser.add_argument('--alloc-tolerance', type=float, default=DEFAULT_TOLERANCES['alloc_peak_kib'],
+                            help='Allowed peak allocation growth in percent')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit with an error on a regression')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            context = build_fixture(options['size'], options['seed'])
+            results = run_suite(context, options['benchmarks'], options['repeat'])
+            transaction.set_rollback(True)
+
+        report = {
+            'meta': {'size': options['size'], 'seed': options['seed'], 'python': platform.python_version(),
+                     'machine': platform.machine()},
+            'results': results,
+        }
+        self._print(results)
+        if options['output']:
+            self._write(options['output'], report)
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            self._write(baseline_path, report)
+            self.stdout.write(self.style.SUCCESS(f'Baseline saved to {baseline_path}'))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f'No baseline at {baseline_path}; run with --save-baseline'))
+            return
+
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        if baseline['meta']['size'] != options['size']:
+            raise CommandError(f"Baseline was recorded on the {baseline['meta']['size']!r} fixture")
+        tolerances = {
+            'p50_ms': options['time_tolerance'],
+            'p90_ms': options['time_tolerance'] * 2,
+            'alloc_peak_kib': options['alloc_tolerance'],
+        }
+        rows = compare_results(results, baseline['results'], tolerances)
+        regressed = self._print_comparison(rows)
+        if regressed and options['fail_on_regression']:
+            raise CommandError(f"Regressions: {', '.join(regressed)}")
+
+    def _write(self, path, report):
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+            fh.write('\n')
+
+    def _print(self, results):
+        header = f"{'benchmark':<24} {'p50 ms':>9} {'p90 ms':>9} {'max ms':>9} {'queries':>8} {'peak KiB':>9}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<24} {stats['p50_ms']:>9} {stats['p90_ms']:>9} {stats['max_ms']:>9} "
+                f"{stats['queries']:>8} {stats['alloc_peak_kib']:>9}"
+            )
+
+    def _print_comparison(self, rows):
+        self.stdout.write('\nChange vs baseline (%)')
+        regressed = []
+        for row in rows:
+            changes = '  '.join(f'{metric} {change:+}' for metric, change in row['changes'].items())
+            line = f"{row['benchmark']:<24} {changes}"
+            if row['regressions']:
+                regressed.append(row['benchmark'])
+                self.stdout.write(self.style.ERROR(f"{line}  REGRESSED ({', '.join(row['regressions'])})"))
+            else:
+                self.stdout.write(line)
+        return regressed
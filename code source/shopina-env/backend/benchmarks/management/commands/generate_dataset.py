@@ -0,0 +1,146 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from benchmarks.dataset import (
+    DatasetPlan, chunks, ensure_categories, generate_chunk, init_worker, refresh_product_ratings,
+)
+from orders.models import Order
+from shop.models import Category, Product
+from users.repositories.user_search_repository import UserSearchRepository
+from users.services.user_service import user_counters
+
+
+User = get_user_model()
+
+PRESETS = {
+    'small': {'users': 10_000, 'products': 2_000, 'orders': 50_000},
+    'medium': {'users': 100_000, 'products': 20_000, 'orders': 1_000_000},
+    'large': {'users': 1_000_000, 'products': 200_000, 'orders': 10_000_000},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a large synthetic dataset (users, products, orders with items, reviews, notifications) '
+        'with Zipfian product popularity and time-spread activity. Rows are bulk-inserted in chunks '
+        'by a process pool; the same --seed and volumes always produce the same rows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=sorted(PRESETS), default='small', help='Base volumes')
+        parser.add_argument('--users', type=int, help='Customers (overrides the preset)')
+        parser.add_argument('--products', type=int, help='Products (overrides the preset)')
+        parser.add_argument('--orders', type=int, help='Orders (overrides the preset)')
+        parser.add_argument('--days', type=int, default=730, help='Time span covered by the data')
+        parser.add_argument('--end', help='End of the span (ISO 8601, default: now)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes (1: inline)')
+        parser.add_argument('--chunk-size', type=int, default=20_000, help='Rows generated per task')
+        parser.add_argument('--batch-size', type=int, default=5_000, help='Rows per INSERT')
+        parser.add_argument('--prefix', default='gen', help='Prefix of generated usernames, slugs and categories')
+        parser.add_argument('--password', default='changeme123', help='Password of every generated user')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete rows generated earlier with this prefix first (slow at scale; prefer a fresh database)')
+        parser.add_argument('--no-analyze', action='store_true', help='Skip ANALYZE after loading')
+
+    def handle(self, *args, **options):
+        volumes = {
+            name: options[name] if options[name] is not None else PRESETS[options['preset']][name]
+            for name in ('users', 'products', 'orders')
+        }
+        if min(volumes['users'], volumes['products']) < 1:
+            raise CommandError('--users and --products must be at least 1')
+        end = timezone.now()
+        if options['end']:
+            end = parse_datetime(options['end'])
+            if end is None:
+                raise CommandError('--end must be an ISO 8601 datetime')
+            if timezone.is_naive(end):
+                end = timezone.make_aware(end)
+
+        if options['clear']:
+            self._clear(options['prefix'])
+
+        plan = DatasetPlan(
+            seed=options['seed'],
+            prefix=options['prefix'],
+            **volumes,
+            # Fresh ID ranges above everything already stored
+            user_start=(User.objects.aggregate(m=Max('pk'))['m'] or 0) + 1,
+            product_start=(Product.objects.aggregate(m=Max('pk'))['m'] or 0) + 1,
+            order_start=(Order.objects.aggregate(m=Max('pk'))['m'] or 0) + 1,
+            start_ts=(end - timedelta(days=options['days'])).timestamp(),
+            end_ts=end.timestamp(),
+            category_ids=ensure_categories(options['prefix']),
+            password_hash=make_password(options['password']),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(
+            f"Generating {plan.users} users, {plan.products} products and {plan.orders} orders "
+            f"over {options['days']} days with {options['workers']} worker(s), seed {plan.seed}"
+        )
+
+        started = time.perf_counter()
+        size = options['chunk_size']
+        # Each phase only references rows committed by the previous ones
+        phases = [
+            ('users and products', [('users', plan.users), ('products', plan.products)]),
+            ('orders', [('orders', plan.orders)]),
+            ('reviews and notifications', [('reviews', plan.users)]),
+        ]
+        connections.close_all()
+        pool = None
+        if options['workers'] > 1:
+            pool = ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker)
+        try:
+            for label, kinds in phases:
+                tasks = [
+                    (kind, plan.as_dict(), index, offset, count)
+                    for kind, total in kinds
+                    for index, offset, count in chunks(total, size)
+                ]
+                self._run_phase(label, tasks, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        refresh_product_ratings(plan.product_start, plan.product_start + plan.products)
+        # bulk_create sends no post_save: index the new users and drop the cached counts
+        self.stdout.write('Rebuilding the user search index...')
+        UserSearchRepository().rebuild()
+        user_counters.invalidate()
+        if not options['no_analyze'] and connection.vendor == 'sqlite':
+            # Fresh statistics, or the planner ignores the composite indexes on the new volumes
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.perf_counter() - started:.1f}s'))
+
+    def _run_phase(self, label, tasks, pool):
+        started = time.perf_counter()
+        totals = {}
+        results = pool.map(generate_chunk, tasks) if pool is not None else map(generate_chunk, tasks)
+        for done, counts in enumerate(results, start=1):
+            for table, count in counts.items():
+                totals[table] = totals.get(table, 0) + count
+            if done % 10 == 0 and done < len(tasks):
+                self.stdout.write(f'  {label}: {done}/{len(tasks)} chunks')
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        summary = ', '.join(f'{count} {table}' for table, count in totals.items())
+        self.stdout.write(f'  {label}: {summary} in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)')
+
+    def _clear(self, prefix):
+        self.stdout.write(f'Deleting rows generated with prefix {prefix!r}...')
+        User.objects.filter(username__startswith=f'{prefix}_user_').delete()
+        Product.objects.filter(slug__startswith=f'{prefix}-product-').delete()
+        Category.objects.filter(name__endswith=f' ({prefix})').delete()
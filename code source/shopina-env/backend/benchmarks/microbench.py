@@ -0,0 +1,264 @@
+"""
+Micro-benchmarks of the service and repository layer.
+
+Each benchmark calls one service or repository method directly (no HTTP,
+no serialization) against a fixture seeded with the synthetic dataset
+generator, and records:
+
+- wall time over ``repeat`` iterations (after warm-up), as percentiles;
+- the number of SQL queries of one iteration;
+- memory allocated by one iteration, measured with ``tracemalloc`` in a
+  separate pass so tracing does not inflate the timings.
+
+Results are plain JSON. :func:`compare_results` checks them against a
+committed baseline: query counts must not grow, while time and allocations
+may move within a tolerance since they depend on the machine.
+"""
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count, Max
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from benchmarks.dataset import BUILDERS, DatasetPlan, chunks, ensure_categories
+from benchmarks.stats import summarize
+from carts.services.cart_service import CartService
+from carts.views import CartItemView
+from core.container import container
+from orders.models import Order
+from orders.services.order_service import OrderService
+from orders.views import DashboardStatsView
+from shop.models import Product
+from shop.repositories.product_repository import ProductRepository
+from shop.services.product_service import ProductService
+from users.models import TwoFactor
+from users.services.otp import hash_otp
+from users.services.user_service import UserService, user_counters
+
+
+User = get_user_model()
+
+PREFIX = 'bench_micro'
+
+# Fixture volumes; results are only comparable between runs on the same sizes
+FIXTURE_SIZES = {
+    'small': {'users': 500, 'products': 1000, 'orders': 5000},
+    'medium': {'users': 5000, 'products': 10000, 'orders': 50000},
+}
+
+OTP = '482913'
+
+# Allowed growth, in percent, before a metric counts as a regression
+DEFAULT_TOLERANCES = {
+    'p50_ms': 25.0,
+    'p90_ms': 50.0,
+    'queries': 0.0,
+    'alloc_peak_kib': 15.0,
+}
+
+# Changes between values both below these are noise, not regressions
+NOISE_FLOORS = {
+    'p50_ms': 0.01,
+    'p90_ms': 0.01,
+    'alloc_peak_kib': 1.0,
+}
+
+
+@dataclass
+class Benchmark:
+    """One measured call; ``setup`` runs before every iteration, untimed."""
+
+    name: str
+    run: Callable[[dict], Any]
+    setup: Optional[Callable[[dict], None]] = None
+    repeat: int = 50
+
+
+# ----------------------------------------------------------------------
+# Fixture
+# ----------------------------------------------------------------------
+def build_fixture(size: str = 'small', seed: int = 42) -> dict:
+    """
+    Seed the database with a synthetic dataset and pick the benchmark subjects.
+
+    Call it inside a transaction that is rolled back afterwards.
+
+    Args:
+        size: Key of ``FIXTURE_SIZES``
+        seed: Dataset seed
+
+    Returns:
+        Context dictionary handed to every benchmark
+    """
+    end = timezone.now()
+    plan = DatasetPlan(
+        seed=seed,
+        prefix=PREFIX,
+        **FIXTURE_SIZES[size],
+        user_start=(User.objects.aggregate(m=Max('pk'))['m'] or 0) + 1,
+        product_start=(Product.objects.aggregate(m=Max('pk'))['m'] or 0) + 1,
+        order_start=(Order.objects.aggregate(m=Max('pk'))['m'] or 0) + 1,
+        start_ts=(end - timedelta(days=365)).timestamp(),
+        end_ts=end.timestamp(),
+        category_ids=ensure_categories(PREFIX),
+        password_hash='!',
+    )
+    for kind, total in (('users', plan.users), ('products', plan.products), ('orders', plan.orders),
+                        ('reviews', plan.users)):
+        for index, offset, count in chunks(total, 10_000):
+            BUILDERS[kind](plan, index, offset, count)
+
+    products = Product.objects.filter(pk__gte=plan.product_start)
+    # Plenty of stock so repeated cart and checkout calls never run out
+    products.update(stock=10 ** 6)
+    buyer = User.objects.create(username=f'{PREFIX}_buyer', email=f'{PREFIX}_buyer@example.com', password='!')
+    return {
+        'buyer': buyer,
+        'dashboard_user': User.objects.filter(pk__gte=plan.user_start)
+        .annotate(n=Count('orders')).order_by('-n').first(),
+        'products': list(products.order_by('pk')[:3]),
+        'reviewed_product': products.annotate(n=Count('product_reviews')).order_by('-n').first(),
+        'search_query': 'Casque',
+        'otp_hash': hash_otp(buyer.pk, OTP),
+        'sizes': FIXTURE_SIZES[size],
+    }
+
+
+# ----------------------------------------------------------------------
+# Suite
+# ----------------------------------------------------------------------
+def _fill_cart(context: dict) -> None:
+    for product in context['products']:
+        container.resolve(CartService).add_to_cart(context['buyer'], product.id, 1)
+
+
+def _issue_otp(context: dict) -> None:
+    TwoFactor.objects.create(
+        user=context['buyer'], otp_hash=context['otp_hash'], expires_at=timezone.now() + timedelta(minutes=5),
+    )
+
+
+SUITE: List[Benchmark] = [
+    Benchmark('product_search',
+              lambda c: list(container.resolve(ProductService).search_products(c['search_query'])[:20])),
+    Benchmark('cart_add', lambda c: container.resolve(CartService).add_to_cart(c['buyer'], c['products'][0].id, 1)),
+    Benchmark('order_create_from_cart', lambda c: container.resolve(OrderService).create_order_from_cart(c['buyer']),
+              setup=_fill_cart, repeat=30),
+    Benchmark('product_update_rating', lambda c: ProductRepository().update_rating(c['reviewed_product'])),
+    Benchmark('two_factor_verify', lambda c: container.resolve(UserService).verify_two_factor(c['buyer'], OTP),
+              setup=_issue_otp),
+    Benchmark('dashboard_stats', lambda c: DashboardStatsView()._build_payload(c['dashboard_user']), repeat=20),
+    Benchmark('order_statistics', lambda c: container.resolve(OrderService).get_order_statistics(), repeat=20),
+    # Cold: the counters are recounted (cached reads cost no query at all)
+    Benchmark('user_statistics', lambda c: container.resolve(UserService).get_user_statistics(),
+              setup=lambda c: user_counters.invalidate(), repeat=20),
+    # Per-request setup cost: a view getting its service, and the order service graph built from scratch
+    Benchmark('cart_view_setup', lambda c: CartItemView().cart_service, repeat=2000),
+    Benchmark('order_service_build', lambda c: OrderService(), repeat=2000),
+    Benchmark('order_service_resolve', lambda c: container.resolve(OrderService), repeat=2000),
+]
+
+
+# ----------------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------------
+def measure(benchmark: Benchmark, context: dict, repeat: Optional[int] = None, warmup: int = 2) -> Dict[str, float]:
+    """
+    Time a benchmark, then count its queries and allocations on one more iteration.
+
+    Args:
+        benchmark: Benchmark to run
+        context: Fixture context
+        repeat: Timed iterations (defaults to the benchmark's own)
+        warmup: Untimed iterations run first
+
+    Returns:
+        Latency summary plus ``queries``, ``alloc_peak_kib`` and ``alloc_net_kib``
+    """
+    def iteration() -> float:
+        if benchmark.setup:
+            benchmark.setup(context)
+        start = time.perf_counter()
+        benchmark.run(context)
+        return time.perf_counter() - start
+
+    for _ in range(warmup):
+        iteration()
+    samples = [iteration() for _ in range(repeat or benchmark.repeat)]
+
+    if benchmark.setup:
+        benchmark.setup(context)
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        with CaptureQueriesContext(connection) as queries:
+            benchmark.run(context)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+    stats = summarize(samples)
+    del stats['throughput']
+    return {
+        **stats,
+        'queries': len(queries),
+        'alloc_peak_kib': round((peak - before) / 1024, 1),
+        'alloc_net_kib': round((after - before) / 1024, 1),
+    }
+
+
+def run_suite(context: dict, names: Optional[List[str]] = None, repeat: Optional[int] = None) -> Dict[str, dict]:
+    """
+    Run the benchmarks of ``SUITE`` (or those named) against a fixture.
+
+    Returns:
+        Results keyed by benchmark name
+    """
+    selected = [b for b in SUITE if not names or b.name in names]
+    return {benchmark.name: measure(benchmark, context, repeat) for benchmark in selected}
+
+
+def compare_results(results: Dict[str, dict], baseline: Dict[str, dict],
+                    tolerances: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """
+    Compare benchmark results with a baseline.
+
+    Args:
+        results: Current results keyed by benchmark name
+        baseline: Baseline results, same shape
+        tolerances: Allowed growth in percent per metric (``DEFAULT_TOLERANCES`` by default)
+
+    Returns:
+        One row per benchmark present in both: percent change per metric and
+        the list of ``regressions`` (metrics beyond their tolerance)
+    """
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        row = {'benchmark': name, 'changes': {}, 'regressions': []}
+        for metric, tolerance in tolerances.items():
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            floor = NOISE_FLOORS.get(metric, 0)
+            if old < floor and new < floor:
+                old = new
+            change = round((new - old) * 100 / old, 1) if old else (0.0 if new == old else float('inf'))
+            row['changes'][metric] = change
+            if change > tolerance:
+                row['regressions'].append(metric)
+        rows.append(row)
+    return rows
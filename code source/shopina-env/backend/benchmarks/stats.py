@@ -0,0 +1,48 @@
+"""
+Latency statistics shared by the benchmark tools.
+
+Kept free of Django imports so the standalone load-test driver can use it.
+"""
+import math
+from typing import Dict, Iterable, List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values: Values sorted ascending
+        pct: Percentile between 0 and 100
+
+    Returns:
+        Percentile value (0.0 for an empty list)
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: Iterable[float], elapsed: float = 0.0) -> Dict[str, float]:
+    """
+    Summarize latency samples (seconds) into milliseconds.
+
+    Args:
+        samples: Latencies in seconds
+        elapsed: Wall time of the run, used for throughput
+
+    Returns:
+        Dictionary with count, throughput and latency percentiles
+    """
+    values = sorted(samples)
+    count = len(values)
+    return {
+        'count': count,
+        'throughput': round(count / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(values) / count * 1000, 3) if count else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p90_ms': round(percentile(values, 90) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if count else 0.0,
+    }
@@ -0,0 +1,80 @@
+import asyncio
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Max, Min
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase
+
+from benchmarks.loadtest.runner import compare_reports, run_load
+from benchmarks.microbench import Benchmark, compare_results, measure
+from orders.models import Order, OrderItem
+from shop.models import Category, Product
+from users.repositories.user_repository import UserRepository
+
+
+class LoadTestDriverTests(LiveServerTestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Load')
+        Product.objects.create(name='Load test mug', category=category, price=8, stock=100)
+
+    def test_scenarios_run_against_live_server(self):
+        # A single user: the live server threads share one in-memory SQLite connection
+        report = asyncio.run(run_load(self.live_server_url, users=1, duration=1.0, ramp_up=0, think_time=0))
+
+        self.assertEqual(report['meta']['failed_users'], [])
+        self.assertGreater(report['total']['count'], 0)
+        self.assertEqual(report['total']['errors'], 0)
+        self.assertEqual(report['total']['failed_responses'], 0)
+        self.assertIn('GET /api/shop/products/', report['endpoints'])
+
+
+class BaselineComparisonTests(SimpleTestCase):
+    def test_regression_beyond_tolerance_is_flagged(self):
+        baseline = {'endpoints': {'GET /a': {'throughput': 100, 'p50_ms': 10, 'p90_ms': 20, 'p99_ms': 40}}}
+        report = {'endpoints': {'GET /a': {'throughput': 95, 'p50_ms': 10, 'p90_ms': 21, 'p99_ms': 60}}}
+
+        [row] = compare_reports(report, baseline, tolerance=10)
+        self.assertEqual((row['throughput'], row['p99_ms']), (-5.0, 50.0))
+        self.assertTrue(row['regressed'])
+
+
+class GenerateDatasetTests(TestCase):
+    def generate(self, prefix):
+        call_command(
+            'generate_dataset', users=50, products=20, orders=200, workers=1, chunk_size=80,
+            prefix=prefix, seed=7, end='2025-06-01T12:00:00', stdout=StringIO(),
+        )
+        orders = Order.objects.filter(user__username__startswith=f'{prefix}_user_').order_by('id')
+        return list(orders.values_list('status', 'total'))
+
+    def test_volumes_and_determinism(self):
+        first = self.generate('a')
+        second = self.generate('b')
+
+        self.assertEqual(len(first), 200)
+        self.assertEqual(first, second)
+        self.assertEqual(Product.objects.filter(slug__startswith='a-product-').count(), 20)
+        items = OrderItem.objects.filter(order__user__username__startswith='a_user_')
+        self.assertGreaterEqual(items.count(), 200)
+        span = Order.objects.filter(user__username__startswith='a_user_').aggregate(
+            first=Min('created_at'), last=Max('created_at'),
+        )
+        self.assertGreater((span['last'] - span['first']).days, 180)
+        # Bulk-inserted users are searchable
+        self.assertEqual([u.username for u in UserRepository().search_users('a_user_7')][:1], ['a_user_7'])
+
+
+class MicroBenchmarkTests(TestCase):
+    def test_measure_counts_queries_and_allocations(self):
+        benchmark = Benchmark('products', lambda c: list(Product.objects.all()), repeat=3)
+
+        stats = measure(benchmark, {}, warmup=0)
+        self.assertEqual((stats['count'], stats['queries']), (3, 1))
+        self.assertGreater(stats['alloc_peak_kib'], 0)
+
+    def test_query_growth_is_a_regression_regardless_of_time(self):
+        baseline = {'search': {'p50_ms': 10.0, 'queries': 2, 'alloc_peak_kib': 40.0}}
+        results = {'search': {'p50_ms': 9.0, 'queries': 3, 'alloc_peak_kib': 41.0}}
+
+        [row] = compare_results(results, baseline)
+        self.assertEqual(row['regressions'], ['queries'])
@@ -2,19 +2,47 @@
 Cart admin configuration.
 """
 from django.contrib import admin
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from core.admin import PerformanceAdminMixin
 from .models import Cart, CartItem
 
 
 @admin.register(Cart)
-class CartAdmin(admin.ModelAdmin):
+class CartAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'total_items', 'total_price', 'updated_at')
+    list_select_related = ('user',)
     search_fields = ('user__username', 'user__email')
     readonly_fields = ('created_at', 'updated_at')
+    autocomplete_fields = ('user',)
+    keyset_field = 'updated_at'
+
+    def get_queryset(self, request):
+        # Totals as correlated subqueries: only the carts on the page are aggregated,
+        # and the changelist query stays a plain scan of the (updated_at, id) index
+        items = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+        return super().get_queryset(request).annotate(
+            items_quantity=Coalesce(Subquery(items.annotate(n=Sum('quantity')).values('n')), Value(0)),
+            items_total=Coalesce(
+                Subquery(items.annotate(total=Sum(F('price_at_add') * F('quantity'))).values('total')),
+                Value(0, output_field=DecimalField(max_digits=10, decimal_places=2)),
+            ),
+        )
+
+    @admin.display(description='Total items', ordering='items_quantity')
+    def total_items(self, obj):
+        return obj.items_quantity
+
+    @admin.display(description='Total price', ordering='items_total')
+    def total_price(self, obj):
+        return obj.items_total
 
 
 @admin.register(CartItem)
-class CartItemAdmin(admin.ModelAdmin):
+class CartItemAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ('cart', 'product', 'quantity', 'price_at_add', 'subtotal')
+    list_select_related = ('cart__user', 'product')
     list_filter = ('created_at',)
     search_fields = ('cart__user__username', 'product__name')
     readonly_fields = ('created_at', 'updated_at')
+    autocomplete_fields = ('cart', 'product')
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0001_initial'),
+        ('shop', '0002_product_product_rating_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['cart', 'created_at'], name='cartitem_cart_created_idx'),
+        ),
+    ]
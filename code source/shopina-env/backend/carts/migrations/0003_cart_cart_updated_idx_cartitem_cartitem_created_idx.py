@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 20:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0002_cartitem_cartitem_cart_created_idx'),
+        ('shop', '0002_product_product_rating_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['updated_at', 'id'], name='cart_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['created_at', 'id'], name='cartitem_created_idx'),
+        ),
+    ]
@@ -21,6 +21,10 @@ class Cart(models.Model):
     
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            # Admin changelist keyset paging (core.admin.PerformanceAdminMixin)
+            models.Index(fields=['updated_at', 'id'], name='cart_updated_idx'),
+        ]
     
     def __str__(self):
         return f"Cart for {self.user.username}"
@@ -61,6 +65,11 @@ class CartItem(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['cart', 'product']
+        indexes = [
+            models.Index(fields=['cart', 'created_at'], name='cartitem_cart_created_idx'),
+            # Admin changelist keyset paging
+            models.Index(fields=['created_at', 'id'], name='cartitem_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.quantity} x {self.product.name}"
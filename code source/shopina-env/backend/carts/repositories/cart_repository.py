@@ -3,7 +3,9 @@ Cart repository for data access operations.
 """
 from typing import Optional
 from django.contrib.auth import get_user_model
+from django.db.models import F, Prefetch, prefetch_related_objects
 from core.repositories.base import BaseRepository
+from core.repositories.identity_map import invalidate
 from carts.models import Cart, CartItem
 from shop.models import Product
 
@@ -29,7 +31,14 @@ class CartRepository(BaseRepository[Cart]):
         Returns:
             Tuple of (cart, created)
         """
-        return self.model.objects.get_or_create(user=user)
+        created = False
+        
+        def load():
+            nonlocal created
+            cart, created = self.model.objects.get_or_create(user=user)
+            return cart
+        
+        return self._get_mapped(('user', user.pk), load), created
     
     def get_user_cart(self, user: User) -> Optional[Cart]:
         """
@@ -41,10 +50,34 @@ class CartRepository(BaseRepository[Cart]):
         Returns:
             Cart instance or None
         """
-        try:
-            return self.model.objects.get(user=user)
-        except self.model.DoesNotExist:
-            return None
+        def load():
+            try:
+                return self.model.objects.get(user=user)
+            except self.model.DoesNotExist:
+                return None
+        
+        return self._get_mapped(('user', user.pk), load)
+    
+    def load_items(self, cart: Cart) -> Cart:
+        """
+        Fetch the cart's items with their products and categories in one query.
+        
+        ``total_items``, ``total_price`` and the serializer then all read the
+        prefetched items instead of querying them again.
+        
+        Args:
+            cart: Cart instance
+            
+        Returns:
+            The same cart, with items prefetched
+        """
+        # Replace a prefetch done earlier in the request, which may predate item writes
+        getattr(cart, '_prefetched_objects_cache', {}).pop('items', None)
+        prefetch_related_objects(
+            [cart],
+            Prefetch('items', queryset=CartItem.objects.select_related('product__category')),
+        )
+        return cart
     
     def clear_cart(self, cart: Cart) -> None:
         """
@@ -54,6 +87,7 @@ class CartRepository(BaseRepository[Cart]):
             cart: Cart instance
         """
         cart.items.all().delete()
+        invalidate(CartItem)
 
 
 class CartItemRepository(BaseRepository[CartItem]):
@@ -75,10 +109,28 @@ class CartItemRepository(BaseRepository[CartItem]):
         Returns:
             CartItem instance or None
         """
-        try:
-            return self.model.objects.get(cart=cart, product=product)
-        except self.model.DoesNotExist:
-            return None
+        def load():
+            try:
+                return self.model.objects.get(cart=cart, product=product)
+            except self.model.DoesNotExist:
+                return None
+        
+        return self._get_mapped(('cart_product', cart.pk, product.pk), load)
+    
+    def add_quantity(self, cart_item: CartItem, quantity: int) -> CartItem:
+        """
+        Atomically add to an item's quantity with a single ``UPDATE``.
+        
+        Args:
+            cart_item: CartItem instance
+            quantity: Quantity to add
+            
+        Returns:
+            The item, its in-memory quantity adjusted
+        """
+        self.update_where({'pk': cart_item.pk}, quantity=F('quantity') + quantity)
+        cart_item.quantity += quantity
+        return cart_item
     
     def get_cart_items(self, cart: Cart):
         """
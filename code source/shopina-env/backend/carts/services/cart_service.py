@@ -14,7 +14,7 @@ from core.utils.exceptions import (
 from core.utils.validators import validate_quantity
 from carts.models import Cart, CartItem
 from carts.repositories.cart_repository import CartRepository, CartItemRepository
-from shop.models import Product
+from shop.repositories.product_repository import ProductRepository
 
 
 User = get_user_model()
@@ -29,6 +29,7 @@ class CartService(BaseService[Cart]):
     def __init__(self):
         self.cart_repository = CartRepository()
         self.cart_item_repository = CartItemRepository()
+        self.product_repository = ProductRepository()
         super().__init__(self.cart_repository)
     
     def get_or_create_cart(self, user: User) -> Cart:
@@ -46,6 +47,18 @@ class CartService(BaseService[Cart]):
             self.log_operation('cart_created', {'user_id': user.id})
         return cart
     
+    def get_cart_with_items(self, user: User) -> Cart:
+        """
+        Get or create the user's cart with its items loaded, ready to serialize.
+        
+        Args:
+            user: User instance
+            
+        Returns:
+            Cart instance with prefetched items
+        """
+        return self.cart_repository.load_items(self.get_or_create_cart(user))
+    
     def add_to_cart(self, user: User, product_id: int, quantity: int = 1) -> CartItem:
         """
         Add product to cart with stock validation.
@@ -72,9 +85,8 @@ class CartService(BaseService[Cart]):
         cart = self.get_or_create_cart(user)
         
         # Get product
-        try:
-            product = Product.objects.get(pk=product_id)
-        except Product.DoesNotExist:
+        product = self.product_repository.get_by_id(product_id)
+        if not product:
             raise ResourceNotFoundError("Product not found")
         
         # Check if product is active
@@ -94,9 +106,7 @@ class CartService(BaseService[Cart]):
         
         # Add or update cart item
         if existing_item:
-            existing_item.quantity = total_quantity
-            existing_item.save()
-            cart_item = existing_item
+            cart_item = self.cart_item_repository.add_quantity(existing_item, quantity)
         else:
             cart_item = CartItem.objects.create(
                 cart=cart,
@@ -151,8 +161,7 @@ class CartService(BaseService[Cart]):
             )
         
         # Update quantity
-        cart_item.quantity = quantity
-        cart_item.save()
+        cart_item = self.cart_item_repository.update(cart_item, quantity=quantity)
         
         self.log_operation('cart_item_updated', {
             'user_id': user.id,
@@ -175,7 +184,7 @@ class CartService(BaseService[Cart]):
         """
         try:
             cart_item = CartItem.objects.get(pk=cart_item_id, cart__user=user)
-            cart_item.delete()
+            self.cart_item_repository.delete(cart_item)
             
             self.log_operation('item_removed_from_cart', {
                 'user_id': user.id,
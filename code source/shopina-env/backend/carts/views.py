@@ -10,6 +10,7 @@ from core.utils.exceptions import (
     ResourceNotFoundError,
     ValidationError
 )
+from core.container import Inject
 from carts.services.cart_service import CartService
 from carts.serializers import (
     CartSerializer,
@@ -24,13 +25,11 @@ class CartView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.cart_service = CartService()
+    cart_service = Inject(CartService)
     
     def get(self, request):
         """Get user's cart with all items."""
-        cart = self.cart_service.get_or_create_cart(request.user)
+        cart = self.cart_service.get_cart_with_items(request.user)
         serializer = CartSerializer(cart)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -48,9 +47,7 @@ class CartItemView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.cart_service = CartService()
+    cart_service = Inject(CartService)
     
     def post(self, request):
         """Add item to cart."""
@@ -65,7 +62,7 @@ class CartItemView(APIView):
             )
             
             # Return updated cart
-            cart = self.cart_service.get_or_create_cart(request.user)
+            cart = self.cart_service.get_cart_with_items(request.user)
             cart_serializer = CartSerializer(cart)
             
             return Response(cart_serializer.data, status=status.HTTP_201_CREATED)
@@ -89,7 +86,7 @@ class CartItemView(APIView):
             )
             
             # Return updated cart
-            cart = self.cart_service.get_or_create_cart(request.user)
+            cart = self.cart_service.get_cart_with_items(request.user)
             cart_serializer = CartSerializer(cart)
             
             return Response(cart_serializer.data, status=status.HTTP_200_OK)
@@ -106,7 +103,7 @@ class CartItemView(APIView):
             self.cart_service.remove_from_cart(request.user, pk)
             
             # Return updated cart
-            cart = self.cart_service.get_or_create_cart(request.user)
+            cart = self.cart_service.get_cart_with_items(request.user)
             cart_serializer = CartSerializer(cart)
             
             return Response(cart_serializer.data, status=status.HTTP_200_OK)
@@ -123,9 +120,7 @@ class CartValidateView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.cart_service = CartService()
+    cart_service = Inject(CartService)
     
     def get(self, request):
         """Validate cart for checkout."""
@@ -0,0 +1,145 @@
+"""
+Admin changelists that stay fast on large tables.
+
+``PerformanceAdminMixin`` makes a ``ModelAdmin`` page by keyset: in the
+default order (newest ``keyset_field`` first, primary key as tie-breaker)
+each page is a seek past the previous page's last row, addressed by an
+opaque ``?after=`` cursor, and no ``COUNT(*)`` runs at all. Sorting by a
+column falls back to numbered pages, counted with the planner's row
+estimate when the changelist is unfiltered; ``show_full_result_count`` is
+off either way.
+"""
+from typing import Optional
+
+from django.contrib.admin.views.main import PAGE_VAR, ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from core.utils.keyset import decode_cursor, encode_cursor
+
+
+CURSOR_VAR = 'after'
+
+
+def estimate_row_count(model) -> Optional[int]:
+    """
+    Row count of a model's table as last estimated by the database statistics.
+
+    Args:
+        model: Model class
+
+    Returns:
+        Estimated rows, or None when the backend keeps no estimate (SQLite
+        before ``ANALYZE``, other vendors)
+    """
+    connection = connections[model.objects.db]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [table])
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # Each row starts with the table's row count
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    # PostgreSQL reports -1 for never-analyzed tables
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator counting unfiltered querysets from the table statistics once they are large."""
+
+    # Below this many estimated rows an exact count is cheap enough
+    estimate_threshold = 10_000
+
+    @cached_property
+    def count(self) -> int:
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = estimate_row_count(self.object_list.model)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist paging by ``(keyset_field, pk)`` in the default order.
+
+    The template gets ``cl.keyset`` (True in keyset mode) and the
+    ``keyset_next_url``/``keyset_first_url`` links.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.keyset_after = getattr(request, 'keyset_cursor', None)
+        self.keyset_next_url = None
+        self.keyset_first_url = None
+        super().__init__(request, *args, **kwargs)
+
+    @property
+    def keyset(self) -> bool:
+        return bool(self.model_admin.keyset_field) and ORDER_VAR not in self.params
+
+    def get_results(self, request):
+        if not self.keyset:
+            return super().get_results(request)
+
+        field = self.model_admin.keyset_field
+        queryset = self.queryset.order_by(f'-{field}', '-pk')
+        after = decode_cursor(self.keyset_after) if self.keyset_after else None
+        if after is not None:
+            timestamp, pk = after
+            # A range plus a residual filter, so the (field) index can seek
+            queryset = queryset.filter(**{f'{field}__lte': timestamp}).exclude(**{field: timestamp, 'pk__gte': pk})
+        rows = list(queryset[:self.list_per_page + 1])
+        result_list = rows[:self.list_per_page]
+
+        if len(rows) > self.list_per_page:
+            last = result_list[-1]
+            cursor = encode_cursor(getattr(last, field), last.pk)
+            self.keyset_next_url = self.get_query_string({CURSOR_VAR: cursor}, [PAGE_VAR])
+        if after is not None:
+            self.keyset_first_url = self.get_query_string(remove=[PAGE_VAR])
+
+        self.result_count = len(result_list)
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = self.keyset_next_url is not None or after is not None
+        self.paginator = self.model_admin.get_paginator(request, result_list, self.list_per_page)
+
+
+class PerformanceAdminMixin:
+    """
+    ModelAdmin mixin: keyset changelist paging, estimated counts, no full count.
+
+    Set ``keyset_field`` to an indexed timestamp field the changelist is
+    paged on, newest first (None disables keyset paging). Combine with
+    ``list_select_related``, annotated list columns and
+    ``autocomplete_fields`` so each page costs a constant number of queries.
+    """
+
+    keyset_field: Optional[str] = 'created_at'
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    change_list_template = 'admin/keyset_change_list.html'
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def changelist_view(self, request, extra_context=None):
+        # The cursor is not a field lookup: keep it away from the changelist filters
+        if CURSOR_VAR in request.GET:
+            request.GET = request.GET.copy()
+            request.keyset_cursor = request.GET.pop(CURSOR_VAR)[-1]
+        return super().changelist_view(request, extra_context)
@@ -0,0 +1,19 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_save
+        from core.db.metrics import install_query_metrics
+        from core.db.slow_queries import install_slow_query_log
+        from core.db.sqlite import apply_sqlite_pragmas
+        from core.repositories.identity_map import track_save
+
+        connection_created.connect(install_query_metrics, dispatch_uid='core.db.metrics')
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='core.db.sqlite')
+        connection_created.connect(install_slow_query_log, dispatch_uid='core.db.slow_queries')
+        post_save.connect(track_save, dispatch_uid='core.repositories.identity_map')
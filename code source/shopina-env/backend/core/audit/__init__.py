@@ -0,0 +1 @@
+"""Audit package initialization."""
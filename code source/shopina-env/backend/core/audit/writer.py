@@ -0,0 +1,221 @@
+"""
+Buffered audit trail.
+
+Services enqueue events in memory; a background writer drains the queue and
+persists them in batches, either with one ``bulk_create`` per batch into the
+append-only ``AuditEvent`` table or as JSON lines in rotating local files.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SINK': 'database',  # 'database' or 'jsonl'
+    'PATH': 'audit.jsonl',
+    'MAX_BYTES': 10 * 1024 * 1024,
+    'BACKUP_COUNT': 5,
+    'QUEUE_SIZE': 10000,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 1.0,  # seconds a partial batch may wait
+    'OVERFLOW': 'drop',  # 'drop' or 'block' when the queue is full
+    'BLOCK_TIMEOUT': 0.05,  # seconds to wait for room with OVERFLOW='block'
+    'BACKGROUND': True,
+}
+
+
+def get_audit_settings() -> dict:
+    """
+    Get the audit trail settings.
+
+    Returns:
+        Settings ``AUDIT_TRAIL`` merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'AUDIT_TRAIL', {})}
+
+
+class AuditTrail:
+    """
+    Bounded in-memory queue of audit events with a single background writer.
+
+    ``record`` never touches the database on the request path. When the queue
+    is full the event is dropped (and counted), or with ``OVERFLOW='block'``
+    the caller waits at most ``BLOCK_TIMEOUT`` before dropping it.
+    """
+
+    def __init__(self):
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._file_handler: Optional[RotatingFileHandler] = None
+        self._stats = {'enqueued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def record(self, operation: str, details: Optional[Dict[str, Any]] = None, service: str = '') -> None:
+        """
+        Record an audit event once the surrounding transaction commits.
+
+        Args:
+            operation: Operation name (e.g. ``order_created``)
+            details: JSON-serializable details; ``user_id`` is indexed
+            service: Name of the service that performed the operation
+        """
+        config = get_audit_settings()
+        if not config['ENABLED']:
+            return
+        details = dict(details or {})
+        event = {
+            'operation': operation,
+            'service': service,
+            'user_id': details.get('user_id'),
+            'details': details,
+            'created_at': timezone.now(),
+        }
+        # Operations rolled back with their transaction never happened
+        transaction.on_commit(lambda: self._enqueue(event, config))
+
+    def _enqueue(self, event: dict, config: dict) -> None:
+        if not config['BACKGROUND']:
+            self._write([event], config)
+            return
+
+        q = self._ensure_started(config)
+        try:
+            if config['OVERFLOW'] == 'block':
+                q.put(event, timeout=config['BLOCK_TIMEOUT'])
+            else:
+                q.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self._stats['dropped'] += 1
+                dropped = self._stats['dropped']
+            # One warning per thousand drops is enough to notice without flooding the logs
+            if dropped % 1000 == 1:
+                logger.warning('Audit queue full (%s events); %s events dropped so far', q.maxsize, dropped)
+            return
+        with self._lock:
+            self._stats['enqueued'] += 1
+
+    def _ensure_started(self, config: dict) -> queue.Queue:
+        if self._thread is not None and self._thread.is_alive():
+            return self._queue
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._queue is None:
+                    self._queue = queue.Queue(maxsize=config['QUEUE_SIZE'])
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        return self._queue
+
+    # ------------------------------------------------------------------
+    # Writer side
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            config = get_audit_settings()
+            batch = self._drain(config['BATCH_SIZE'], config['FLUSH_INTERVAL'])
+            if batch:
+                self._write(batch, config)
+
+    def _drain(self, batch_size: int, wait: float) -> List[dict]:
+        """Collect up to ``batch_size`` events, waiting at most ``wait`` seconds for the batch to fill."""
+        batch = []
+        deadline = time.monotonic() + wait
+        while len(batch) < batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self) -> int:
+        """
+        Write every queued event now, from the calling thread.
+
+        Returns:
+            Number of events written
+        """
+        if self._queue is None:
+            return 0
+        config = get_audit_settings()
+        written = 0
+        while True:
+            batch = self._drain(config['BATCH_SIZE'], 0)
+            if not batch:
+                return written
+            written += self._write(batch, config)
+
+    def _write(self, batch: List[dict], config: dict) -> int:
+        try:
+            with self._write_lock:
+                if config['SINK'] == 'jsonl':
+                    self._write_jsonl(batch, config)
+                else:
+                    self._write_database(batch)
+        except Exception:
+            logger.exception('Failed to write %s audit events', len(batch))
+            with self._lock:
+                self._stats['failed'] += len(batch)
+            return 0
+        finally:
+            if threading.current_thread() is self._thread:
+                close_old_connections()
+        with self._lock:
+            self._stats['written'] += len(batch)
+            self._stats['batches'] += 1
+        return len(batch)
+
+    def _write_database(self, batch: List[dict]) -> None:
+        from core.models import AuditEvent
+
+        AuditEvent.objects.bulk_create([AuditEvent(**event) for event in batch])
+
+    def _write_jsonl(self, batch: List[dict], config: dict) -> None:
+        path = os.path.abspath(str(config['PATH']))
+        if self._file_handler is None or self._file_handler.baseFilename != path:
+            if self._file_handler is not None:
+                self._file_handler.close()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file_handler = RotatingFileHandler(
+                path, maxBytes=config['MAX_BYTES'], backupCount=config['BACKUP_COUNT'], encoding='utf-8',
+            )
+        lines = '\n'.join(
+            json.dumps({**event, 'created_at': event['created_at'].isoformat()}, default=str)
+            for event in batch
+        )
+        record = logging.makeLogRecord({'msg': lines, 'levelno': logging.INFO})
+        self._file_handler.handle(record)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get writer counters.
+
+        Returns:
+            Dictionary with enqueued, written, dropped, failed, batches and queued counts
+        """
+        with self._lock:
+            return {**self._stats, 'queued': self._queue.qsize() if self._queue else 0}
+
+
+audit_trail = AuditTrail()
@@ -0,0 +1,177 @@
+"""
+Cached global counters.
+
+A set of named integer counters (e.g. users per role) computed once by an
+aggregate query and then kept current in the cache: writers apply deltas
+with atomic ``incr``/``decr`` instead of dropping the whole set, so reads
+stay a single ``get_many`` however large the tables grow. A change that
+cannot be expressed as a delta invalidates the set; the next read
+recomputes it. Entries expire after ``TIMEOUT`` seconds, which bounds the
+drift from writes that bypass signals (``QuerySet.update``, raw SQL).
+
+Deltas only reach the processes sharing the cache. With a per-process
+``LocMemCache`` a write drops this process's counters instead, and the
+others recount after ``LOCAL_TIMEOUT`` seconds at most.
+
+Every ``add`` and ``invalidate`` bumps a generation number; a recount
+during which it changed is returned but not cached, since it may predate
+the change its delta or invalidation was meant for.
+"""
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 3600,
+    # Lifetime of the counters in a per-process cache, where other processes' deltas never arrive
+    'LOCAL_TIMEOUT': 30,
+}
+
+
+def get_counter_settings() -> dict:
+    """
+    Get the global counter settings.
+
+    Returns:
+        Settings ``GLOBAL_COUNTERS`` merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'GLOBAL_COUNTERS', {})}
+
+
+class CachedCounters:
+    """
+    Named counters of one ``namespace``, read from the cache or recomputed.
+
+    Args:
+        namespace: Prefix of every cache key
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+    @property
+    def _cache(self):
+        return caches[get_counter_settings()['CACHE_ALIAS']]
+
+    @property
+    def _names_key(self) -> str:
+        return f'counters:{self.namespace}'
+
+    @property
+    def _generation_key(self) -> str:
+        return f'counters:{self.namespace}:generation'
+
+    def _key(self, name: str) -> str:
+        return f'counters:{self.namespace}:{name}'
+
+    @property
+    def cache_is_shared(self) -> bool:
+        # Each process has its own LocMemCache: deltas would only reach the writer
+        return not isinstance(self._cache, LocMemCache)
+
+    def _generation(self) -> int:
+        cache = self._cache
+        cache.add(self._generation_key, 0, None)
+        return cache.get(self._generation_key, 0)
+
+    def _bump_generation(self) -> None:
+        cache = self._cache
+        cache.add(self._generation_key, 0, None)
+        try:
+            cache.incr(self._generation_key)
+        except ValueError:
+            # Evicted in between
+            cache.set(self._generation_key, 1, None)
+
+    def get(self, compute: Callable[[], Dict[str, int]]) -> Dict[str, int]:
+        """
+        Return the counters, computing them when not cached.
+
+        Args:
+            compute: Function returning every counter of the namespace by name
+
+        Returns:
+            Counter values by name
+        """
+        cache = self._cache
+        names = cache.get(self._names_key)
+        if names is not None:
+            values = cache.get_many([self._key(name) for name in names])
+            if len(values) == len(names):
+                return {name: values[self._key(name)] for name in names}
+
+        generation = self._generation()
+        counts = compute()
+        if self._generation() != generation:
+            # Changed while counting: these counts may miss it
+            return counts
+        config = get_counter_settings()
+        timeout = config['TIMEOUT'] if self.cache_is_shared else config['LOCAL_TIMEOUT']
+        cache.set_many({self._key(name): value for name, value in counts.items()}, timeout)
+        # Written last: readers never see the name list without its values
+        cache.set(self._names_key, list(counts), timeout)
+        if self._generation() != generation:
+            # Changed while storing: an add() may have found no names and skipped its delta
+            cache.delete(self._names_key)
+        return counts
+
+    def add(self, deltas: Dict[str, int]) -> None:
+        """
+        Apply deltas to cached counters; a missing counter invalidates them all.
+
+        With a per-process cache the counters are invalidated instead.
+
+        Args:
+            deltas: Amount to add per counter name (negative to subtract)
+        """
+        if not self.cache_is_shared:
+            self.invalidate()
+            return
+        cache = self._cache
+        # Before reading the names: a recount that stored them concurrently sees the bump
+        self._bump_generation()
+        if cache.get(self._names_key) is None:
+            # Not computed yet: the next read counts from the database
+            return
+        for name, delta in deltas.items():
+            try:
+                if delta > 0:
+                    cache.incr(self._key(name), delta)
+                elif delta < 0:
+                    cache.decr(self._key(name), -delta)
+            except ValueError:
+                self.invalidate()
+                return
+
+    def add_on_commit(self, deltas: Dict[str, int], using: Optional[str] = None) -> None:
+        """
+        Apply deltas once the current transaction commits (immediately outside one).
+
+        Args:
+            deltas: Amount to add per counter name
+            using: Database alias of the transaction
+        """
+        transaction.on_commit(lambda: self.add(deltas), using=using)
+
+    def invalidate(self) -> None:
+        """Drop the counters; the next read recomputes them."""
+        self._bump_generation()
+        self._cache.delete(self._names_key)
+
+    def invalidate_on_commit(self, using: Optional[str] = None) -> None:
+        """
+        Drop the counters now and again once the current transaction commits.
+
+        Dropping twice keeps a concurrent read from caching counts taken
+        before the commit.
+
+        Args:
+            using: Database alias of the transaction
+        """
+        self.invalidate()
+        transaction.on_commit(self.invalidate, using=using)
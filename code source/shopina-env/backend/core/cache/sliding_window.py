@@ -0,0 +1,137 @@
+"""
+Sliding-window request counters on top of the Django cache.
+
+Each key keeps one counter per fixed window; the count over the last
+``window`` seconds is estimated as the current window's counter plus the
+previous window's counter weighted by how much of it still overlaps the
+sliding window. Only ``add``/``incr``/``decr`` are used, which are atomic in
+the local-memory and Redis/Memcached backends, so concurrent workers
+sharing a cache never lose updates.
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from django.core.cache import caches
+
+
+@dataclass
+class WindowState:
+    """Outcome of a counted (or peeked) request."""
+
+    allowed: bool
+    limit: int
+    count: float
+    # Seconds until the current fixed window rolls over
+    reset: int
+    # Seconds until one more request fits (0 when it already does)
+    retry_after: int
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - math.ceil(self.count))
+
+
+class SlidingWindowCounter:
+    """
+    Counts requests per key over a sliding ``window`` of seconds.
+
+    Args:
+        window: Window length in seconds
+        prefix: Cache key prefix
+        alias: Cache alias holding the counters
+    """
+
+    def __init__(self, window: int, prefix: str, alias: str = 'default'):
+        self.window = window
+        self.prefix = prefix
+        self.alias = alias
+
+    def _counts(self, key: str, now: float):
+        index, offset = divmod(now, self.window)
+        current = f'{self.prefix}:{key}:{int(index)}'
+        previous = f'{self.prefix}:{key}:{int(index) - 1}'
+        return current, previous, offset / self.window
+
+    def _state(self, limit: int, current: int, previous: int, elapsed: float, allowed: bool) -> WindowState:
+        count = previous * (1 - elapsed) + current
+        left_in_window = (1 - elapsed) * self.window
+        excess = count - (limit - 1)
+        if excess <= 0:
+            retry_after = 0.0
+        elif previous and excess <= previous * (1 - elapsed):
+            # The previous window's weight fades enough before this window ends
+            retry_after = excess / previous * self.window
+        else:
+            # Next window: this window's count becomes the fading one
+            retry_after = left_in_window
+            if current:
+                retry_after += max(0.0, 1 - (limit - 1) / current) * self.window
+        return WindowState(
+            allowed=allowed, limit=limit, count=count,
+            reset=math.ceil(left_in_window), retry_after=math.ceil(retry_after),
+        )
+
+    def hit(self, key: str, limit: int, now: Optional[float] = None) -> WindowState:
+        """
+        Count a request unless it would exceed ``limit``.
+
+        Args:
+            key: Counter key (e.g. the user id)
+            limit: Requests allowed per window
+            now: Current time (for tests)
+
+        Returns:
+            WindowState; rejected requests are not counted
+        """
+        now = time.time() if now is None else now
+        cache = caches[self.alias]
+        current_key, previous_key, elapsed = self._counts(key, now)
+        cache.add(current_key, 0, timeout=self.window * 2)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Evicted between add and incr
+            cache.set(current_key, 1, timeout=self.window * 2)
+            current = 1
+        previous = cache.get(previous_key, 0)
+        if previous * (1 - elapsed) + current > limit:
+            try:
+                current = cache.decr(current_key)
+            except ValueError:
+                current = 0
+            return self._state(limit, current, previous, elapsed, allowed=False)
+        return self._state(limit, current, previous, elapsed, allowed=True)
+
+    def peek(self, key: str, limit: int, now: Optional[float] = None) -> WindowState:
+        """
+        Report the current count without counting a request.
+
+        Args:
+            key: Counter key
+            limit: Requests allowed per window
+            now: Current time (for tests)
+
+        Returns:
+            WindowState
+        """
+        now = time.time() if now is None else now
+        current_key, previous_key, elapsed = self._counts(key, now)
+        counts = caches[self.alias].get_many([current_key, previous_key])
+        current, previous = counts.get(current_key, 0), counts.get(previous_key, 0)
+        return self._state(limit, current, previous, elapsed, allowed=previous * (1 - elapsed) + current < limit)
+
+    def release(self, key: str, now: Optional[float] = None) -> None:
+        """
+        Uncount a request counted by ``hit`` at ``now`` (e.g. rejected by another limit).
+
+        Args:
+            key: Counter key
+            now: The time passed to ``hit``
+        """
+        now = time.time() if now is None else now
+        try:
+            caches[self.alias].decr(self._counts(key, now)[0])
+        except ValueError:
+            pass
@@ -0,0 +1,157 @@
+"""
+Stale-while-revalidate caching for expensive aggregates.
+
+Values are stored together with the time they were computed. A value younger
+than the freshness window is served as-is; an older value is still served
+immediately while a single background refresh recomputes it. Only a cold cache
+(or an expired stale window) makes the caller wait for the computation.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+from core.db.routing import routing_scope
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'FRESH_SECONDS': 30,
+    'STALE_SECONDS': 600,
+    'BACKGROUND_REFRESH': True,
+    'CACHE_ALIAS': 'default',
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Lazily create the shared refresh executor (one per process)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='swr-refresh')
+    return _executor
+
+
+class StaleWhileRevalidateCache:
+    """
+    Cache wrapper serving stale values while a background refresh recomputes them.
+
+    Configuration is read lazily from the settings dict named by
+    ``settings_name`` so that ``override_settings`` works in tests.
+    """
+
+    def __init__(self, namespace: str, settings_name: str):
+        """
+        Initialize the cache wrapper.
+
+        Args:
+            namespace: Prefix used for every cache key
+            settings_name: Name of the settings dict holding the configuration
+        """
+        self.namespace = namespace
+        self.settings_name = settings_name
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+    def _config(self) -> dict:
+        return {**DEFAULTS, **getattr(settings, self.settings_name, {})}
+
+    @property
+    def _cache(self):
+        return caches[self._config()['CACHE_ALIAS']]
+
+    def _key(self, key: str) -> str:
+        return f"swr:{self.namespace}:{key}"
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for ``key``, computing it when missing.
+
+        Args:
+            key: Cache key (without namespace)
+            compute: Zero-argument callable producing a fresh value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        config = self._config()
+        envelope = self._cache.get(self._key(key))
+        if envelope is None:
+            return self.refresh(key, compute)
+
+        age = time.time() - envelope['computed_at']
+        if age > config['FRESH_SECONDS']:
+            self._schedule_refresh(key, compute, config)
+        return envelope['value']
+
+    def refresh(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Recompute and store the value for ``key`` synchronously.
+
+        Args:
+            key: Cache key (without namespace)
+            compute: Zero-argument callable producing a fresh value
+
+        Returns:
+            Freshly computed value
+        """
+        config = self._config()
+        value = compute()
+        envelope = {'value': value, 'computed_at': time.time()}
+        self._cache.set(
+            self._key(key),
+            envelope,
+            timeout=config['FRESH_SECONDS'] + config['STALE_SECONDS'],
+        )
+        return value
+
+    def invalidate(self, key: str) -> None:
+        """
+        Drop the cached value for ``key`` so the next read recomputes it.
+
+        Args:
+            key: Cache key (without namespace)
+        """
+        self._cache.delete(self._key(key))
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _schedule_refresh(self, key: str, compute: Callable[[], Any], config: dict) -> None:
+        """Start one background refresh per key; concurrent readers keep serving stale data."""
+        lock_key = self._key(f"{key}:refreshing")
+        # cache.add is atomic: only the first stale reader wins the refresh
+        if not self._cache.add(lock_key, 1, timeout=max(config['FRESH_SECONDS'], 5)):
+            return
+
+        if not config['BACKGROUND_REFRESH']:
+            try:
+                self.refresh(key, compute)
+            finally:
+                self._cache.delete(lock_key)
+            return
+
+        def run():
+            try:
+                with routing_scope():
+                    self.refresh(key, compute)
+            except Exception:
+                logger.exception("Background refresh failed for %s", self._key(key))
+            finally:
+                self._cache.delete(lock_key)
+                # Refresh threads are long-lived; never keep connections open across jobs
+                connections.close_all()
+
+        _get_executor().submit(run)
+
+
+dashboard_cache = StaleWhileRevalidateCache(namespace='dashboard', settings_name='DASHBOARD_CACHE')
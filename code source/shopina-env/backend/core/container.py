@@ -0,0 +1,117 @@
+"""
+Process-wide dependency container for stateless services and repositories.
+
+Services and repositories keep no per-request state (request-scoped data
+lives in context variables, see ``core.repositories.identity_map``), so
+one instance per process is enough. Views declare what they need with
+``Inject`` and get the shared instance instead of rebuilding the service
+graph on every request::
+
+    class CartView(APIView):
+        cart_service = Inject(CartService)
+
+Classes are built by calling them without arguments unless a factory is
+registered (apps register theirs in ``AppConfig.ready()``). Tests swap an
+implementation with ``container.override(CartService, fake)``.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Type, TypeVar
+
+
+T = TypeVar('T')
+
+_MISSING = object()
+
+
+class Container:
+    """Lazily built singletons keyed by class."""
+
+    def __init__(self):
+        self._factories: Dict[type, Callable[['Container'], Any]] = {}
+        self._instances: Dict[type, Any] = {}
+        self._overrides: Dict[type, Any] = {}
+        # Re-entrant: a factory resolves its own dependencies while the lock is held
+        self._lock = threading.RLock()
+
+    def register(self, key: Type[T], factory: Callable[['Container'], T]) -> None:
+        """
+        Register how to build ``key``; replaces any instance already built.
+
+        Args:
+            key: Class the instance is looked up by
+            factory: Called with the container, returns the instance
+        """
+        with self._lock:
+            self._factories[key] = factory
+            self._instances.pop(key, None)
+
+    def resolve(self, key: Type[T]) -> T:
+        """
+        Return the shared instance of ``key``, building it on first use.
+
+        Args:
+            key: Class to resolve
+
+        Returns:
+            The override if one is active, else the process-wide instance
+        """
+        if self._overrides:
+            override = self._overrides.get(key, _MISSING)
+            if override is not _MISSING:
+                return override
+        instance = self._instances.get(key, _MISSING)
+        if instance is _MISSING:
+            with self._lock:
+                instance = self._instances.get(key, _MISSING)
+                if instance is _MISSING:
+                    factory = self._factories.get(key)
+                    instance = factory(self) if factory else key()
+                    self._instances[key] = instance
+        return instance
+
+    @contextmanager
+    def override(self, key: Type[T], instance: Any):
+        """
+        Serve ``instance`` for ``key`` inside the block (for tests).
+
+        Args:
+            key: Class to override
+            instance: Replacement returned by ``resolve``
+        """
+        previous = self._overrides.get(key, _MISSING)
+        self._overrides[key] = instance
+        try:
+            yield instance
+        finally:
+            if previous is _MISSING:
+                del self._overrides[key]
+            else:
+                self._overrides[key] = previous
+
+    def reset(self) -> None:
+        """Drop built instances so the next ``resolve`` rebuilds them (factories are kept)."""
+        with self._lock:
+            self._instances.clear()
+
+
+container = Container()
+
+
+class Inject:
+    """
+    Class attribute resolving a dependency from the container on access.
+
+    Args:
+        key: Class to resolve
+        source: Container to use (the process-wide one by default)
+    """
+
+    def __init__(self, key: type, source: Optional[Container] = None):
+        self.key = key
+        self.source = source
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return (self.source or container).resolve(self.key)
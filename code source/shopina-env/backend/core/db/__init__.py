@@ -0,0 +1 @@
+"""Database package initialization."""
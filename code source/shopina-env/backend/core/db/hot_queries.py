@@ -0,0 +1,129 @@
+"""
+Catalog of the hot repository and view queries checked by the index advisor.
+
+Each entry rebuilds the query the way its repository or view does, so a
+change there is picked up by ``manage.py index_advisor`` and its regression test.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet, Sum
+from django.utils import timezone
+
+from carts.models import Cart
+from carts.repositories.cart_repository import CartItemRepository
+from notifications.models import Notification
+from orders.models import Order, OrderItem
+from orders.repositories.order_repository import OrderRepository
+from payments.models import Payment
+from reviews.models import Review
+from shop.models import Product
+from shop.repositories.product_repository import ProductRepository
+
+
+User = get_user_model()
+
+COMPLETED_STATUSES = ['processing', 'completed']
+
+
+@dataclass
+class QueryContext:
+    """Rows the catalog queries are parameterised with."""
+
+    user: Any
+    product: Product
+    order: Optional[Order]
+    cart: Cart
+
+    @classmethod
+    def from_database(cls, using: str = 'default') -> 'QueryContext':
+        """
+        Pick representative rows: the latest order, its buyer and their cart.
+
+        Args:
+            using: Database alias
+
+        Returns:
+            QueryContext (user is None when the database has no orders)
+        """
+        order = Order.objects.using(using).order_by('-id').first()
+        user = order.user if order else User.objects.using(using).first()
+        carts = Cart.objects.using(using)
+        cart = carts.filter(user=user).first() or carts.order_by('-id').first()
+        # Placeholders keep the query shape (``col = ?`` rather than ``IS NULL``) on sparse databases
+        return cls(
+            user=user,
+            product=Product.objects.using(using).order_by('-id').first() or Product(pk=0),
+            order=order,
+            cart=cart or Cart(pk=0),
+        )
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    """A named query and how it is executed."""
+
+    name: str
+    build: Callable[[QueryContext], QuerySet]
+    evaluate: Callable[[QuerySet], Any] = list
+
+
+def _since(days: int):
+    return timezone.now() - timedelta(days=days)
+
+
+HOT_QUERIES: List[HotQuery] = [
+    # shop
+    HotQuery('product.top_rated', lambda ctx: ProductRepository().get_top_rated(10)),
+    HotQuery('product.active', lambda ctx: ProductRepository().get_active_products()[:20]),
+    HotQuery('product.reviews', lambda ctx: Review.objects.select_related('user', 'product').filter(product=ctx.product)),
+    # orders
+    HotQuery('order.user_orders', lambda ctx: OrderRepository().get_user_orders(ctx.user)),
+    HotQuery('order.recent', lambda ctx: OrderRepository().get_recent_orders(10)),
+    HotQuery(
+        'order.recent_30_days',
+        lambda ctx: Order.objects.filter(created_at__gte=_since(30)),
+        evaluate=lambda qs: qs.count(),
+    ),
+    HotQuery(
+        'order.dashboard_recent',
+        lambda ctx: Order.objects.select_related('user').filter(user=ctx.user).order_by('-created_at')[:6],
+    ),
+    HotQuery(
+        'order.dashboard_revenue',
+        lambda ctx: Order.objects.filter(
+            user=ctx.user, status__in=COMPLETED_STATUSES, created_at__date__gte=timezone.localdate() - timedelta(days=6),
+        ),
+        evaluate=lambda qs: qs.aggregate(total=Sum('total')),
+    ),
+    HotQuery('order.items', lambda ctx: OrderItem.objects.filter(order=ctx.order).select_related('product')),
+    # carts
+    HotQuery('cart.items', lambda ctx: CartItemRepository().get_cart_items(ctx.cart)),
+    # notifications
+    HotQuery('notification.user_list', lambda ctx: Notification.objects.filter(user=ctx.user)[:20]),
+    HotQuery(
+        'notification.unread_count',
+        lambda ctx: Notification.objects.filter(user=ctx.user, is_read=False),
+        evaluate=lambda qs: qs.count(),
+    ),
+    # payments
+    HotQuery('payment.order_payments', lambda ctx: Payment.objects.filter(order=ctx.order)),
+]
+
+
+def get_hot_queries(names: Optional[List[str]] = None) -> List[HotQuery]:
+    """
+    Get catalog entries, optionally restricted to some names.
+
+    Args:
+        names: Query names or prefixes (e.g. ``order.``); all entries when empty
+
+    Returns:
+        List of HotQuery
+    """
+    if not names:
+        return list(HOT_QUERIES)
+    return [q for q in HOT_QUERIES if any(q.name == n or q.name.startswith(n) for n in names)]
+
@@ -0,0 +1,94 @@
+"""
+Per-alias query metrics collected through connection execute wrappers.
+"""
+import threading
+import time
+from typing import Dict
+
+
+class QueryMetrics:
+    """
+    Thread-safe, process-wide counters of queries executed per database alias.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, dict] = {}
+
+    def record(self, alias: str, duration: float, failed: bool = False) -> None:
+        """
+        Record one executed statement.
+
+        Args:
+            alias: Database alias
+            duration: Execution time in seconds
+            failed: Whether the statement raised
+        """
+        with self._lock:
+            entry = self._data.setdefault(alias, {
+                'queries': 0,
+                'errors': 0,
+                'total_seconds': 0.0,
+                'max_seconds': 0.0,
+            })
+            entry['queries'] += 1
+            entry['total_seconds'] += duration
+            entry['max_seconds'] = max(entry['max_seconds'], duration)
+            if failed:
+                entry['errors'] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Get a copy of the current counters.
+
+        Returns:
+            Dictionary keyed by alias with counts and timings in milliseconds
+        """
+        with self._lock:
+            return {
+                alias: {
+                    'queries': entry['queries'],
+                    'errors': entry['errors'],
+                    'total_ms': round(entry['total_seconds'] * 1000, 3),
+                    'avg_ms': round(entry['total_seconds'] * 1000 / entry['queries'], 3) if entry['queries'] else 0.0,
+                    'max_ms': round(entry['max_seconds'] * 1000, 3),
+                }
+                for alias, entry in self._data.items()
+            }
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        with self._lock:
+            self._data.clear()
+
+
+query_metrics = QueryMetrics()
+
+
+class MetricsExecuteWrapper:
+    """Execute wrapper timing every statement run on one connection."""
+
+    def __init__(self, alias: str):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        failed = False
+        try:
+            return execute(sql, params, many, context)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            query_metrics.record(self.alias, time.perf_counter() - start, failed)
+
+
+def install_query_metrics(sender, connection, **kwargs):
+    """
+    ``connection_created`` receiver adding the metrics wrapper to a connection.
+
+    The wrapper list lives on the (thread-local) DatabaseWrapper and survives
+    reconnects, so it is only appended once.
+    """
+    if not any(isinstance(w, MetricsExecuteWrapper) for w in connection.execute_wrappers):
+        connection.execute_wrappers.append(MetricsExecuteWrapper(connection.alias))
@@ -0,0 +1,216 @@
+"""
+``EXPLAIN QUERY PLAN`` capture and composite-index advice for SQLite.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import QuerySet
+from django.db.models.expressions import Col
+from django.db.models.lookups import Lookup, Transform
+from django.db.models.sql.where import AND, WhereNode
+from django.test.utils import CaptureQueriesContext
+
+
+# Lookups an index can serve as an equality prefix, as a set probe, or as a trailing range
+EQUALITY_LOOKUPS = {'exact', 'isnull'}
+SET_LOOKUPS = {'in'}
+RANGE_LOOKUPS = {'gt', 'gte', 'lt', 'lte', 'range'}
+
+
+@dataclass
+class PlanFinding:
+    """A plan step that reads more rows or sorts more than it should."""
+
+    kind: str  # 'full_scan' or 'temp_btree'
+    detail: str
+    table: Optional[str] = None
+
+
+@dataclass
+class QueryReport:
+    """Plan analysis of one named query."""
+
+    name: str
+    table: str
+    statements: List[str] = field(default_factory=list)
+    plans: List[List[str]] = field(default_factory=list)
+    findings: List[PlanFinding] = field(default_factory=list)
+    non_sargable: List[str] = field(default_factory=list)
+    suggestion: Optional[List[str]] = None
+    model_label: str = ''
+
+    @property
+    def ok(self) -> bool:
+        return not self.findings
+
+    def suggestion_display(self) -> str:
+        if not self.suggestion:
+            return ''
+        return f"{self.model_label}: models.Index(fields={self.suggestion!r})"
+
+
+def explain(sql: str, params=None, using: str = DEFAULT_DB_ALIAS) -> List[str]:
+    """
+    Run ``EXPLAIN QUERY PLAN`` for a statement.
+
+    Args:
+        sql: SQL statement
+        params: Statement parameters
+        using: Database alias
+
+    Returns:
+        Plan detail lines in execution order
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[3] for row in cursor.fetchall()]
+
+
+def find_plan_problems(plan: List[str]) -> List[PlanFinding]:
+    """
+    Flag full table scans and temporary B-trees in a query plan.
+
+    Args:
+        plan: Plan detail lines from :func:`explain`
+
+    Returns:
+        List of findings (empty when the plan only uses index searches)
+    """
+    findings = []
+    for detail in plan:
+        words = detail.split()
+        if detail.startswith('SCAN ') and 'USING' not in detail and words[1] not in ('CONSTANT', 'SUBQUERY'):
+            findings.append(PlanFinding('full_scan', detail, table=words[1]))
+        elif detail.startswith('USE TEMP B-TREE'):
+            findings.append(PlanFinding('temp_btree', detail))
+    return findings
+
+
+def _where_lookups(node: WhereNode):
+    # Only AND-ed, non-negated predicates can be served by a single composite index
+    if node.connector != AND or node.negated:
+        return
+    for child in node.children:
+        if isinstance(child, WhereNode):
+            yield from _where_lookups(child)
+        elif isinstance(child, Lookup):
+            yield child
+
+
+def _column_usage(queryset: QuerySet) -> dict:
+    """
+    Split the base table columns a queryset filters and sorts on by how an index can use them.
+    """
+    query = queryset.query
+    opts = queryset.model._meta
+    base_alias = query.base_table
+    usage = {'equality': [], 'set': [], 'range': [], 'order': [], 'non_sargable': []}
+
+    for lookup in _where_lookups(query.where):
+        lhs = lookup.lhs
+        if isinstance(lhs, Transform):
+            source = lhs.lhs
+            if isinstance(source, Col) and source.alias == base_alias:
+                usage['non_sargable'].append(f'{source.target.name}__{lhs.lookup_name}__{lookup.lookup_name}')
+            continue
+        if not isinstance(lhs, Col) or lhs.alias != base_alias:
+            continue
+        name = lhs.target.name
+        for kind, lookups in (('equality', EQUALITY_LOOKUPS), ('set', SET_LOOKUPS), ('range', RANGE_LOOKUPS)):
+            if lookup.lookup_name in lookups and name not in usage[kind]:
+                usage[kind].append(name)
+
+    ordering = query.order_by or (opts.ordering if query.default_ordering else ())
+    for item in ordering:
+        if not isinstance(item, str) or '__' in item or item.lstrip('-') in ('?', 'pk'):
+            continue
+        try:
+            usage['order'].append(opts.get_field(item.lstrip('-')).name)
+        except FieldDoesNotExist:
+            continue
+    return usage
+
+
+def _existing_indexes(table: str, using: str) -> List[List[str]]:
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [c['columns'] for c in constraints.values() if c.get('index') or c.get('unique') or c.get('primary_key')]
+
+
+def suggest_index(queryset: QuerySet, findings: List[PlanFinding], using: str = DEFAULT_DB_ALIAS) -> Optional[List[str]]:
+    """
+    Propose a composite index for a queryset's base table.
+
+    Columns follow the equality, sort, range rule: equality predicates first,
+    then ``IN`` predicates, then the sort key (only when the plan sorts in a
+    temp B-tree), then at most one range column.
+
+    Args:
+        queryset: The analysed queryset
+        findings: Findings from its plan
+        using: Database alias
+
+    Returns:
+        Index field names, or None when no index would help or one already exists
+    """
+    table = queryset.model._meta.db_table
+    base_scan = any(f.kind == 'full_scan' and f.table == table for f in findings)
+    sorts = any(f.kind == 'temp_btree' and 'ORDER BY' in f.detail for f in findings)
+    if not (base_scan or sorts):
+        return None
+
+    usage = _column_usage(queryset)
+    fields = usage['equality'] + [name for name in usage['set'] if name not in usage['equality']]
+    if sorts:
+        fields += [name for name in usage['order'] if name not in fields]
+    fields += [name for name in usage['range'] if name not in fields][:1]
+    if not fields:
+        return None
+
+    opts = queryset.model._meta
+    columns = [opts.get_field(name).column for name in fields]
+    for existing in _existing_indexes(table, using):
+        if existing[:len(columns)] == columns:
+            return None
+    return fields
+
+
+def analyze_query(
+    name: str,
+    queryset: QuerySet,
+    evaluate: Callable[[QuerySet], Any] = list,
+    using: str = DEFAULT_DB_ALIAS,
+) -> QueryReport:
+    """
+    Execute a query, explain every statement it issued and propose an index.
+
+    Args:
+        name: Label used in reports
+        queryset: Query to analyse
+        evaluate: Terminal operation that runs the queryset (``list``, ``count``...)
+        using: Database alias
+
+    Returns:
+        QueryReport for the query
+    """
+    connection = connections[using]
+    with CaptureQueriesContext(connection) as captured:
+        evaluate(queryset.using(using))
+
+    opts = queryset.model._meta
+    report = QueryReport(name=name, table=opts.db_table, model_label=opts.label)
+    for statement in captured.captured_queries:
+        sql = statement['sql']
+        if not sql.lstrip().upper().startswith('SELECT'):
+            continue
+        plan = explain(sql, using=using)
+        report.statements.append(sql)
+        report.plans.append(plan)
+        report.findings.extend(find_plan_problems(plan))
+
+    report.non_sargable = _column_usage(queryset)['non_sargable']
+    report.suggestion = suggest_index(queryset, report.findings, using=using)
+    return report
@@ -0,0 +1,50 @@
+"""
+Local SQLite replica maintenance.
+
+The replica is a full copy of the primary produced with SQLite's online backup
+API, which copies a consistent snapshot without blocking writers for the
+duration of the copy.
+"""
+import sqlite3
+import time
+from typing import Optional
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.db.routing import get_replica_alias
+
+
+def refresh_sqlite_replica(source_alias: str = DEFAULT_DB_ALIAS,
+                           replica_alias: Optional[str] = None,
+                           pages_per_step: int = 1024) -> float:
+    """
+    Copy the primary SQLite database into the replica file.
+
+    Args:
+        source_alias: Alias of the primary database
+        replica_alias: Alias of the replica (defaults to the configured one)
+        pages_per_step: Pages copied per backup step; between steps the
+            primary is unlocked so writers are never blocked for long
+
+    Returns:
+        Duration of the copy in seconds
+
+    Raises:
+        ValueError: If either alias is not an SQLite database
+    """
+    replica_alias = replica_alias or get_replica_alias()
+    source = connections.settings[source_alias]
+    replica = connections.settings[replica_alias]
+    for alias, config in ((source_alias, source), (replica_alias, replica)):
+        if config['ENGINE'] != 'django.db.backends.sqlite3':
+            raise ValueError(f"Database '{alias}' is not SQLite; refresh it with the engine's own replication")
+
+    start = time.perf_counter()
+    src = sqlite3.connect(str(source['NAME']))
+    dst = sqlite3.connect(str(replica['NAME']))
+    try:
+        src.backup(dst, pages=pages_per_step)
+    finally:
+        dst.close()
+        src.close()
+    return time.perf_counter() - start
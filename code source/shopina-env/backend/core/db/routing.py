@@ -0,0 +1,162 @@
+"""
+Read/write database routing with an optional replica.
+
+Reads are sent to the replica only inside a ``use_replica()`` scope (reporting
+and list views opt in through ``ReplicaReadMixin``). Any write, and any read
+inside a transaction, pins the rest of the current request to the primary so
+that a request always reads its own writes. Authentication lookups (the
+session user, JWT users, login) run in a ``use_primary()`` scope and the
+permission and session tables are always read from the primary: the
+replica lags, and a stale user row would undo password changes and role
+promotions. Other reads of users, such as reports, may use the replica.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Apps whose models are never read from the replica
+PRIMARY_ONLY_APPS = ('auth', 'sessions')
+
+
+@dataclass
+class RoutingState:
+    """Routing decisions for the current request (or management command)."""
+    replica_allowed: bool = False
+    pinned_to_primary: bool = False
+    primary_only: bool = False
+
+
+_state: ContextVar[Optional[RoutingState]] = ContextVar('db_routing_state', default=None)
+
+
+def get_routing_state() -> RoutingState:
+    """
+    Return the routing state of the current context, creating it if needed.
+
+    Returns:
+        RoutingState instance
+    """
+    state = _state.get()
+    if state is None:
+        state = RoutingState()
+        _state.set(state)
+    return state
+
+
+def get_replica_alias() -> str:
+    """Return the configured replica alias name."""
+    return getattr(settings, 'DATABASE_REPLICA_ALIAS', 'replica')
+
+
+def replica_configured() -> bool:
+    """Return True when a replica database is configured."""
+    return get_replica_alias() in connections.settings
+
+
+@contextmanager
+def routing_scope():
+    """
+    Start a fresh routing state (once per request, or per background job).
+
+    Worker threads are reused across requests and jobs, so the state must
+    never leak from one unit of work into the next.
+    """
+    token = _state.set(RoutingState())
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def use_replica():
+    """
+    Allow reads in the enclosed block to be served by the replica.
+
+    Writes inside the block still go to the primary and pin later reads to it.
+    """
+    state = get_routing_state()
+    previous = state.replica_allowed
+    state.replica_allowed = True
+    try:
+        yield
+    finally:
+        state.replica_allowed = previous
+
+
+@contextmanager
+def use_primary():
+    """
+    Read from the primary in the enclosed block, even inside a replica scope.
+
+    Unlike a write, it does not pin the rest of the request: used around
+    authentication lookups, which must see the latest password and role.
+    """
+    state = get_routing_state()
+    previous = state.primary_only
+    state.primary_only = True
+    try:
+        yield
+    finally:
+        state.primary_only = previous
+
+
+def pin_to_primary() -> None:
+    """Force all remaining reads of the current request onto the primary."""
+    get_routing_state().pinned_to_primary = True
+
+
+class ReplicaRouter:
+    """
+    Database router sending opted-in reads to the replica.
+
+    Falls back to the primary when no replica is configured, so the same
+    settings work for single-database development setups.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = get_routing_state()
+        if not state.replica_allowed or state.pinned_to_primary or state.primary_only:
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            # Sessions and permissions must see the latest logout and grants
+            return DEFAULT_DB_ALIAS
+        if not replica_configured():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Reads inside a transaction must see the transaction's own writes
+            return DEFAULT_DB_ALIAS
+        return get_replica_alias()
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data, so cross-alias relations are fine
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary; it is never migrated directly
+        return db != get_replica_alias()
+
+
+class ReplicaReadMixin:
+    """
+    View mixin routing safe-method requests to the replica.
+
+    Works for both Django class-based views and DRF APIViews.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            with use_replica():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,331 @@
+"""
+Runtime slow-query log.
+
+An execute wrapper times every statement; statements slower than the
+threshold are written as JSON lines to a size-rotated local file together
+with a normalized fingerprint, redacted parameters, the calling view and
+service method, and the query plan captured the first time the fingerprint
+is seen by this process.
+"""
+import datetime
+import decimal
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+
+DEFAULTS = {
+    'ENABLED': False,
+    'THRESHOLD_MS': 100,
+    'PATH': 'slow_queries.jsonl',
+    'MAX_BYTES': 5 * 1024 * 1024,
+    'BACKUP_COUNT': 3,
+    'CAPTURE_PLANS': True,
+}
+
+# Fingerprints whose plan was already captured by this process (bounded)
+MAX_SEEN_FINGERPRINTS = 10000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+_local = threading.local()
+_seen_lock = threading.Lock()
+_seen: set = set()
+_logger_lock = threading.Lock()
+_handler: Optional[RotatingFileHandler] = None
+
+
+def get_slow_query_settings() -> dict:
+    """
+    Get the slow-query log settings.
+
+    Returns:
+        Settings ``SLOW_QUERY_LOG`` merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'SLOW_QUERY_LOG', {})}
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Normalize a statement so executions differing only in values group together.
+
+    Literals and placeholders become ``?`` and ``IN`` lists collapse to ``(...)``.
+
+    Args:
+        sql: SQL statement (with ``%s`` placeholders or inlined values)
+
+    Returns:
+        Normalized statement
+    """
+    normalized = sql.replace('%s', '?')
+    normalized = _STRING_LITERAL.sub('?', normalized)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _PLACEHOLDER_LIST.sub('(...)', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+def fingerprint_id(normalized: str) -> str:
+    """Short stable identifier of a fingerprint."""
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]
+
+
+def redact_params(params) -> list:
+    """
+    Redact statement parameters.
+
+    Numbers, booleans and NULLs are kept (ids, flags, limits); strings,
+    bytes and everything else are replaced by their type and size.
+
+    Args:
+        params: Statement parameters
+
+    Returns:
+        JSON-serializable list
+    """
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        params = list(params.values())
+    redacted = []
+    for value in params:
+        if value is None or isinstance(value, (bool, int, float)):
+            redacted.append(value)
+        elif isinstance(value, decimal.Decimal):
+            redacted.append(str(value))
+        elif isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+            redacted.append(f'<{type(value).__name__}>')
+        elif isinstance(value, (str, bytes, bytearray, memoryview)):
+            redacted.append(f'<{type(value).__name__}:{len(value)}>')
+        else:
+            redacted.append(f'<{type(value).__name__}>')
+    return redacted
+
+
+def find_callers() -> Dict[str, Optional[str]]:
+    """
+    Walk the stack for the innermost view and service/repository frames.
+
+    Returns:
+        Dictionary with ``view`` and ``service`` (``module.Class.method``) or None
+    """
+    base_dir = str(settings.BASE_DIR)
+    callers = {'view': None, 'service': None}
+    frame = sys._getframe(1)
+    while frame is not None and not (callers['view'] and callers['service']):
+        filename = frame.f_code.co_filename
+        if filename.startswith(base_dir):
+            module = frame.f_globals.get('__name__', '')
+            name = f'{module}.{frame.f_code.co_qualname}'
+            if callers['service'] is None and ('.services.' in module or '.repositories.' in module):
+                callers['service'] = name
+            elif callers['view'] is None and module.endswith('views'):
+                callers['view'] = name
+        frame = frame.f_back
+    return callers
+
+
+def _first_occurrence(fid: str) -> bool:
+    with _seen_lock:
+        if fid in _seen:
+            return False
+        if len(_seen) >= MAX_SEEN_FINGERPRINTS:
+            _seen.clear()
+        _seen.add(fid)
+        return True
+
+
+def capture_plan(connection, sql: str, params) -> Optional[List[str]]:
+    """
+    Explain a statement on the connection that just ran it.
+
+    Args:
+        connection: DatabaseWrapper
+        sql: Statement with placeholders
+        params: Statement parameters
+
+    Returns:
+        Plan lines, or None for statements that cannot be explained
+    """
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    prefix = 'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else 'EXPLAIN'
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            rows = cursor.fetchall()
+    except Exception:
+        return None
+    if connection.vendor == 'sqlite':
+        return [row[3] for row in rows]
+    return [' '.join(str(col) for col in row) for row in rows]
+
+
+def _get_logger(config: dict) -> logging.Logger:
+    global _handler
+    logger = logging.getLogger('shopina.slow_queries')
+    path = os.path.abspath(str(config['PATH']))
+    with _logger_lock:
+        if _handler is None or _handler.baseFilename != path:
+            if _handler is not None:
+                logger.removeHandler(_handler)
+                _handler.close()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _handler = RotatingFileHandler(
+                path, maxBytes=config['MAX_BYTES'], backupCount=config['BACKUP_COUNT'], encoding='utf-8',
+            )
+            _handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(_handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+    return logger
+
+
+def record_slow_query(connection, sql: str, params, duration: float, config: dict) -> dict:
+    """
+    Build and store a slow-query record.
+
+    Args:
+        connection: DatabaseWrapper the statement ran on
+        sql: Statement with placeholders
+        params: Statement parameters
+        duration: Execution time in seconds
+        config: Slow-query log settings
+
+    Returns:
+        The stored record
+    """
+    normalized = fingerprint(sql)
+    fid = fingerprint_id(normalized)
+    record = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'fingerprint_id': fid,
+        'fingerprint': normalized,
+        'alias': connection.alias,
+        'duration_ms': round(duration * 1000, 3),
+        'params': redact_params(params),
+        **find_callers(),
+        'plan': None,
+    }
+    if config['CAPTURE_PLANS'] and _first_occurrence(fid):
+        record['plan'] = capture_plan(connection, sql, params)
+    _get_logger(config).info(json.dumps(record, default=str))
+    return record
+
+
+class SlowQueryExecuteWrapper:
+    """Execute wrapper logging statements slower than the configured threshold."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        # Statements issued while recording (the EXPLAIN) are not timed themselves
+        if getattr(_local, 'recording', False):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            config = get_slow_query_settings()
+            if config['ENABLED'] and duration * 1000 >= config['THRESHOLD_MS']:
+                _local.recording = True
+                try:
+                    record_slow_query(self.connection, sql, None if many else params, duration, config)
+                except Exception:
+                    # Diagnostics must never break the query being diagnosed
+                    pass
+                finally:
+                    _local.recording = False
+
+
+def install_slow_query_log(sender, connection, **kwargs):
+    """
+    ``connection_created`` receiver adding the slow-query wrapper to a connection.
+    """
+    if not get_slow_query_settings()['ENABLED']:
+        return
+    if not any(isinstance(w, SlowQueryExecuteWrapper) for w in connection.execute_wrappers):
+        connection.execute_wrappers.append(SlowQueryExecuteWrapper(connection))
+
+
+def read_slow_queries(path: Optional[str] = None) -> Iterable[dict]:
+    """
+    Read records from the log and its rotated backups.
+
+    Args:
+        path: Log file (defaults to the configured one)
+
+    Yields:
+        Slow-query records, oldest file first
+    """
+    path = str(path or get_slow_query_settings()['PATH'])
+    files = sorted(glob.glob(f'{glob.escape(path)}.*'), reverse=True) + [path]
+    for filename in files:
+        if not os.path.exists(filename):
+            continue
+        with open(filename, encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def summarize_slow_queries(records: Iterable[dict]) -> List[dict]:
+    """
+    Group records by fingerprint, ranked by total time.
+
+    Args:
+        records: Slow-query records
+
+    Returns:
+        One entry per fingerprint with counts, timings, callers and the captured plan
+    """
+    groups: Dict[str, dict] = {}
+    for record in records:
+        entry = groups.setdefault(record['fingerprint_id'], {
+            'fingerprint_id': record['fingerprint_id'],
+            'fingerprint': record['fingerprint'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': set(),
+            'services': set(),
+            'sample_params': record.get('params'),
+            'plan': None,
+            'last_seen': None,
+        })
+        entry['count'] += 1
+        entry['total_ms'] += record['duration_ms']
+        entry['max_ms'] = max(entry['max_ms'], record['duration_ms'])
+        entry['last_seen'] = record['timestamp']
+        if record.get('view'):
+            entry['views'].add(record['view'])
+        if record.get('service'):
+            entry['services'].add(record['service'])
+        if record.get('plan') and entry['plan'] is None:
+            entry['plan'] = record['plan']
+
+    summary = []
+    for entry in groups.values():
+        entry['total_ms'] = round(entry['total_ms'], 3)
+        entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 3)
+        entry['views'] = sorted(entry['views'])
+        entry['services'] = sorted(entry['services'])
+        summary.append(entry)
+    return sorted(summary, key=lambda e: e['total_ms'], reverse=True)
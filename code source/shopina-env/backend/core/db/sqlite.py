@@ -0,0 +1,63 @@
+"""
+SQLite connection tuning applied through the ``connection_created`` signal.
+"""
+from django.conf import settings
+
+
+DEFAULTS = {
+    'ENABLED': False,
+    'JOURNAL_MODE': 'WAL',
+    'SYNCHRONOUS': 'NORMAL',
+    'MMAP_SIZE': 256 * 1024 * 1024,
+    'CACHE_SIZE': -64000,  # negative = KiB, i.e. ~64 MB of page cache
+    'BUSY_TIMEOUT': 5000,  # milliseconds
+}
+
+
+def get_sqlite_profile() -> dict:
+    """
+    Get the active SQLite tuning profile.
+
+    Returns:
+        Settings ``SQLITE_TUNING`` merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'SQLITE_TUNING', {})}
+
+
+def build_pragmas(profile: dict) -> list[str]:
+    """
+    Build the PRAGMA statements for a tuning profile.
+
+    Args:
+        profile: Tuning profile
+
+    Returns:
+        List of SQL statements
+    """
+    return [
+        f"PRAGMA journal_mode={profile['JOURNAL_MODE']}",
+        f"PRAGMA synchronous={profile['SYNCHRONOUS']}",
+        f"PRAGMA mmap_size={int(profile['MMAP_SIZE'])}",
+        f"PRAGMA cache_size={int(profile['CACHE_SIZE'])}",
+        f"PRAGMA busy_timeout={int(profile['BUSY_TIMEOUT'])}",
+    ]
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    ``connection_created`` receiver applying the tuning profile to new SQLite connections.
+
+    With persistent connections (``CONN_MAX_AGE``) this runs once per worker
+    connection instead of once per request.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    profile = get_sqlite_profile()
+    if not profile['ENABLED']:
+        return
+    if connection.settings_dict['NAME'] == ':memory:' or 'mode=memory' in str(connection.settings_dict['NAME']):
+        # WAL and mmap are meaningless for in-memory test databases
+        return
+    with connection.cursor() as cursor:
+        for statement in build_pragmas(profile):
+            cursor.execute(statement)
@@ -0,0 +1,246 @@
+"""
+Password hashing off the request worker.
+
+Password hashers are deliberately slow (hundreds of milliseconds of CPU).
+Run inline, a burst of logins occupies every request worker and starves
+all other traffic. Here the work goes through a hashing executor:
+
+- ``process``: a bounded pool of worker processes, so hashing uses at most
+  ``WORKERS`` cores while request threads simply wait on the result;
+- ``inline``: in the calling thread (tests, single-process tools).
+
+Both admit at most ``MAX_CONCURRENT`` hashes at once; further callers queue
+for up to ``QUEUE_TIMEOUT`` seconds, then get ``HashingBusyError`` (503).
+``stats()`` reports submissions, rejections, queue wait and run time.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.module_loading import import_string
+
+from core.utils.exceptions import HashingBusyError
+
+
+DEFAULTS = {
+    'EXECUTOR': 'process',  # 'process', 'inline' or a dotted path to a HashingExecutor subclass
+    'WORKERS': 2,
+    'MAX_CONCURRENT': 8,  # hashes admitted at once, running or waiting for a worker
+    'QUEUE_TIMEOUT': 5.0,  # seconds a caller waits for admission before HashingBusyError
+}
+
+
+def get_hashing_settings() -> dict:
+    """
+    Get the password hashing settings.
+
+    Returns:
+        Settings ``PASSWORD_HASHING`` merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'PASSWORD_HASHING', {})}
+
+
+def _init_worker() -> None:
+    """Pool initializer: hashers read PASSWORD_HASHERS from the Django settings."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+class HashingExecutor:
+    """
+    Runs hashing functions under a concurrency limit and keeps counters.
+
+    Subclasses implement ``_execute``.
+    """
+
+    def __init__(self, max_concurrent: int, queue_timeout: float):
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'rejected': 0,
+            'in_flight': 0,
+            'waiting': 0,
+            'wait_seconds': 0.0,
+            'run_seconds': 0.0,
+        }
+
+    def run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run ``fn(*args)`` once a slot is free.
+
+        Args:
+            fn: Module-level function (it may be sent to another process)
+            *args: Picklable arguments
+
+        Returns:
+            Result of ``fn``
+
+        Raises:
+            HashingBusyError: If no slot freed up within ``queue_timeout``
+        """
+        self._count(submitted=1, waiting=1)
+        queued = time.perf_counter()
+        admitted = self._slots.acquire(timeout=self.queue_timeout)
+        started = time.perf_counter()
+        self._count(waiting=-1, wait_seconds=started - queued)
+        if not admitted:
+            self._count(rejected=1)
+            raise HashingBusyError()
+        self._count(in_flight=1)
+        try:
+            return self._execute(fn, *args)
+        finally:
+            self._slots.release()
+            self._count(in_flight=-1, completed=1, run_seconds=time.perf_counter() - started)
+
+    def _execute(self, fn: Callable[..., Any], *args) -> Any:
+        raise NotImplementedError
+
+    def _count(self, **deltas) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                self._stats[name] += delta
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the executor counters.
+
+        Returns:
+            Counts of submitted, completed and rejected hashes, those running
+            (``in_flight``) or queued (``waiting``) now, and mean queue wait
+            and run time in milliseconds
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+        admitted_or_rejected = max(snapshot['submitted'] - snapshot['waiting'], 1)
+        snapshot['mean_wait_ms'] = round(snapshot.pop('wait_seconds') * 1000 / admitted_or_rejected, 3)
+        snapshot['mean_run_ms'] = round(snapshot.pop('run_seconds') * 1000 / max(snapshot['completed'], 1), 3)
+        return snapshot
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InlineHashingExecutor(HashingExecutor):
+    """Hashes in the calling thread; still bounded by ``MAX_CONCURRENT``."""
+
+    def _execute(self, fn, *args):
+        return fn(*args)
+
+
+class ProcessHashingExecutor(HashingExecutor):
+    """Hashes in a pool of ``workers`` processes, created on first use."""
+
+    def __init__(self, max_concurrent: int, queue_timeout: float, workers: int):
+        super().__init__(max_concurrent, queue_timeout)
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # A pool inherited through fork (e.g. a preloading server) belongs to the parent
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    # spawn, not fork: request threads may hold locks at fork time
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker,
+                    )
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _execute(self, fn, *args):
+        return self._get_pool().submit(fn, *args).result()
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+EXECUTORS = {
+    'process': ProcessHashingExecutor,
+    'inline': InlineHashingExecutor,
+}
+
+_executor: Optional[HashingExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_hashing_executor() -> HashingExecutor:
+    """
+    Return the process-wide hashing executor, built from the settings on first use.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                config = get_hashing_settings()
+                name = config['EXECUTOR']
+                cls = EXECUTORS[name] if name in EXECUTORS else import_string(name)
+                kwargs = {'max_concurrent': config['MAX_CONCURRENT'], 'queue_timeout': config['QUEUE_TIMEOUT']}
+                if issubclass(cls, ProcessHashingExecutor):
+                    kwargs['workers'] = config['WORKERS']
+                _executor = cls(**kwargs)
+    return _executor
+
+
+def reset_hashing_executor() -> None:
+    """Shut the executor down; the next call builds a new one (after settings changes)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+        _executor = None
+
+
+atexit.register(reset_hashing_executor)
+
+
+def make_password(password: Optional[str]) -> str:
+    """
+    Hash a password with the preferred hasher, off the request worker.
+
+    Args:
+        password: Raw password
+
+    Returns:
+        Encoded password for ``User.password``
+    """
+    return get_hashing_executor().run(hashers.make_password, password)
+
+
+def check_password(user, password: Optional[str]) -> bool:
+    """
+    Check a user's password, off the request worker.
+
+    Same semantics as ``User.check_password``: a correct password stored
+    with an outdated hasher or work factor is re-hashed and saved.
+
+    Args:
+        user: User instance
+        password: Raw password
+
+    Returns:
+        True if the password is correct
+    """
+    is_correct, must_update = get_hashing_executor().run(hashers.verify_password, password, user.password)
+    if is_correct and must_update:
+        user.password = make_password(password)
+        user.save(update_fields=['password'])
+    return is_correct
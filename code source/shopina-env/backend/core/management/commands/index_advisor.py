@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.db.hot_queries import QueryContext, get_hot_queries
+from core.db.query_plans import analyze_query
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the hot repository and view queries against the current (seeded) database, '
+        'capture EXPLAIN QUERY PLAN, flag full scans and temp B-trees and propose composite indexes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='*', help='Query names or prefixes (default: all)')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to analyse')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+        parser.add_argument(
+            '--fail-on-findings', action='store_true',
+            help='Exit with an error when any query scans a table or sorts in a temp B-tree',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'sqlite':
+            raise CommandError('The index advisor reads SQLite query plans; point it at a SQLite database')
+
+        queries = get_hot_queries(options['queries'])
+        if not queries:
+            raise CommandError(f"No hot query matches {options['queries']}")
+
+        context = QueryContext.from_database(using)
+        if context.user is None or context.order is None:
+            raise CommandError('The database has no users or orders; seed it first (python seed_data.py)')
+
+        reports = [analyze_query(q.name, q.build(context), q.evaluate, using=using) for q in queries]
+
+        if options['json']:
+            self.stdout.write(json.dumps([
+                {
+                    'name': r.name,
+                    'table': r.table,
+                    'plans': r.plans,
+                    'findings': [{'kind': f.kind, 'detail': f.detail} for f in r.findings],
+                    'non_sargable': r.non_sargable,
+                    'suggested_index': r.suggestion,
+                }
+                for r in reports
+            ], indent=2))
+        else:
+            self._print(reports, options['verbosity'])
+
+        flagged = [r for r in reports if not r.ok]
+        if flagged and options['fail_on_findings']:
+            raise CommandError(f"{len(flagged)} hot queries scan or sort without an index")
+
+    def _print(self, reports, verbosity: int):
+        for report in reports:
+            style = self.style.SUCCESS if report.ok else self.style.WARNING
+            self.stdout.write(style(f"{'OK  ' if report.ok else 'WARN'} {report.name} ({report.table})"))
+            if verbosity >= 2:
+                for sql, plan in zip(report.statements, report.plans):
+                    self.stdout.write(f'     {sql}')
+                    for line in plan:
+                        self.stdout.write(f'       -> {line}')
+            for finding in report.findings:
+                self.stdout.write(f'     {finding.kind}: {finding.detail}')
+            for lookup in report.non_sargable:
+                self.stdout.write(f'     not index-friendly: {lookup} wraps the column in a function')
+            if report.suggestion:
+                self.stdout.write(self.style.NOTICE(f'     suggest {report.suggestion_display()}'))
+
+        suggestions = sorted({r.suggestion_display() for r in reports if r.suggestion})
+        if suggestions:
+            self.stdout.write(self.style.MIGRATE_HEADING('Proposed indexes:'))
+            for line in suggestions:
+                self.stdout.write(f'  {line}')
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db.replica import refresh_sqlite_replica
+from core.db.routing import get_replica_alias, replica_configured
+
+
+class Command(BaseCommand):
+    help = 'Refresh the local SQLite read replica from the primary database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep running and refresh every INTERVAL seconds (0 = refresh once)',
+        )
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError(
+                f"No '{get_replica_alias()}' database configured. Set SQLITE_REPLICA_PATH to enable the replica."
+            )
+
+        interval = options['interval']
+        while True:
+            try:
+                duration = refresh_sqlite_replica()
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f'Replica refreshed in {duration * 1000:.1f} ms'))
+            if interval <= 0:
+                break
+            time.sleep(interval)
@@ -0,0 +1,27 @@
+"""
+Authentication middleware resolving the session user on the primary.
+"""
+from functools import partial
+
+from django.contrib.auth.middleware import AuthenticationMiddleware as DjangoAuthenticationMiddleware, get_user
+from django.utils.functional import SimpleLazyObject
+
+from core.db.routing import use_primary
+
+
+def get_user_from_primary(request):
+    # request.user is resolved lazily, often inside a view reading from the replica
+    with use_primary():
+        return get_user(request)
+
+
+class AuthenticationMiddleware(DjangoAuthenticationMiddleware):
+    """
+    Django's ``AuthenticationMiddleware`` with the session user loaded from the primary.
+
+    Covers every authentication backend, including allauth's.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(partial(get_user_from_primary, request))
@@ -0,0 +1,20 @@
+"""
+Middleware giving every request its own database routing state.
+"""
+from core.db.routing import routing_scope
+
+
+class DatabaseRoutingMiddleware:
+    """
+    Start each request with a clean routing state.
+
+    Reads default to the primary; views opt into the replica with
+    ``ReplicaReadMixin`` and the first write pins the request to the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with routing_scope():
+            return self.get_response(request)
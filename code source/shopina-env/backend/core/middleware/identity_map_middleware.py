@@ -0,0 +1,20 @@
+"""
+Middleware giving every request its own repository identity map.
+"""
+from core.repositories.identity_map import identity_map_scope
+
+
+class IdentityMapMiddleware:
+    """
+    Open a fresh identity map for each request and drop it when the response is ready.
+
+    Repositories consult the map before querying, so a row looked up several
+    times while handling one request is only read once.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_map_scope():
+            return self.get_response(request)
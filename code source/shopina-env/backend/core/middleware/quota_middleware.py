@@ -0,0 +1,66 @@
+"""
+Middleware enforcing plan-tiered API quotas.
+"""
+from django.contrib.auth import SESSION_KEY
+from django.http import JsonResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.container import container
+from payments.services.quota_service import QuotaService, get_quota_settings, rate_limit_headers
+
+
+class APIQuotaMiddleware:
+    """
+    Count API requests against the caller's plan and reject those over the limits.
+
+    The caller is taken from the JWT access token (signature and expiry are
+    checked; the user row is not loaded) or from the session. Anonymous and
+    invalid-token requests pass through untouched: authentication rejects
+    them later. Responses carry ``X-RateLimit-*`` headers; rejected requests
+    get a 429 with ``Retry-After`` before any view or query runs.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._jwt = JWTAuthentication()
+
+    def __call__(self, request):
+        config = get_quota_settings()
+        if (
+            not config['ENABLED']
+            or not request.path.startswith(config['PATH_PREFIX'])
+            or request.path in config['EXEMPT_PATHS']
+        ):
+            return self.get_response(request)
+
+        user_id = self._get_user_id(request)
+        result = container.resolve(QuotaService).consume(user_id) if user_id is not None else None
+        if result is None:
+            return self.get_response(request)
+
+        if result['allowed']:
+            response = self.get_response(request)
+        else:
+            state = next(result[name] for name in ('burst', 'quota') if name in result and not result[name].allowed)
+            response = JsonResponse(
+                {'error': f"API rate limit of the {result['plan']!r} plan exceeded", 'retry_after': state.retry_after},
+                status=429,
+            )
+            response['Retry-After'] = str(max(state.retry_after, 1))
+        for name, value in rate_limit_headers(result).items():
+            response[name] = value
+        return response
+
+    def _get_user_id(self, request):
+        header = self._jwt.get_header(request)
+        if header is not None:
+            try:
+                raw_token = self._jwt.get_raw_token(header)
+                return AccessToken(raw_token).get(api_settings.USER_ID_CLAIM) if raw_token else None
+            except (AuthenticationFailed, TokenError):
+                return None
+        session = getattr(request, 'session', None)
+        return session.get(SESSION_KEY) if session is not None else None
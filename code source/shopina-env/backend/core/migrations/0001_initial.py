@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('operation', models.CharField(max_length=100)),
+                ('service', models.CharField(blank=True, max_length=100)),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user_id', 'created_at'], name='audit_user_created_idx'), models.Index(fields=['operation', 'created_at'], name='audit_operation_created_idx'), models.Index(fields=['created_at'], name='audit_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+"""
+Core models shared across apps.
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class AuditEvent(models.Model):
+    """
+    Append-only record of a service operation.
+
+    Written in batches by ``core.audit.writer``; ``user_id`` is a plain column
+    rather than a foreign key so events outlive the accounts they mention and
+    inserts never need to look users up.
+    """
+    operation = models.CharField(max_length=100)
+    service = models.CharField(max_length=100, blank=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    details = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user_id', 'created_at'], name='audit_user_created_idx'),
+            models.Index(fields=['operation', 'created_at'], name='audit_operation_created_idx'),
+            models.Index(fields=['created_at'], name='audit_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.operation} ({self.created_at:%Y-%m-%d %H:%M:%S})"
@@ -0,0 +1,49 @@
+"""
+Audit event repository for querying the audit trail.
+"""
+from datetime import datetime
+from typing import Optional
+
+from django.db.models import QuerySet
+
+from core.models import AuditEvent
+from core.repositories.base import BaseRepository
+
+
+class AuditEventRepository(BaseRepository[AuditEvent]):
+    """
+    Repository for AuditEvent model data access.
+    """
+
+    def __init__(self):
+        super().__init__(AuditEvent)
+
+    def query(
+        self,
+        user_id: Optional[int] = None,
+        operation: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> QuerySet[AuditEvent]:
+        """
+        Filter audit events, newest first.
+
+        Args:
+            user_id: Only events about this user
+            operation: Only this operation (e.g. ``order_created``)
+            since: Only events at or after this time
+            until: Only events before this time
+
+        Returns:
+            QuerySet of audit events
+        """
+        queryset = self.model.objects.all()
+        if user_id is not None:
+            queryset = queryset.filter(user_id=user_id)
+        if operation:
+            queryset = queryset.filter(operation=operation)
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+        if until is not None:
+            queryset = queryset.filter(created_at__lt=until)
+        return queryset
@@ -2,9 +2,12 @@
 Base repository class for data access abstraction.
 Following the Repository Pattern.
 """
-from typing import Generic, TypeVar, Optional, List, Dict, Any
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Sequence, TypeVar
+from django.core.exceptions import FieldDoesNotExist
 from django.db import models
-from django.db.models import QuerySet
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from core.repositories.identity_map import forget, get_identity_map, invalidate
 
 
 ModelType = TypeVar('ModelType', bound=models.Model)
@@ -29,16 +32,43 @@ class BaseRepository(Generic[ModelType]):
         """
         Get a single instance by ID.
         
+        Within a request, repeated lookups of the same row return the same
+        instance from the identity map without querying.
+        
         Args:
             id: Primary key of the instance
             
         Returns:
             Model instance or None
         """
-        try:
-            return self.model.objects.get(pk=id)
-        except self.model.DoesNotExist:
-            return None
+        def load():
+            try:
+                return self.model.objects.get(pk=id)
+            except self.model.DoesNotExist:
+                return None
+        
+        return self._get_mapped(id, load)
+    
+    def _get_mapped(self, key: Hashable, load: Callable[[], Optional[ModelType]]) -> Optional[ModelType]:
+        """
+        Look ``key`` up in the request's identity map, loading it on a miss.
+        
+        Args:
+            key: Primary key, or a natural key such as ``('user', user_id)``
+            load: Query returning the instance or None (misses are not mapped)
+            
+        Returns:
+            Model instance or None
+        """
+        identity_map = get_identity_map()
+        if identity_map is None:
+            return load()
+        instance = identity_map.get(self.model, key)
+        if instance is None:
+            instance = load()
+            if instance is not None:
+                identity_map.add(instance, key)
+        return instance
     
     def get_all(self) -> QuerySet[ModelType]:
         """
@@ -75,7 +105,8 @@ class BaseRepository(Generic[ModelType]):
     
     def update(self, instance: ModelType, **kwargs) -> ModelType:
         """
-        Update an existing instance.
+        Update an existing instance, writing only the given fields
+        (plus ``auto_now`` timestamps).
         
         Args:
             instance: Instance to update
@@ -86,9 +117,152 @@ class BaseRepository(Generic[ModelType]):
         """
         for key, value in kwargs.items():
             setattr(instance, key, value)
-        instance.save()
+        if instance._state.adding:
+            instance.save()
+        else:
+            # Only write the changed columns (full save if a key is not a plain field)
+            instance.save(update_fields=self._update_fields(kwargs))
         return instance
     
+    def _update_fields(self, names: Iterable[str]) -> Optional[List[str]]:
+        """
+        Columns to write when ``names`` change: the fields themselves plus ``auto_now`` ones.
+        
+        Returns:
+            Field names, or None when a name is not a concrete field
+        """
+        fields = set()
+        for name in names:
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.many_to_many or field.primary_key:
+                return None
+            fields.add(field.name)
+        fields.update(
+            field.name for field in self.model._meta.concrete_fields if getattr(field, 'auto_now', False)
+        )
+        return sorted(fields)
+    
+    def get_many(self, ids: Iterable[Any]) -> Dict[Any, ModelType]:
+        """
+        Get several instances by ID in one query.
+        
+        Instances already in the request's identity map are not re-read.
+        
+        Args:
+            ids: Primary keys
+            
+        Returns:
+            Dictionary of primary key to instance (missing IDs are absent)
+        """
+        ids = list(dict.fromkeys(ids))
+        identity_map = get_identity_map()
+        found = {}
+        if identity_map is not None:
+            for pk in ids:
+                instance = identity_map.get(self.model, pk)
+                if instance is not None:
+                    found[pk] = instance
+        missing = [pk for pk in ids if pk not in found]
+        if missing:
+            loaded = self.model.objects.in_bulk(missing)
+            if identity_map is not None:
+                for instance in loaded.values():
+                    identity_map.add(instance)
+            found.update(loaded)
+        return found
+    
+    def bulk_create(self, instances: Sequence[ModelType], batch_size: Optional[int] = None) -> List[ModelType]:
+        """
+        Insert many instances with batched INSERT statements.
+        
+        ``save()`` is not called, so no ``post_save`` signals are sent.
+        
+        Args:
+            instances: Unsaved instances
+            batch_size: Rows per INSERT (None for a single statement where the backend allows)
+            
+        Returns:
+            Created instances
+        """
+        return self.model.objects.bulk_create(instances, batch_size=batch_size)
+    
+    def bulk_update(self, instances: Sequence[ModelType], fields: Sequence[str],
+                    batch_size: Optional[int] = None) -> int:
+        """
+        Write the given fields of many instances with batched UPDATE statements.
+        
+        Args:
+            instances: Saved instances carrying the new values
+            fields: Field names to write
+            batch_size: Rows per statement
+            
+        Returns:
+            Number of rows updated
+        """
+        updated = self.model.objects.bulk_update(instances, fields, batch_size=batch_size)
+        invalidate(self.model)
+        return updated
+    
+    def update_where(self, condition: Any = None, **values) -> int:
+        """
+        Conditional atomic update in a single UPDATE statement.
+        
+        Values may be ``F()`` expressions, so counters change without a
+        read-modify-write race, and the condition can guard the change
+        (e.g. only decrease stock that is still available).
+        
+        Args:
+            condition: ``Q`` object or dictionary of filter lookups
+            **values: Columns to set
+            
+        Returns:
+            Number of rows updated (0 when the condition did not match)
+        """
+        if isinstance(condition, dict):
+            condition = Q(**condition)
+        queryset = self.model.objects.filter(condition) if condition is not None else self.model.objects.all()
+        now = timezone.now()
+        # queryset.update() bypasses save(), so auto_now fields are set here
+        auto_now = {
+            field.name: now if isinstance(field, models.DateTimeField) else timezone.localdate(now)
+            for field in self.model._meta.concrete_fields
+            if getattr(field, 'auto_now', False) and field.name not in values
+        }
+        updated = queryset.update(**values, **auto_now)
+        invalidate(self.model)
+        return updated
+    
+    def upsert(self, instances: Sequence[ModelType], unique_fields: Sequence[str], update_fields: Sequence[str],
+               batch_size: Optional[int] = None) -> List[ModelType]:
+        """
+        Insert instances, updating ``update_fields`` of rows that already exist.
+        
+        Uses ``INSERT ... ON CONFLICT DO UPDATE``; ``unique_fields`` must be
+        covered by a unique constraint. Primary keys of updated rows are not
+        set on the returned instances on every backend.
+        
+        Args:
+            instances: Unsaved instances
+            unique_fields: Fields identifying an existing row
+            update_fields: Fields overwritten on conflict
+            batch_size: Rows per statement
+            
+        Returns:
+            The instances
+        """
+        created = self.model.objects.bulk_create(
+            instances,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+        invalidate(self.model)
+        return created
+    
     def delete(self, instance: ModelType) -> None:
         """
         Delete an instance.
@@ -96,6 +270,7 @@ class BaseRepository(Generic[ModelType]):
         Args:
             instance: Instance to delete
         """
+        forget(instance)
         instance.delete()
     
     def exists(self, **kwargs) -> bool:
@@ -0,0 +1,179 @@
+"""
+Request-scoped identity map for repositories.
+
+Inside an ``identity_map_scope()`` (opened per request by
+``IdentityMapMiddleware``) repositories hand out a single instance per row:
+the first lookup queries the database and every later lookup of the same
+key returns that instance without a query. Outside a scope nothing is
+cached, so management commands and background jobs behave as before.
+
+Consistency rules:
+
+- Saves of a mapped row replace or keep the mapped instance (``post_save``),
+  so later lookups see the request's own writes.
+- Entries loaded or saved inside a transaction only stay valid once the
+  transaction commits; if it (or the savepoint) rolls back they are dropped
+  and the next lookup queries again.
+- Queryset-level ``update()``/``delete()`` and cascades send no per-row
+  signal; repositories doing those call :func:`invalidate`.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+
+
+class _PendingCommit:
+    """``on_commit`` callback marking entries written inside a transaction as durable."""
+
+    __slots__ = ('committed',)
+
+    def __init__(self):
+        self.committed = False
+
+    def __call__(self):
+        self.committed = True
+
+    def is_valid(self) -> bool:
+        if self.committed:
+            return True
+        # Still queued means the transaction (and savepoint) that wrote the entry is open;
+        # Django drops the callbacks of rolled-back transactions and savepoints
+        return any(callback is self for _, callback, _ in connections[DEFAULT_DB_ALIAS].run_on_commit)
+
+
+def _pending_marker() -> Optional[_PendingCommit]:
+    if not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return None
+    marker = _PendingCommit()
+    transaction.on_commit(marker)
+    return marker
+
+
+class IdentityMap:
+    """
+    One instance per (model, key) for the current unit of work.
+
+    Keys are primary keys, or any hashable natural key (e.g.
+    ``('user', 42)``) chosen by the repository that stores it.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Hashable, Tuple[models.Model, Optional[_PendingCommit]]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model: type[models.Model], key: Hashable) -> Optional[Any]:
+        """
+        Return the mapped instance for ``key``, or None on a miss.
+
+        Args:
+            model: Model class
+            key: Primary key or natural key
+
+        Returns:
+            Model instance or None
+        """
+        entries = self._entries.get(model._meta.label)
+        entry = entries.get(key) if entries else None
+        if entry is not None and entry[1] is not None and not entry[1].is_valid():
+            # Written by a transaction that rolled back
+            self.discard_instance(entry[0])
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def add(self, instance: models.Model, *keys: Hashable) -> models.Model:
+        """
+        Map an instance under its primary key and any extra natural keys.
+
+        Args:
+            instance: Loaded or saved instance
+            *keys: Additional keys the instance can be looked up by
+
+        Returns:
+            The instance
+        """
+        entries = self._entries.setdefault(instance._meta.label, {})
+        marker = _pending_marker()
+        for key in (instance.pk, *keys):
+            entries[key] = (instance, marker)
+        return instance
+
+    def saved(self, instance: models.Model) -> None:
+        """Record a save: the saved instance becomes the mapped one for all its keys."""
+        entries = self._entries.get(instance._meta.label)
+        if not entries:
+            return
+        marker = _pending_marker()
+        for key, (mapped, _) in list(entries.items()):
+            if mapped is instance or (mapped.pk == instance.pk and instance.pk is not None):
+                entries[key] = (instance, marker)
+
+    def discard_instance(self, instance: models.Model) -> None:
+        """Forget every key mapping to ``instance`` (or to its row)."""
+        entries = self._entries.get(instance._meta.label)
+        if not entries:
+            return
+        for key, (mapped, _) in list(entries.items()):
+            if mapped is instance or mapped.pk == instance.pk:
+                del entries[key]
+
+    def invalidate(self, model: type[models.Model]) -> None:
+        """Forget every instance of ``model``."""
+        self._entries.pop(model._meta.label, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_current: ContextVar[Optional[IdentityMap]] = ContextVar('identity_map', default=None)
+
+
+def get_identity_map() -> Optional[IdentityMap]:
+    """
+    Return the identity map of the current scope.
+
+    Returns:
+        IdentityMap, or None outside an ``identity_map_scope()``
+    """
+    return _current.get()
+
+
+@contextmanager
+def identity_map_scope():
+    """
+    Give the enclosed unit of work (a request) its own, empty identity map.
+    """
+    identity_map = IdentityMap()
+    token = _current.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _current.reset(token)
+        identity_map.clear()
+
+
+def invalidate(model: type[models.Model]) -> None:
+    """Drop mapped instances of ``model`` after a bulk write bypassing ``save()``."""
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.invalidate(model)
+
+
+def forget(instance: models.Model) -> None:
+    """Drop a mapped instance, e.g. before deleting it."""
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.discard_instance(instance)
+
+
+def track_save(sender, instance, raw=False, **kwargs):
+    """``post_save`` receiver keeping the current identity map in step with saves."""
+    identity_map = _current.get()
+    if identity_map is not None and not raw:
+        identity_map.saved(instance)
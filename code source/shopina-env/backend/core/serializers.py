@@ -0,0 +1,14 @@
+"""
+Serializers for core operational endpoints.
+"""
+from rest_framework import serializers
+
+from core.models import AuditEvent
+
+
+class AuditEventSerializer(serializers.ModelSerializer):
+    """Serializer for audit events."""
+
+    class Meta:
+        model = AuditEvent
+        fields = ('id', 'operation', 'service', 'user_id', 'details', 'created_at')
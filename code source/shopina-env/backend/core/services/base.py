@@ -5,6 +5,8 @@ Following the Service Layer Pattern.
 from typing import Generic, TypeVar, Optional, List
 from django.db import models
 
+from core.audit.writer import audit_trail
+
 
 ModelType = TypeVar('ModelType', bound=models.Model)
 
@@ -41,9 +43,11 @@ class BaseService(Generic[ModelType]):
         """
         Log service operations for audit trail.
         
+        The event is queued once the current transaction commits and written
+        in batches by a background writer, so this never blocks the request.
+        
         Args:
             operation: Name of the operation
-            details: Operation details
+            details: Operation details (``user_id`` is indexed for queries)
         """
-        # TODO: Implement proper logging
-        pass
+        audit_trail.record(operation, details, service=type(self).__name__)
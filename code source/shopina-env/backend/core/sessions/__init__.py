@@ -0,0 +1 @@
+"""Session backends."""
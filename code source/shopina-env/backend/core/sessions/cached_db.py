@@ -0,0 +1,123 @@
+"""
+Cached-database session backend with coalesced expiry refreshes.
+
+Reads go through the cache like Django's ``cached_db`` backend. With
+``SESSION_SAVE_EVERY_REQUEST`` every response re-saves the session just to
+push its expiry forward; here such expiry-only saves refresh the cached
+copy and reach the database at most once per ``WRITE_INTERVAL`` seconds
+per session. Changes to the session data are always written through.
+
+The row's ``expire_date`` therefore lags by at most ``WRITE_INTERVAL``,
+which must stay well below ``SESSION_COOKIE_AGE``.
+
+A per-process ``LocMemCache`` as ``SESSION_CACHE_ALIAS`` would keep
+serving a session another worker has logged out, so with one sessions are
+read from the database and only the "written recently" markers live in the
+cache: an expiry-only save is skipped while this process wrote the row
+less than ``WRITE_INTERVAL`` ago. Skipping a write cannot bring back a
+deleted session. With a cache shared by every worker (Redis, Memcached)
+reads are served from the cache as well.
+
+``clear_expired`` (used by ``manage.py clearsessions``) deletes expired
+rows in short batches instead of one large DELETE.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+
+DEFAULTS = {
+    'WRITE_INTERVAL': 300,
+    'CLEANUP_BATCH_SIZE': 1000,
+}
+
+
+def get_session_settings() -> dict:
+    """
+    Return the session write settings merged over the defaults.
+
+    Returns:
+        Dictionary with ``WRITE_INTERVAL`` and ``CLEANUP_BATCH_SIZE``
+    """
+    return {**DEFAULTS, **getattr(settings, 'SESSION_WRITES', {})}
+
+
+class SessionStore(CachedDBStore):
+    """Cached-DB session store that coalesces expiry-only writes."""
+
+    @property
+    def persisted_key(self) -> str:
+        # Present while the row was written less than WRITE_INTERVAL ago
+        return f'{self.cache_key}:persisted'
+
+    @property
+    def cache_is_shared(self) -> bool:
+        # Each process has its own LocMemCache: other workers would not see a logout
+        return not isinstance(self._cache, LocMemCache)
+
+    def load(self):
+        if not self.cache_is_shared:
+            return DBStore.load(self)
+        return super().load()
+
+    def exists(self, session_key):
+        if not self.cache_is_shared:
+            return DBStore.exists(self, session_key)
+        return super().exists(session_key)
+
+    def save(self, must_create=False):
+        interval = get_session_settings()['WRITE_INTERVAL']
+        if (
+            interval
+            and not must_create
+            and not self.modified
+            and self.session_key is not None
+            and self._cache.get(self.persisted_key) is not None
+        ):
+            # Expiry-only refresh: the row catches up later; a shared cache keeps the current expiry
+            if self.cache_is_shared:
+                self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+            return
+        if self.cache_is_shared:
+            super().save(must_create)
+        else:
+            DBStore.save(self, must_create)
+        if interval:
+            self._cache.set(self.persisted_key, True, interval)
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        if self.cache_is_shared:
+            super().delete(session_key)
+        else:
+            DBStore.delete(self, session_key)
+        if key:
+            self._cache.delete(f'{self.cache_key_prefix}{key}:persisted')
+
+    @classmethod
+    def clear_expired(cls, batch_size=None) -> int:
+        """
+        Delete expired sessions in batches, each in its own short statement.
+
+        Args:
+            batch_size: Rows per DELETE (``CLEANUP_BATCH_SIZE`` by default)
+
+        Returns:
+            Number of sessions deleted
+        """
+        batch_size = batch_size or get_session_settings()['CLEANUP_BATCH_SIZE']
+        model = cls.get_model_class()
+        now = timezone.now()
+        deleted = 0
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
+            if len(keys) < batch_size:
+                break
+        return deleted
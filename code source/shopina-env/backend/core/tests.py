@@ -0,0 +1,529 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.sessions.models import Session
+from django.core.cache import cache, caches
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from carts.services.cart_service import CartService
+from carts.views import CartValidateView
+from core.audit.writer import AuditTrail
+from core.container import Container, container
+from core.hashing import InlineHashingExecutor, check_password
+from core.cache.stale_while_revalidate import StaleWhileRevalidateCache
+from core.db import slow_queries
+from core.db.hot_queries import QueryContext, get_hot_queries
+from core.db.query_plans import analyze_query
+from core.db.routing import ReplicaRouter, get_routing_state, routing_scope, use_primary, use_replica
+from core.db.sqlite import build_pragmas, get_sqlite_profile
+from core.middleware.authentication_middleware import AuthenticationMiddleware
+from core.repositories.audit_repository import AuditEventRepository
+from core.repositories.identity_map import identity_map_scope
+from core.sessions.cached_db import SessionStore
+from core.throttling import TokenBucketStore, buckets
+from core.utils.bloom import BloomFilter
+from core.utils.exceptions import HashingBusyError
+from orders.admin import OrderAdmin
+from orders.models import Order
+from orders.services.order_service import OrderService
+from shop.models import Category, Product
+from shop.repositories.product_repository import ProductRepository
+
+
+class StaleWhileRevalidateCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.swr = StaleWhileRevalidateCache(namespace='test', settings_name='DASHBOARD_CACHE')
+        self.calls = 0
+
+    def _compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_fresh_value_is_served_from_cache(self):
+        self.assertEqual(self.swr.get('k', self._compute), 1)
+        self.assertEqual(self.swr.get('k', self._compute), 1)
+        self.assertEqual(self.calls, 1)
+
+    @override_settings(DASHBOARD_CACHE={'FRESH_SECONDS': -1, 'BACKGROUND_REFRESH': False})
+    def test_stale_value_is_served_while_refreshing(self):
+        self.swr.get('k', self._compute)
+        # The stale value is returned, the refreshed one is visible on the next read
+        self.assertEqual(self.swr.get('k', self._compute), 1)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(cache.get('swr:test:k')['value'], 2)
+
+    def test_refresh_and_invalidate_force_recomputation(self):
+        self.swr.get('k', self._compute)
+        self.assertEqual(self.swr.refresh('k', self._compute), 2)
+        self.swr.invalidate('k')
+        self.assertEqual(self.swr.get('k', self._compute), 3)
+
+
+@patch('core.db.routing.replica_configured', return_value=True)
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_use_primary_outside_replica_scope(self, _):
+        with routing_scope():
+            self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    def test_replica_scope_reads_until_first_write(self, _):
+        with routing_scope(), use_replica():
+            with patch('core.db.routing.connections') as conns:
+                conns.__getitem__.return_value.in_atomic_block = False
+                self.assertEqual(self.router.db_for_read(Product), 'replica')
+                self.assertEqual(self.router.db_for_write(Product), 'default')
+                # Read-after-write within the same request stays on the primary
+                self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    def test_auth_lookups_are_read_from_primary(self, _):
+        with routing_scope(), use_replica():
+            with patch('core.db.routing.connections') as conns:
+                conns.__getitem__.return_value.in_atomic_block = False
+                self.assertEqual(self.router.db_for_read(Session), 'default')
+                # Reports over users may use the replica; authentication lookups may not
+                self.assertEqual(self.router.db_for_read(get_user_model()), 'replica')
+                with use_primary():
+                    self.assertEqual(self.router.db_for_read(get_user_model()), 'default')
+                # Not pinned: later reads go back to the replica
+                self.assertEqual(self.router.db_for_read(get_user_model()), 'replica')
+
+    def test_session_user_is_resolved_on_primary(self, _):
+        request = RequestFactory().get('/')
+        request.session = {}
+        AuthenticationMiddleware(lambda r: None).process_request(request)
+        with routing_scope(), use_replica():
+            with patch('core.middleware.authentication_middleware.get_user',
+                       side_effect=lambda r: get_routing_state().primary_only):
+                request.user._setup()
+        self.assertIs(request.user._wrapped, True)
+
+    def test_replica_is_never_migrated(self, _):
+        self.assertFalse(self.router.allow_migrate('replica', 'shop'))
+        self.assertTrue(self.router.allow_migrate('default', 'shop'))
+
+
+class SQLiteProfileTests(TestCase):
+    @override_settings(SQLITE_TUNING={'ENABLED': True, 'SYNCHRONOUS': 'FULL'})
+    def test_profile_overrides_are_merged_over_defaults(self):
+        pragmas = build_pragmas(get_sqlite_profile())
+        self.assertIn('PRAGMA journal_mode=WAL', pragmas)
+        self.assertIn('PRAGMA synchronous=FULL', pragmas)
+
+
+class HotQueryPlanTests(TestCase):
+    """Fails when a hot query loses its index (see ``manage.py index_advisor``)."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='plan', email='plan@example.com', password='pass')
+        product = Product.objects.create(name='Plan product', category=Category.objects.create(name='Plans'), price=5)
+        order = Order.objects.create(user=user, total=5, status='completed')
+        order.items.create(product=product, price=5, quantity=1)
+
+    def test_hot_queries_use_indexes(self):
+        context = QueryContext.from_database()
+        for query in get_hot_queries():
+            report = analyze_query(query.name, query.build(context), query.evaluate)
+            with self.subTest(query=query.name):
+                self.assertTrue(report.ok, [f.detail for f in report.findings])
+
+
+class SlowQueryLogTests(TestCase):
+    def test_fingerprint_normalizes_values(self):
+        a = slow_queries.fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'bob'")
+        b = slow_queries.fingerprint("SELECT *  FROM t WHERE id IN (%s) AND name = 'alice'")
+        self.assertEqual(a, b)
+        self.assertEqual(slow_queries.redact_params([7, 'secret@example.com', None]), [7, '<str:18>', None])
+
+    def test_slow_statement_is_logged_with_plan_and_caller(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'slow.jsonl')
+            slow_queries._seen.clear()
+            with override_settings(SLOW_QUERY_LOG={'ENABLED': True, 'THRESHOLD_MS': 0, 'PATH': path}), \
+                    connection.execute_wrapper(slow_queries.SlowQueryExecuteWrapper(connection)):
+                ProductRepository().get_by_slug('missing')
+                ProductRepository().get_by_slug('also-missing')
+            summary = slow_queries.summarize_slow_queries(slow_queries.read_slow_queries(path))
+
+        entry = summary[0]
+        self.assertEqual(entry['count'], 2)
+        self.assertEqual(entry['sample_params'], ['<str:7>'])
+        self.assertTrue(entry['plan'])
+        self.assertEqual(entry['services'], ['shop.repositories.product_repository.ProductRepository.get_by_slug'])
+
+
+class AuditTrailTests(TestCase):
+    def test_service_operations_are_audited_after_commit(self):
+        user = get_user_model().objects.create_user(username='audit', email='audit@example.com', password='pass')
+        product = Product.objects.create(name='Audited', category=Category.objects.create(name='Audit'), price=3, stock=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            CartService().add_to_cart(user, product.id, 2)
+
+        events = AuditEventRepository().query(user_id=user.id, operation='item_added_to_cart')
+        self.assertEqual(events.count(), 1)
+        self.assertEqual(events[0].service, 'CartService')
+        self.assertFalse(AuditEventRepository().query(user_id=user.id, since=events[0].created_at, operation='x').exists())
+
+    def test_background_writer_flushes_batches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'audit.jsonl')
+            config = {'SINK': 'jsonl', 'PATH': path, 'BACKGROUND': True, 'BATCH_SIZE': 10, 'FLUSH_INTERVAL': 0.05}
+            trail = AuditTrail()
+            with override_settings(AUDIT_TRAIL=config):
+                with self.captureOnCommitCallbacks(execute=True):
+                    for i in range(25):
+                        trail.record('ping', {'user_id': i})
+                deadline = time.monotonic() + 5
+                while trail.stats()['written'] < 25 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            with open(path, encoding='utf-8') as fh:
+                lines = [json.loads(line) for line in fh]
+
+        self.assertEqual(len(lines), 25)
+        self.assertGreaterEqual(trail.stats()['batches'], 3)
+        self.assertEqual(trail.stats()['dropped'], 0)
+
+
+class IdentityMapTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Mapped')
+        self.product = Product.objects.create(name='Mapped lamp', category=category, price=20, stock=5)
+        self.repository = ProductRepository()
+
+    def test_repeated_lookups_hit_the_map_within_a_scope(self):
+        with identity_map_scope():
+            with self.assertNumQueries(1):
+                first = self.repository.get_by_id(self.product.pk)
+                second = self.repository.get_by_id(self.product.pk)
+            self.assertIs(first, second)
+
+        with self.assertNumQueries(1):
+            self.assertIsNot(self.repository.get_by_id(self.product.pk), first)
+
+    def test_rolled_back_writes_are_not_served(self):
+        with identity_map_scope():
+            try:
+                with transaction.atomic():
+                    self.repository.update_stock(self.repository.get_by_id(self.product.pk), -3)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+            with self.assertNumQueries(1):
+                self.assertEqual(self.repository.get_by_id(self.product.pk).stock, 5)
+
+    def test_cart_item_view_reads_cart_once(self):
+        user = get_user_model().objects.create_user(username='mapped', email='mapped@example.com', password='x')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        client.post('/api/carts/items/', {'product_id': self.product.pk, 'quantity': 1}, format='json')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/api/carts/items/', {'product_id': self.product.pk, 'quantity': 1}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['total_items'], 2)
+        cart_reads = [q for q in queries if q['sql'].startswith('SELECT') and 'FROM "carts_cart"' in q['sql']]
+        self.assertEqual(len(cart_reads), 1)
+
+
+class BaseRepositoryWriteTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Writes')
+        self.product = Product.objects.create(name='Write mug', category=self.category, price=12, stock=3)
+        self.repository = ProductRepository()
+
+    def test_update_writes_only_changed_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.repository.update(self.product, price=15)
+
+        [update] = queries
+        self.assertIn('"price"', update['sql'])
+        self.assertIn('"updated_at"', update['sql'])
+        self.assertNotIn('"stock"', update['sql'])
+
+    def test_stock_decrease_is_guarded(self):
+        self.assertTrue(self.repository.update_stock(self.product, -2))
+        self.assertFalse(self.repository.update_stock(self.product, -2))
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+
+    def test_get_many_and_upsert(self):
+        other = Product.objects.create(name='Write bowl', category=self.category, price=9)
+        self.assertEqual(set(self.repository.get_many([self.product.pk, other.pk, 0])), {self.product.pk, other.pk})
+
+        self.repository.upsert(
+            [Product(name='Write mug', slug=self.product.slug, category=self.category, price=11, stock=7)],
+            unique_fields=['slug'], update_fields=['price', 'stock'],
+        )
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.price, self.product.stock), (11, 7))
+
+
+class ContainerTests(TestCase):
+    def test_services_are_built_once_and_shared(self):
+        order_service = container.resolve(OrderService)
+
+        self.assertIs(container.resolve(OrderService), order_service)
+        self.assertIs(order_service.cart_service, container.resolve(CartService))
+        self.assertIs(CartValidateView().cart_service, CartValidateView().cart_service)
+
+    def test_override_replaces_injected_service(self):
+        class FakeCartService:
+            def validate_cart_for_checkout(self, user):
+                return True, ''
+
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(
+            username='fake-cart', email='fake@example.com', password='x',
+        ))
+        with container.override(CartService, FakeCartService()):
+            response = client.get('/api/carts/validate/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(CartValidateView().cart_service, CartService)
+
+    def test_registered_factory_receives_the_container(self):
+        local = Container()
+        local.register(OrderService, lambda c: OrderService(cart_service=c.resolve(CartService)))
+
+        self.assertIs(local.resolve(OrderService).cart_service, local.resolve(CartService))
+
+
+SHARED_SESSION_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'shopina-test-sessions'),
+    },
+}
+
+
+@override_settings(CACHES=SHARED_SESSION_CACHE, SESSION_CACHE_ALIAS='sessions')
+class CachedDBSessionTests(TestCase):
+    def setUp(self):
+        caches['sessions'].clear()
+
+    def test_expiry_only_saves_are_coalesced(self):
+        session = SessionStore()
+        session['cart'] = 1
+        session.save()
+
+        reloaded = SessionStore(session.session_key)
+        reloaded.load()
+        with self.assertNumQueries(0):
+            reloaded.save()
+        self.assertEqual(SessionStore(session.session_key).load(), {'cart': 1})
+
+        reloaded['cart'] = 2
+        with CaptureQueriesContext(connection) as queries:
+            reloaded.save()
+        self.assertGreater(len(queries), 0)
+
+    @override_settings(SESSION_WRITES={'WRITE_INTERVAL': 0})
+    def test_zero_interval_writes_every_save(self):
+        session = SessionStore()
+        session.save()
+        with CaptureQueriesContext(connection) as queries:
+            session.save()
+        self.assertGreater(len(queries), 0)
+
+    def test_clear_expired_deletes_in_batches(self):
+        past = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f'expired{i:03d}', session_data='', expire_date=past) for i in range(5)
+        )
+        live = SessionStore()
+        live.save()
+
+        self.assertEqual(SessionStore.clear_expired(batch_size=2), 5)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), [live.session_key])
+
+
+class PerProcessSessionCacheTests(TestCase):
+    """The shipped settings: a LocMemCache per worker as the session cache."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_expiry_only_saves_are_coalesced(self):
+        session = SessionStore()
+        session['cart'] = 1
+        session.save()
+
+        reloaded = SessionStore(session.session_key)
+        with self.assertNumQueries(1):
+            self.assertEqual(reloaded.load(), {'cart': 1})
+        with self.assertNumQueries(0):
+            reloaded.save()
+
+        reloaded['cart'] = 2
+        with CaptureQueriesContext(connection) as queries:
+            reloaded.save()
+        self.assertGreater(len(queries), 0)
+
+    def test_logout_by_another_worker_is_seen(self):
+        session = SessionStore()
+        session['cart'] = 1
+        session.save()
+        # Logged out by another worker, whose LocMemCache this process cannot see
+        Session.objects.filter(session_key=session.session_key).delete()
+
+        reloaded = SessionStore(session.session_key)
+        self.assertEqual(reloaded.load(), {})
+        self.assertIsNone(cache.get(reloaded.cache_key))
+
+        # An expiry-only save skipped on this process's marker does not bring the row back
+        stale = SessionStore(session.session_key)
+        stale._session_cache = {'cart': 1}
+        stale.save()
+        self.assertFalse(Session.objects.filter(session_key=session.session_key).exists())
+
+
+class HashingExecutorTests(TestCase):
+    def test_callers_beyond_the_limit_are_rejected(self):
+        executor = InlineHashingExecutor(max_concurrent=1, queue_timeout=0.05)
+        release = threading.Event()
+        holder = threading.Thread(target=executor.run, args=(release.wait,))
+        holder.start()
+        while executor.stats()['in_flight'] == 0:
+            time.sleep(0.001)
+
+        with self.assertRaises(HashingBusyError):
+            executor.run(len, 'password')
+        release.set()
+        holder.join()
+
+        self.assertEqual(executor.run(len, 'password'), 8)
+        stats = executor.stats()
+        self.assertEqual((stats['submitted'], stats['completed'], stats['rejected']), (3, 2, 1))
+        self.assertEqual((stats['in_flight'], stats['waiting']), (0, 0))
+
+    def test_check_password_upgrades_outdated_hashes(self):
+        user = get_user_model().objects.create_user(username='rehash', email='rehash@example.com', password='x')
+        user.password = make_password('s3cret', hasher='pbkdf2_sha1')
+        user.save(update_fields=['password'])
+
+        self.assertFalse(check_password(user, 'wrong'))
+        self.assertTrue(check_password(user, 's3cret'))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+
+
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self):
+        buckets.clear()
+        self.addCleanup(buckets.clear)
+
+    def test_lockout_escalates_until_a_quiet_period(self):
+        store = TokenBucketStore()
+        # 2 tokens, one every 30 s
+        self.assertEqual([store.consume('k', 2, 60, now=0) for _ in range(2)], [0, 0])
+        self.assertEqual(store.consume('k', 2, 60, now=0), 30)
+        self.assertEqual(store.consume('k', 2, 60, now=10), 20)  # still locked out, no new strike
+        # Nothing refilled during the lockout: retrying as soon as allowed doubles it
+        self.assertEqual(store.consume('k', 2, 60, now=30), 60)
+        self.assertEqual(store.consume('k', 2, 60, now=120), 0)  # one token, 30 s after the lockout
+        self.assertEqual(store.consume('k', 2, 60, now=120), 120)  # third strike
+        # A whole period without rejection after the lockout: strikes forgotten
+        self.assertEqual([store.consume('k', 2, 60, now=300) for _ in range(3)], [0, 0, 30])
+
+    def test_persistent_retries_reach_the_maximum_lockout(self):
+        store = TokenBucketStore()
+        now, attempts, wait = 0.0, 0, 0.0
+        # 5/min, retried every second or as soon as the lockout ends, for two hours
+        while now < 7200:
+            attempts += 1
+            wait = store.consume('k', 5, 60, now=now)
+            now += max(wait, 1.0)
+        self.assertEqual(wait, 3600)
+        self.assertLess(attempts, 30)
+
+    def test_throttled_login_skips_password_hashing(self):
+        user = get_user_model().objects.create_user(username='target', email='target@example.com', password='x')
+        client = APIClient()
+        with patch('users.authentication.check_password', return_value=False) as check_password:
+            statuses = [
+                client.post('/api/users/token/', {'identifier': user.email, 'password': 'guess'},
+                            REMOTE_ADDR='10.0.0.1').status_code
+                for _ in range(6)
+            ]
+        # auth_identifier allows 5 attempts a minute
+        self.assertEqual(statuses, [400] * 5 + [429])
+        self.assertEqual(check_password.call_count, 5)
+
+
+class BloomFilterTests(TestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'user{i}')
+        self.assertTrue(all(f'user{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class PerformanceAdminTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_superuser(username='root', email='root@example.com', password='pass')
+        self.client.force_login(self.admin)
+        category = Category.objects.create(name='Admin')
+        product = Product.objects.create(name='Lamp', category=category, price=10, stock=100)
+        for i in range(5):
+            buyer = User.objects.create_user(username=f'buyer{i}', email=f'buyer{i}@example.com', password='pass')
+            Order.objects.create(user=buyer, total=i)
+            CartService().add_to_cart(buyer, product.id, i + 1)
+
+    def test_order_changelist_pages_by_keyset_without_count(self):
+        url = '/admin/orders/order/'
+        with patch.object(OrderAdmin, 'list_per_page', 2):
+            seen = []
+            while url:
+                with CaptureQueriesContext(connection) as queries:
+                    resp = self.client.get(url)
+                self.assertEqual(resp.status_code, 200)
+                self.assertFalse(any('COUNT(' in q['sql'].upper() for q in queries.captured_queries))
+                cl = resp.context['cl']
+                seen += [order.pk for order in cl.result_list]
+                if cl.keyset_next_url:
+                    self.assertContains(resp, 'Next page')
+                url = cl.keyset_next_url and '/admin/orders/order/' + cl.keyset_next_url
+        self.assertEqual(seen, list(Order.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)))
+
+        # Sorting by a column falls back to numbered pages
+        resp = self.client.get('/admin/orders/order/', {'o': '4'})
+        self.assertFalse(resp.context['cl'].keyset)
+        self.assertEqual(resp.context['cl'].result_count, 5)
+
+    def test_cart_totals_are_annotated(self):
+        with CaptureQueriesContext(connection) as first:
+            self.client.get('/admin/carts/cart/')
+        CartService().add_to_cart(self.admin, Product.objects.get().id, 1)
+        with CaptureQueriesContext(connection) as second:
+            resp = self.client.get('/admin/carts/cart/')
+        # One more cart, no more queries
+        self.assertEqual(len(first), len(second))
+        self.assertContains(resp, '<td class="field-total_items">1</td>', html=True)
+
+        # The page walks the (updated_at, id) index, and only its carts' items are summed
+        [page] = [q['sql'] for q in second.captured_queries if q['sql'].startswith('SELECT "carts_cart"."id"')]
+        self.assertNotIn('GROUP BY "carts_cart"', page)
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {page}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('cart_updated_idx', plan)
+        self.assertNotIn('TEMP B-TREE FOR ORDER BY', plan)
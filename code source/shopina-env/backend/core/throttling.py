@@ -0,0 +1,205 @@
+"""
+Token-bucket throttles for the authentication endpoints.
+
+Each client IP and each submitted identifier (email, username, phone or
+the authenticated user) gets a bucket holding up to N tokens that refill
+at N per period, with N/period taken from
+``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']`` (e.g. ``'auth_ip': '20/min'``).
+A request spends one token. An empty bucket rejects the request and locks
+the key out; tokens only start refilling again once the lockout ends, and
+each further rejection doubles the lockout (see
+``REST_FRAMEWORK['TOKEN_BUCKET']``) until a whole period passes without one.
+
+DRF checks throttles before the view runs, so a rejected attempt costs a
+dictionary lookup and never reaches the password hasher. Buckets live in
+process memory, shared by the threads of a worker and updated under a lock.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+DEFAULTS = {
+    # Lockout after the n-th consecutive rejection: refill time of one token * FACTOR ** (n - 1)
+    'ESCALATION_FACTOR': 2.0,
+    'MAX_LOCKOUT': 3600,  # seconds
+    'MAX_ENTRIES': 100_000,  # least recently used buckets are evicted beyond this
+}
+
+
+def get_token_bucket_settings() -> dict:
+    """
+    Get the token bucket settings.
+
+    Returns:
+        ``REST_FRAMEWORK['TOKEN_BUCKET']`` merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'REST_FRAMEWORK', {}).get('TOKEN_BUCKET', {})}
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """
+    Parse a DRF rate string such as ``'5/min'``.
+
+    Returns:
+        ``(capacity, period in seconds)``
+    """
+    num, period = rate.split('/')
+    return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+class _Bucket:
+    __slots__ = ('tokens', 'updated', 'strikes', 'blocked_until')
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+        self.strikes = 0
+        self.blocked_until = 0.0
+
+
+class TokenBucketStore:
+    """Buckets by key, bounded in size, with atomic take-or-reject."""
+
+    def __init__(self):
+        self._buckets: 'OrderedDict[str, _Bucket]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, period: int, now: Optional[float] = None) -> float:
+        """
+        Take one token from the bucket of ``key``.
+
+        Args:
+            key: Bucket key
+            capacity: Bucket size
+            period: Seconds to refill a whole bucket
+            now: Current monotonic time (for tests)
+
+        Returns:
+            0 if the request is allowed, otherwise seconds to wait
+        """
+        now = time.monotonic() if now is None else now
+        refill_rate = capacity / period
+        config = get_token_bucket_settings()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(capacity, now)
+                if len(self._buckets) > config['MAX_ENTRIES']:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                # During a lockout `updated` lies in the future: nothing accrues until it ends
+                if now > bucket.updated:
+                    bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * refill_rate)
+                    bucket.updated = now
+                if bucket.strikes and now - bucket.blocked_until >= period:
+                    # No rejection for a whole period since the last lockout: forget earlier offences
+                    bucket.strikes = 0
+
+            if now < bucket.blocked_until:
+                return bucket.blocked_until - now
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return 0.0
+
+            bucket.strikes += 1
+            lockout = min(
+                config['MAX_LOCKOUT'],
+                (1 / refill_rate) * config['ESCALATION_FACTOR'] ** (bucket.strikes - 1),
+            )
+            bucket.blocked_until = now + lockout
+            # No tokens are credited for the lockout itself
+            bucket.updated = bucket.blocked_until
+            return lockout
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+buckets = TokenBucketStore()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base class: one bucket per ``get_key()`` in the scope's rate.
+
+    Subclasses set ``scope`` and implement ``get_key``; returning None
+    skips the throttle for that request.
+    """
+
+    scope: str = ''
+
+    def __init__(self):
+        self._wait = None
+
+    def get_rate(self) -> Tuple[int, int]:
+        try:
+            return parse_rate(api_settings.DEFAULT_THROTTLE_RATES[self.scope])
+        except KeyError:
+            raise ImproperlyConfigured(f"No default throttle rate set for '{self.scope}' scope")
+
+    def get_key(self, request, view) -> Optional[str]:
+        raise NotImplementedError
+
+    def allow_request(self, request, view) -> bool:
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        capacity, period = self.get_rate()
+        self._wait = buckets.consume(f'{self.scope}:{key}', capacity, period)
+        return self._wait == 0
+
+    def wait(self) -> Optional[float]:
+        return self._wait or None
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Authentication attempts per client IP (scope ``auth_ip``)."""
+
+    scope = 'auth_ip'
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AvailabilityThrottle(AuthIPThrottle):
+    """Username/email availability checks per client IP (scope ``availability``)."""
+
+    scope = 'availability'
+
+
+class AuthIdentifierThrottle(TokenBucketThrottle):
+    """
+    Authentication attempts per targeted account (scope ``auth_identifier``).
+
+    The account is the submitted identifier (``identifier``, ``email`` or
+    ``username``), or the authenticated user for second-factor checks.
+    """
+
+    scope = 'auth_identifier'
+    fields = ('identifier', 'email', 'username')
+
+    def get_key(self, request, view):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'user:{user.pk}'
+        try:
+            data = request.data
+        except Exception:
+            # Unparseable body: the view rejects it without hashing anything
+            return None
+        for field in self.fields:
+            value = data.get(field) if hasattr(data, 'get') else None
+            if isinstance(value, str) and value.strip():
+                # Fixed-size key whatever the client sends
+                return hashlib.sha256(value.strip().lower().encode()).hexdigest()[:32]
+        return None
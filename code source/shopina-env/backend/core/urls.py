@@ -0,0 +1,12 @@
+"""
+Core URL configuration.
+"""
+from django.urls import path
+from .views import AuditEventListView, DatabaseMetricsView
+
+app_name = 'core'
+
+urlpatterns = [
+    path('db/metrics/', DatabaseMetricsView.as_view(), name='db_metrics'),
+    path('audit/', AuditEventListView.as_view(), name='audit_events'),
+]
@@ -0,0 +1,51 @@
+"""
+In-memory Bloom filter.
+
+A bit array answering "possibly present" or "definitely absent" for string
+keys in constant time, with a false positive rate fixed at construction
+and no false negatives. Keys cannot be removed.
+"""
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    """
+    Bloom filter sized for ``capacity`` keys at ``error_rate`` false positives.
+
+    Args:
+        capacity: Expected number of keys
+        error_rate: Target false positive probability once ``capacity`` keys are added
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str) -> None:
+        """
+        Add a key.
+
+        Args:
+            key: Key to add
+        """
+        positions = self._positions(key)
+        # Byte-level read-modify-write: concurrent adds would lose bits
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
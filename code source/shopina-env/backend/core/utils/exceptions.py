@@ -71,3 +71,12 @@ class ValidationError(BusinessLogicError):
     """
     default_detail = 'Data validation failed.'
     default_code = 'validation_error'
+
+
+class HashingBusyError(APIException):
+    """
+    Exception raised when password hashing capacity is exhausted.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-in attempts in progress. Please retry shortly.'
+    default_code = 'hashing_busy'
@@ -0,0 +1,45 @@
+"""
+Opaque cursors for keyset (seek) pagination.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(timestamp: datetime, pk: int) -> str:
+    """
+    Encode the sort key of the last row of a page.
+
+    Args:
+        timestamp: Value of the timestamp sort column
+        pk: Primary key (tie-breaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([timestamp.isoformat(), pk], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Args:
+        cursor: Cursor string from the query string
+
+    Returns:
+        Tuple of (timestamp, pk), or None when the cursor is missing or malformed
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, pk = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        parsed = parse_datetime(timestamp)
+        return (parsed, int(pk)) if parsed else None
+    except (ValueError, TypeError):
+        return None
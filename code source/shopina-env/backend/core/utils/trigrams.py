@@ -0,0 +1,50 @@
+"""
+Trigram extraction for substring search indexes.
+"""
+from typing import Iterable, Set
+
+
+def normalize(text: str) -> str:
+    """
+    Lower-case a value and collapse its whitespace.
+
+    Args:
+        text: Raw value
+
+    Returns:
+        Normalized value
+    """
+    return ' '.join((text or '').lower().split())
+
+
+def text_trigrams(values: Iterable[str]) -> Set[str]:
+    """
+    Trigrams of indexed values, each padded so prefixes get their own grams.
+
+    Args:
+        values: Values to index (empty ones are skipped)
+
+    Returns:
+        Set of 3-character strings
+    """
+    grams = set()
+    for value in values:
+        value = normalize(value)
+        if value:
+            padded = f'  {value} '
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def query_trigrams(query: str) -> Set[str]:
+    """
+    Trigrams every value containing ``query`` has (unpadded: it may match mid-value).
+
+    Args:
+        query: Search string
+
+    Returns:
+        Set of 3-character strings, empty for queries shorter than 3 characters
+    """
+    query = normalize(query)
+    return {query[i:i + 3] for i in range(len(query) - 2)}
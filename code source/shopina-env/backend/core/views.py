@@ -0,0 +1,94 @@
+"""
+Operational endpoints for administrators.
+"""
+from django.contrib import admin
+from django.utils.dateparse import parse_datetime
+from django.views.generic import TemplateView
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.audit.writer import audit_trail
+from core.db.metrics import query_metrics
+from core.db.routing import get_replica_alias, replica_configured
+from core.db.slow_queries import get_slow_query_settings, read_slow_queries, summarize_slow_queries
+from core.permissions.custom_permissions import IsAdmin
+from core.repositories.audit_repository import AuditEventRepository
+from core.serializers import AuditEventSerializer
+
+
+class DatabaseMetricsView(APIView):
+    """
+    Per-alias query counters of this worker process.
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        """Get query metrics."""
+        return Response({
+            'replica': get_replica_alias() if replica_configured() else None,
+            'aliases': query_metrics.snapshot(),
+        }, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        """Reset query metrics."""
+        query_metrics.reset()
+        return Response({'message': 'Metrics reset'}, status=status.HTTP_200_OK)
+
+
+class AuditEventListView(APIView):
+    """
+    Query the audit trail by user, operation and time range.
+    """
+    permission_classes = [IsAdmin]
+    max_limit = 1000
+
+    def get(self, request):
+        """
+        List audit events, newest first.
+
+        Query params: ``user``, ``operation``, ``since`` and ``until`` (ISO 8601),
+        ``limit`` (default 100).
+        """
+        params = request.query_params
+        try:
+            user_id = int(params['user']) if params.get('user') else None
+            limit = min(int(params.get('limit', 100)), self.max_limit)
+        except ValueError:
+            return Response({'error': 'user and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        bounds = {}
+        for name in ('since', 'until'):
+            if params.get(name):
+                bounds[name] = parse_datetime(params[name])
+                if bounds[name] is None:
+                    return Response({'error': f'{name} must be an ISO 8601 datetime'}, status=status.HTTP_400_BAD_REQUEST)
+
+        events = AuditEventRepository().query(user_id=user_id, operation=params.get('operation'), **bounds)[:limit]
+        return Response({
+            'writer': audit_trail.stats(),
+            'results': AuditEventSerializer(events, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+
+class SlowQueryAdminView(TemplateView):
+    """
+    Admin page ranking slow-query fingerprints by total time.
+
+    Mounted behind ``admin.site.admin_view`` so only staff can see it.
+    """
+    template_name = 'admin/slow_queries.html'
+    limit = 100
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        config = get_slow_query_settings()
+        summary = summarize_slow_queries(read_slow_queries(config['PATH']))
+        context.update(admin.site.each_context(self.request))
+        context.update({
+            'title': 'Slow queries',
+            'config': config,
+            'fingerprints': summary[:self.limit],
+            'total_fingerprints': len(summary),
+        })
+        return context
@@ -1,11 +1,14 @@
 """Notification admin."""
 from django.contrib import admin
+from core.admin import PerformanceAdminMixin
 from .models import Notification
 
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'type', 'title', 'is_read', 'created_at')
+    list_select_related = ('user',)
     list_filter = ('type', 'is_read', 'created_at')
     search_fields = ('user__username', 'title', 'message')
     readonly_fields = ('created_at',)
+    autocomplete_fields = ('user',)
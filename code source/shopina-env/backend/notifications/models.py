@@ -26,6 +26,11 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='notification_user_created_idx'),
+            # Admin changelist keyset paging (core.admin.PerformanceAdminMixin)
+            models.Index(fields=['created_at', 'id'], name='notification_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.title}"
@@ -10,9 +10,11 @@ class NotificationListView(generics.ListAPIView):
     """List user notifications."""
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Only needs the user id: authenticate from the token claims, no user lookup
+    token_claims_user = True
     
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
+        return Notification.objects.filter(user_id=self.request.user.pk)
 
 
 class NotificationMarkReadView(APIView):
@@ -20,13 +22,10 @@ class NotificationMarkReadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, pk):
-        try:
-            notification = Notification.objects.get(pk=pk, user=request.user)
-            notification.is_read = True
-            notification.save()
-            return Response({'message': 'Notification marked as read'}, status=status.HTTP_200_OK)
-        except Notification.DoesNotExist:
+        updated = Notification.objects.filter(pk=pk, user=request.user).update(is_read=True)
+        if not updated:
             return Response({'error': 'Notification not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'message': 'Notification marked as read'}, status=status.HTTP_200_OK)
 
 
 class NotificationMarkAllReadView(APIView):
@@ -1,13 +1,21 @@
 from django.contrib import admin
+from core.admin import PerformanceAdminMixin
 from .models import Order, OrderItem
 
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
+    autocomplete_fields = ('product',)
+
+    def get_queryset(self, request):
+        # Rows are labelled with their product
+        return super().get_queryset(request).select_related('product')
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'user', 'status', 'total', 'created_at')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
     inlines = [OrderItemInline]
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orders'
+
+    def ready(self):
+        from carts.services.cart_service import CartService
+        from core.container import container
+        from orders.services.order_service import OrderService
+        from shop.services.product_service import ProductService
+
+        # Share the process-wide cart and product services instead of building new ones
+        container.register(OrderService, lambda c: OrderService(
+            cart_service=c.resolve(CartService),
+            product_service=c.resolve(ProductService),
+        ))
@@ -15,6 +15,14 @@ class Order(models.Model):
     total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Buyer order history and dashboard (see `manage.py index_advisor`)
+            models.Index(fields=['user', 'created_at'], name='order_user_created_idx'),
+            models.Index(fields=['user', 'status', 'created_at'], name='order_user_status_created_idx'),
+            models.Index(fields=['created_at'], name='order_created_idx'),
+        ]
+
     def __str__(self):
         return f"Order #{self.pk} - {self.user}"
 
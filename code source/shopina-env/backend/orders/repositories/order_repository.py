@@ -1,10 +1,11 @@
 """
 Order repository for data access operations.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Sequence
 from django.db.models import QuerySet, Sum, Count, Q
 from django.contrib.auth import get_user_model
-from datetime import datetime, timedelta
+from datetime import timedelta
+from django.utils import timezone
 from core.repositories.base import BaseRepository
 from orders.models import Order, OrderItem
 
@@ -20,6 +21,26 @@ class OrderRepository(BaseRepository[Order]):
     def __init__(self):
         super().__init__(Order)
     
+    def transition_status(self, order: Order, from_statuses: Sequence[str], to_status: str) -> bool:
+        """
+        Atomically move an order to ``to_status`` if it is still in one of ``from_statuses``.
+        
+        The check and the write are one ``UPDATE``, so two concurrent
+        requests cannot both apply the same transition.
+        
+        Args:
+            order: Order instance
+            from_statuses: Statuses the order may currently be in
+            to_status: New status
+            
+        Returns:
+            True if the order changed, False if its status did not allow it
+        """
+        if not self.update_where({'pk': order.pk, 'status__in': list(from_statuses)}, status=to_status):
+            return False
+        order.status = to_status
+        return True
+    
     def get_user_orders(self, user: User) -> QuerySet[Order]:
         """
         Get all orders for a user.
@@ -71,7 +92,7 @@ class OrderRepository(BaseRepository[Order]):
         )
         
         # Orders in last 30 days
-        thirty_days_ago = datetime.now() - timedelta(days=30)
+        thirty_days_ago = timezone.now() - timedelta(days=30)
         recent_orders = self.model.objects.filter(
             created_at__gte=thirty_days_ago
         ).count()
@@ -1,7 +1,7 @@
 """
 Order service for business logic operations.
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from decimal import Decimal
 from django.contrib.auth import get_user_model
 from django.db import transaction
@@ -26,11 +26,16 @@ class OrderService(BaseService[Order]):
     Service class for Order business logic.
     """
     
-    def __init__(self):
+    def __init__(self, cart_service: Optional[CartService] = None, product_service: Optional[ProductService] = None):
+        """
+        Args:
+            cart_service: Shared CartService (a new one by default)
+            product_service: Shared ProductService (a new one by default)
+        """
         self.order_repository = OrderRepository()
         self.order_item_repository = OrderItemRepository()
-        self.cart_service = CartService()
-        self.product_service = ProductService()
+        self.cart_service = cart_service or CartService()
+        self.product_service = product_service or ProductService()
         super().__init__(self.order_repository)
     
     @transaction.atomic
@@ -66,25 +71,26 @@ class OrderService(BaseService[Order]):
             status='pending'
         )
         
-        # Create order items and decrease stock
+        # Decrease stock, then create all order items in one INSERT
+        order_items = []
         for cart_item in cart.items.all():
             # Decrease product stock
             try:
-                self.product_service.decrease_stock(
-                    cart_item.product.id,
+                product = self.product_service.decrease_stock(
+                    cart_item.product_id,
                     cart_item.quantity
                 )
             except InsufficientStockError:
                 # Rollback will happen automatically due to @transaction.atomic
                 raise
             
-            # Create order item
-            OrderItem.objects.create(
+            order_items.append(OrderItem(
                 order=order,
-                product=cart_item.product,
+                product=product,
                 price=cart_item.price_at_add,
                 quantity=cart_item.quantity
-            )
+            ))
+        self.order_item_repository.bulk_create(order_items)
         
         # Clear cart
         self.cart_service.clear_cart(user)
@@ -139,7 +145,8 @@ class OrderService(BaseService[Order]):
                 f"Cannot change status of {order.status} order"
             )
         
-        order = self.order_repository.update(order, status=new_status)
+        if not self.order_repository.transition_status(order, ['pending', 'processing'], new_status):
+            raise InvalidOrderStateError("Order status changed concurrently")
         
         self.log_operation('order_status_updated', {
             'order_id': order_id,
@@ -172,8 +179,8 @@ class OrderService(BaseService[Order]):
         if order.user != user:
             raise BusinessLogicError("You can only cancel your own orders")
         
-        # Can only cancel pending orders
-        if order.status != 'pending':
+        # Can only cancel pending orders; checked again by the UPDATE so stock is restored once
+        if order.status != 'pending' or not self.order_repository.transition_status(order, ['pending'], 'cancelled'):
             raise InvalidOrderStateError(
                 "Only pending orders can be cancelled"
             )
@@ -181,13 +188,10 @@ class OrderService(BaseService[Order]):
         # Restore stock for all items
         for item in order.items.all():
             self.product_service.increase_stock(
-                item.product.id,
+                item.product_id,
                 item.quantity
             )
         
-        # Update order status
-        order = self.order_repository.update(order, status='cancelled')
-        
         self.log_operation('order_cancelled', {
             'order_id': order_id,
             'user_id': user.id
@@ -1,7 +1,6 @@
 from datetime import timedelta
 from decimal import Decimal
 
-from django.contrib.auth import get_user_model
 from django.db.models import Count, DecimalField, F, Sum, Value
 from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
@@ -11,7 +10,11 @@ from rest_framework.views import APIView
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView
+from core.cache.stale_while_revalidate import dashboard_cache
+from core.container import container
+from core.db.routing import ReplicaReadMixin, use_replica
 from shop.models import Product
+from users.services.user_service import UserService
 from .models import Order, OrderItem
 from .serializers import CreateOrderSerializer, OrderSerializer
 
@@ -32,6 +35,8 @@ class OrderListCreateView(generics.ListCreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         order = serializer.save()
+        # New orders must show up on the buyer's dashboard without waiting for the freshness window
+        dashboard_cache.invalidate(f"stats:{request.user.pk}")
         # Return the full order representation
         out = OrderSerializer(order, context={'request': request})
         return Response(out.data, status=201)
@@ -41,7 +46,7 @@ class OrderDetailView(generics.RetrieveAPIView):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
 
-class OrdersListPageView(ListView):
+class OrdersListPageView(ReplicaReadMixin, ListView):
     """HTML view: list orders with pagination."""
 
     model = Order
@@ -59,7 +64,7 @@ class OrdersListPageView(ListView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class DashboardStatsView(APIView):
+class DashboardStatsView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @staticmethod
@@ -108,6 +113,16 @@ class DashboardStatsView(APIView):
         return series, total_count
 
     def get(self, request):
+        user = request.user
+        payload = dashboard_cache.get(f"stats:{user.pk}", lambda: self._build_payload(user))
+        return Response(payload)
+
+    def _build_payload(self, user):
+        # Also runs from background refreshes, outside the request's replica scope
+        with use_replica():
+            return self._aggregate(user)
+
+    def _aggregate(self, user):
         today = timezone.localdate()
         period_start = today - timedelta(days=6)
         previous_start = period_start - timedelta(days=7)
@@ -115,7 +130,7 @@ class DashboardStatsView(APIView):
         completed_statuses = ['processing', 'completed']
 
         # Scope all aggregations to the authenticated user's data to avoid cross-account leakage
-        revenue_qs = Order.objects.filter(user=request.user, status__in=completed_statuses)
+        revenue_qs = Order.objects.filter(user=user, status__in=completed_statuses)
         total_revenue = revenue_qs.aggregate(
             total=Coalesce(Sum('total'), Value(0, output_field=DecimalField(max_digits=10, decimal_places=2)))
         )['total']
@@ -123,8 +138,8 @@ class DashboardStatsView(APIView):
             total=Coalesce(Sum('total'), Value(0, output_field=DecimalField(max_digits=10, decimal_places=2)))
         )['total']
 
-        orders_today = Order.objects.filter(user=request.user, created_at__date=today).count()
-        total_orders = Order.objects.filter(user=request.user).count()
+        orders_today = Order.objects.filter(user=user, created_at__date=today).count()
+        total_orders = Order.objects.filter(user=user).count()
         paid_orders = revenue_qs.count()
 
         current_revenue_total = revenue_qs.filter(created_at__date__gte=period_start).aggregate(
@@ -134,8 +149,8 @@ class DashboardStatsView(APIView):
             total=Coalesce(Sum('total'), Value(0, output_field=DecimalField(max_digits=10, decimal_places=2)))
         )['total']
 
-        current_orders = Order.objects.filter(user=request.user, created_at__date__gte=period_start).count()
-        previous_orders = Order.objects.filter(user=request.user, created_at__date__gte=previous_start, created_at__date__lte=previous_end).count()
+        current_orders = Order.objects.filter(user=user, created_at__date__gte=period_start).count()
+        previous_orders = Order.objects.filter(user=user, created_at__date__gte=previous_start, created_at__date__lte=previous_end).count()
 
         avg_order_value = float(current_revenue_total) / current_orders if current_orders else 0.0
 
@@ -143,10 +158,11 @@ class DashboardStatsView(APIView):
         orders_series, orders_window_sum = self._build_order_series(today)
 
         top_products = list(
-            OrderItem.objects.filter(order__user=request.user, order__status__in=completed_statuses, product__isnull=False)
+            OrderItem.objects.filter(order__user=user, order__status__in=completed_statuses, product__isnull=False)
             .values('product__id', 'product__name')
             .annotate(
-                quantity=Coalesce(Sum('quantity'), Value(0)),
+                # Named apart from the `quantity` field so F('quantity') below still means the column
+                units=Coalesce(Sum('quantity'), Value(0)),
                 revenue=Coalesce(
                     Sum(F('price') * F('quantity')),
                     Value(0, output_field=DecimalField(max_digits=10, decimal_places=2)),
@@ -163,18 +179,17 @@ class DashboardStatsView(APIView):
                 'total': float(order.total),
                 'created_at': order.created_at.isoformat(),
             }
-            for order in Order.objects.select_related('user').filter(user=request.user).order_by('-created_at')[:6]
+            for order in Order.objects.select_related('user').filter(user=user).order_by('-created_at')[:6]
         ]
 
-        User = get_user_model()
-        response_data = {
+        return {
             'totals': {
                 'revenue': float(total_revenue),
                 'revenue_today': float(revenue_today),
                 'orders': total_orders,
                 'orders_today': orders_today,
                 'paid_orders': paid_orders,
-                'customers': User.objects.count(),
+                'customers': container.resolve(UserService).count_users()['total_users'],
                 'products': Product.objects.count(),
                 'avg_order_value': round(avg_order_value, 2),
             },
@@ -192,12 +207,10 @@ class DashboardStatsView(APIView):
                 {
                     'id': item.get('product__id'),
                     'name': item.get('product__name'),
-                    'quantity': item.get('quantity', 0),
+                    'quantity': item.get('units', 0),
                     'revenue': float(item.get('revenue', 0)),
                 }
                 for item in top_products
             ],
             'recent_orders': recent_orders,
         }
-
-        return Response(response_data)
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class PaymentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'payments'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+        from payments.models import Subscription
+        from payments.signals import subscription_changed, user_changed
+
+        # The plan used for API quotas is cached; drop it when it may have changed
+        post_save.connect(subscription_changed, sender=Subscription, dispatch_uid='payments.quota_plan.subscription')
+        post_delete.connect(subscription_changed, sender=Subscription, dispatch_uid='payments.quota_plan.subscription_delete')
+        post_save.connect(user_changed, sender=get_user_model(), dispatch_uid='payments.quota_plan.user')
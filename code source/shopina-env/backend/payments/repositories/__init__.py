@@ -0,0 +1 @@
+"""Repositories package initialization."""
@@ -0,0 +1,32 @@
+"""
+Subscription repository for data access operations.
+"""
+from typing import Optional
+from core.repositories.base import BaseRepository
+from payments.models import Subscription
+
+
+class SubscriptionRepository(BaseRepository[Subscription]):
+    """
+    Repository for Subscription model data access.
+    """
+    
+    def __init__(self):
+        super().__init__(Subscription)
+    
+    def get_latest_for_user(self, user_id: int) -> Optional[dict]:
+        """
+        Get the plan, status and period end of a user's latest subscription.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Dictionary with ``plan``, ``status`` and ``current_period_end``, or None
+        """
+        return (
+            self.model.objects.filter(user_id=user_id)
+            .order_by('-activated_at')
+            .values('plan', 'status', 'current_period_end')
+            .first()
+        )
@@ -0,0 +1,192 @@
+"""
+Plan-tiered API quotas.
+
+Sellers get a request quota and a burst limit according to their plan,
+both counted over sliding windows in the shared cache. The plan a user is
+billed for is resolved once and cached (``PLAN_CACHE_SECONDS``); saving the
+user or one of their subscriptions drops the cached value.
+"""
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from core.cache.sliding_window import SlidingWindowCounter, WindowState
+from core.services.base import BaseService
+from payments.models import Subscription
+from payments.repositories.subscription_repository import SubscriptionRepository
+from users.repositories.user_repository import UserRepository
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'PATH_PREFIX': '/api/',
+    'EXEMPT_PATHS': ['/api/payments/quota/'],
+    # Roles subject to quotas; everyone else is unlimited
+    'ROLES': ['SELLER'],
+    'PLAN_CACHE_SECONDS': 300,
+    # QUOTA requests per WINDOW seconds, BURST per BURST_WINDOW; None means unlimited
+    'PLANS': {
+        'free': {'QUOTA': 1000, 'WINDOW': 3600, 'BURST': 20, 'BURST_WINDOW': 10},
+        'starter': {'QUOTA': 10000, 'WINDOW': 3600, 'BURST': 50, 'BURST_WINDOW': 10},
+        'pro': {'QUOTA': 50000, 'WINDOW': 3600, 'BURST': 200, 'BURST_WINDOW': 10},
+        'enterprise': {'QUOTA': None, 'WINDOW': 3600, 'BURST': None, 'BURST_WINDOW': 10},
+    },
+}
+
+# Cached marker for users the quotas do not apply to
+_EXEMPT = ''
+
+
+def get_quota_settings() -> dict:
+    """
+    Get the API quota settings.
+
+    Returns:
+        Settings ``API_QUOTAS`` merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'API_QUOTAS', {})}
+
+
+class QuotaService(BaseService[Subscription]):
+    """
+    Service class for plan resolution and API quota accounting.
+    """
+    
+    def __init__(self):
+        self.subscription_repository = SubscriptionRepository()
+        self.user_repository = UserRepository()
+        super().__init__(self.subscription_repository)
+    
+    def get_plan(self, user_id: int) -> Optional[str]:
+        """
+        Get the plan whose quotas apply to a user, from the cache when possible.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Plan name, or None if the user is not subject to quotas
+        """
+        config = get_quota_settings()
+        cache = caches[config['CACHE_ALIAS']]
+        key = f'api_plan:{user_id}'
+        plan = cache.get(key)
+        if plan is None:
+            plan = self._load_plan(user_id, config)
+            cache.set(key, plan, config['PLAN_CACHE_SECONDS'])
+        return plan or None
+    
+    def _load_plan(self, user_id: int, config: dict) -> str:
+        user = self.user_repository.filter(pk=user_id).values('role', 'plan').first()
+        if user is None or user['role'] not in config['ROLES']:
+            return _EXEMPT
+        subscription = self.subscription_repository.get_latest_for_user(user_id)
+        if subscription is None:
+            return user['plan']
+        period_end = subscription['current_period_end']
+        if subscription['status'] == 'active' and (period_end is None or period_end > timezone.now()):
+            return subscription['plan']
+        # Pending, failed, canceled or lapsed subscriptions fall back to the free tier
+        return 'free'
+    
+    def invalidate_plan(self, user_id: int) -> None:
+        """
+        Drop the cached plan of a user.
+        
+        Args:
+            user_id: User ID
+        """
+        caches[get_quota_settings()['CACHE_ALIAS']].delete(f'api_plan:{user_id}')
+    
+    def _limits(self, plan: str, config: dict) -> Dict[str, Any]:
+        limits = config['PLANS'].get(plan) or config['PLANS']['free']
+        alias = config['CACHE_ALIAS']
+        # Burst first: the cheaper, more often hit limit
+        return {
+            'burst': (limits['BURST'], SlidingWindowCounter(limits['BURST_WINDOW'], f"burst:{limits['BURST_WINDOW']}", alias)),
+            'quota': (limits['QUOTA'], SlidingWindowCounter(limits['WINDOW'], f"quota:{limits['WINDOW']}", alias)),
+        }
+    
+    def consume(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Count one API request against the user's burst limit and quota.
+        
+        A request rejected by either limit is not counted.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            None if the user is not subject to quotas, otherwise a dictionary
+            with ``plan``, ``allowed`` and the ``quota``/``burst`` WindowStates
+            (absent when unlimited)
+        """
+        plan = self.get_plan(user_id)
+        if plan is None:
+            return None
+        now = timezone.now().timestamp()
+        result: Dict[str, Any] = {'plan': plan, 'allowed': True}
+        counted = []
+        for name, (limit, counter) in self._limits(plan, get_quota_settings()).items():
+            if limit is None:
+                continue
+            state = counter.hit(str(user_id), limit, now=now)
+            result[name] = state
+            if not state.allowed:
+                result['allowed'] = False
+                for earlier in counted:
+                    earlier.release(str(user_id), now=now)
+                break
+            counted.append(counter)
+        return result
+    
+    def get_usage(self, user_id: int) -> Dict[str, Any]:
+        """
+        Report a user's plan, limits and current usage without counting a request.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Dictionary with ``plan`` and, per limit, ``limit``, ``window``,
+            ``used``, ``remaining`` and ``reset`` (None limits are unlimited)
+        """
+        plan = self.get_plan(user_id)
+        usage: Dict[str, Any] = {'plan': plan, 'limited': plan is not None}
+        if plan is None:
+            return usage
+        for name, (limit, counter) in self._limits(plan, get_quota_settings()).items():
+            if limit is None:
+                usage[name] = {'limit': None, 'window': counter.window}
+                continue
+            state = counter.peek(str(user_id), limit)
+            usage[name] = {
+                'limit': limit,
+                'window': counter.window,
+                'used': round(state.count, 1),
+                'remaining': state.remaining,
+                'reset': state.reset,
+            }
+        return usage
+
+
+def rate_limit_headers(result: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Build the ``X-RateLimit-*`` headers of a ``consume`` result.
+    
+    Args:
+        result: Return value of ``QuotaService.consume``
+        
+    Returns:
+        Header names and values
+    """
+    headers = {'X-RateLimit-Plan': result['plan']}
+    for name, prefix in (('quota', 'X-RateLimit'), ('burst', 'X-RateLimit-Burst')):
+        state: Optional[WindowState] = result.get(name)
+        if state is None:
+            continue
+        headers[f'{prefix}-Limit'] = str(state.limit)
+        headers[f'{prefix}-Remaining'] = str(state.remaining)
+        headers[f'{prefix}-Reset'] = str(state.reset)
+    return headers
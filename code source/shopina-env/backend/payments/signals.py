@@ -0,0 +1,16 @@
+"""
+Signal receivers for the payments app.
+"""
+from core.container import container
+from payments.services.quota_service import QuotaService
+
+
+def subscription_changed(sender, instance, **kwargs):
+    """``post_save``/``post_delete`` receiver for ``Subscription``: re-resolve the plan."""
+    container.resolve(QuotaService).invalidate_plan(instance.user_id)
+
+
+def user_changed(sender, instance, **kwargs):
+    """``post_save`` receiver for ``User``: role or plan may have changed."""
+    if not kwargs.get('raw'):
+        container.resolve(QuotaService).invalidate_plan(instance.pk)
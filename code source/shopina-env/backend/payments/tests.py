@@ -1,7 +1,13 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import get_user_model
 from orders.models import Order
+from payments.models import Subscription
 from shop.models import Category, Product
 from unittest.mock import patch
 
@@ -25,3 +31,44 @@ class PaymentsTests(APITestCase):
         resp = self.client.post(url, {'order_id': self.order.id}, format='json')
         self.assertEqual(resp.status_code, 200)
         self.assertIn('client_secret', resp.data)
+
+
+@override_settings(API_QUOTAS={'PLANS': {
+    'free': {'QUOTA': 3, 'WINDOW': 3600, 'BURST': 2, 'BURST_WINDOW': 60},
+    'pro': {'QUOTA': 100, 'WINDOW': 3600, 'BURST': 50, 'BURST_WINDOW': 60},
+}})
+class APIQuotaTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.seller = get_user_model().objects.create_user(
+            username='seller', email='seller@example.com', password='pass', role='SELLER',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.seller)}')
+        self.url = reverse('notifications:notification_list')
+
+    def test_burst_limit_rejects_with_headers(self):
+        responses = [self.client.get(self.url) for _ in range(3)]
+        self.assertEqual([r.status_code for r in responses], [200, 200, 429])
+        self.assertEqual(responses[0]['X-RateLimit-Plan'], 'free')
+        self.assertEqual(responses[0]['X-RateLimit-Burst-Remaining'], '1')
+        self.assertEqual(responses[1]['X-RateLimit-Remaining'], '1')
+        self.assertGreaterEqual(int(responses[2]['Retry-After']), 1)
+        # The rejected request was not counted, and the usage endpoint is not either
+        usage = self.client.get(reverse('payments:quota')).data
+        self.assertEqual(usage['quota']['used'], 2)
+        self.assertEqual(usage['burst']['remaining'], 0)
+
+    def test_customers_are_not_limited(self):
+        self.seller.role = 'CUSTOMER'
+        self.seller.save()
+        responses = [self.client.get(self.url) for _ in range(3)]
+        self.assertEqual([r.status_code for r in responses], [200, 200, 200])
+        self.assertNotIn('X-RateLimit-Plan', responses[0])
+
+    def test_subscription_change_invalidates_plan(self):
+        self.assertEqual(self.client.get(self.url)['X-RateLimit-Plan'], 'free')
+        Subscription.objects.create(
+            user=self.seller, plan='pro', status='active',
+            current_period_end=timezone.now() + timedelta(days=30),
+        )
+        self.assertEqual(self.client.get(self.url)['X-RateLimit-Plan'], 'pro')
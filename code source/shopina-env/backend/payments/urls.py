@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import stripe_webhook, CreatePaymentIntentView, SubscriptionCheckoutView
+from .views import stripe_webhook, CreatePaymentIntentView, QuotaUsageView, SubscriptionCheckoutView
 
 app_name = 'payments'
 
@@ -7,4 +7,5 @@ urlpatterns = [
     path('webhook/', stripe_webhook, name='webhook'),
     path('create-intent/', CreatePaymentIntentView.as_view(), name='create-intent'),
     path('subscribe/', SubscriptionCheckoutView.as_view(), name='subscribe'),
+    path('quota/', QuotaUsageView.as_view(), name='quota'),
 ]
@@ -9,8 +9,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from core.container import Inject
 from orders.models import Order
 from .models import Subscription
+from .services.quota_service import QuotaService
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
@@ -118,3 +120,13 @@ class SubscriptionCheckoutView(APIView):
             'price': str(sub.price),
             'current_period_end': sub.current_period_end,
         })
+
+
+class QuotaUsageView(APIView):
+    """API quota of the caller's plan and how much of it is used (not counted itself)."""
+    permission_classes = [IsAuthenticated]
+
+    quota_service = Inject(QuotaService)
+
+    def get(self, request):
+        return Response(self.quota_service.get_usage(request.user.pk), status=status.HTTP_200_OK)
@@ -1,11 +1,14 @@
 """Review admin."""
 from django.contrib import admin
+from core.admin import PerformanceAdminMixin
 from .models import Review
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'product', 'rating', 'is_verified', 'created_at')
+    list_select_related = ('user', 'product')
     list_filter = ('is_verified', 'rating', 'created_at')
     search_fields = ('user__username', 'product__name', 'comment')
     readonly_fields = ('created_at', 'updated_at')
+    autocomplete_fields = ('user', 'product')
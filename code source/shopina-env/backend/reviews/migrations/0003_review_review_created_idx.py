@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 20:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_review_review_product_created_idx'),
+        ('shop', '0002_product_product_rating_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['created_at', 'id'], name='review_created_idx'),
+        ),
+    ]
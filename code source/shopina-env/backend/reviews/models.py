@@ -29,6 +29,11 @@ class Review(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['user', 'product']
+        indexes = [
+            models.Index(fields=['product', 'created_at'], name='review_product_created_idx'),
+            # Admin changelist keyset paging (core.admin.PerformanceAdminMixin)
+            models.Index(fields=['created_at', 'id'], name='review_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.product.name} ({self.rating}★)"
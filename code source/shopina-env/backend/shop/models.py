@@ -24,6 +24,10 @@ class Product(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['rating'], name='product_rating_idx'),
+            models.Index(fields=['created_at', 'stock'], name='product_created_stock_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -2,7 +2,7 @@
 Product repository for data access operations.
 """
 from typing import Optional, List
-from django.db.models import QuerySet, Q, Avg
+from django.db.models import QuerySet, Q, Avg, Count, F
 from core.repositories.base import BaseRepository
 from shop.models import Product, Category
 
@@ -90,20 +90,28 @@ class ProductRepository(BaseRepository[Product]):
         # For now, return top rated. Can add 'featured' field later
         return self.get_top_rated(limit)
     
-    def update_stock(self, product: Product, quantity_change: int) -> Product:
+    def update_stock(self, product: Product, quantity_change: int) -> bool:
         """
-        Update product stock.
+        Atomically change product stock with a single ``UPDATE``.
+        
+        A decrease only applies while enough stock remains, so concurrent
+        checkouts cannot oversell. The in-memory ``stock`` is adjusted by
+        the same amount when the change applies.
         
         Args:
             product: Product instance
             quantity_change: Change in stock (positive or negative)
             
         Returns:
-            Updated product
+            True if the stock was changed, False if it was insufficient
         """
+        condition = {'pk': product.pk}
+        if quantity_change < 0:
+            condition['stock__gte'] = -quantity_change
+        if not self.update_where(condition, stock=F('stock') + quantity_change):
+            return False
         product.stock += quantity_change
-        product.save()
-        return product
+        return True
     
     def update_rating(self, product: Product) -> Product:
         """
@@ -117,14 +125,12 @@ class ProductRepository(BaseRepository[Product]):
         """
         from reviews.models import Review
         
-        avg_rating = Review.objects.filter(product=product).aggregate(
-            avg=Avg('rating')
-        )['avg']
+        summary = Review.objects.filter(product=product).aggregate(
+            avg=Avg('rating'), count=Count('id')
+        )
         
-        if avg_rating:
-            product.rating = round(avg_rating, 1)
-            product.reviews = Review.objects.filter(product=product).count()
-            product.save()
+        if summary['avg']:
+            self.update(product, rating=round(summary['avg'], 1), reviews=summary['count'])
         
         return product
 
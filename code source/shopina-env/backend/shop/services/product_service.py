@@ -177,7 +177,10 @@ class ProductService(BaseService[Product]):
         if product.stock < quantity:
             raise InsufficientStockError(f"Only {product.stock} items available")
         
-        product = self.product_repository.update_stock(product, -quantity)
+        if not self.product_repository.update_stock(product, -quantity):
+            # Another checkout took the stock since it was read
+            product.refresh_from_db(fields=['stock'])
+            raise InsufficientStockError(f"Only {product.stock} items available")
         self.log_operation('stock_decreased', {
             'product_id': product_id,
             'quantity': quantity
@@ -202,7 +205,7 @@ class ProductService(BaseService[Product]):
         if not product:
             raise ResourceNotFoundError("Product not found")
         
-        product = self.product_repository.update_stock(product, quantity)
+        self.product_repository.update_stock(product, quantity)
         self.log_operation('stock_increased', {
             'product_id': product_id,
             'quantity': quantity
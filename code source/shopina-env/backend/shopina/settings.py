@@ -26,6 +26,10 @@ SECRET_KEY = 'django-insecure-+t=1n$4^zq!a-usd)f8y3120ws!1c&h(f^m4egepa-rf7c=+b2
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# Detect testing mode for test-friendly behavior (kept False in production)
+import sys
+TESTING = 'test' in sys.argv
+
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
 
@@ -64,6 +68,8 @@ INSTALLED_APPS = [
     'reviews',
     'notifications',
     'templates',
+    'analytics',
+    'benchmarks',
 ]
 
 SITE_ID = 1
@@ -73,9 +79,14 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    # Plan-tiered API quotas: rejects over-limit callers before any view or query
+    'core.middleware.quota_middleware.APIQuotaMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.database_middleware.DatabaseRoutingMiddleware',
+    'core.middleware.identity_map_middleware.IdentityMapMiddleware',
+    # Django's, resolving the session user on the primary even in replica-read views
+    'core.middleware.authentication_middleware.AuthenticationMiddleware',
     'allauth.account.middleware.AccountMiddleware',  # allauth
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -104,13 +115,46 @@ WSGI_APPLICATION = 'shopina.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite production profile: WAL (readers no longer block on writers), relaxed
+# fsync, memory-mapped I/O, a larger page cache, a busy timeout instead of
+# immediate "database is locked" errors, and persistent connections.
+# Enabled by default when DEBUG is off; override with SQLITE_PRODUCTION_PROFILE.
+SQLITE_TUNING = {
+    'ENABLED': os.environ.get('SQLITE_PRODUCTION_PROFILE', str(not DEBUG)).lower() == 'true',
+    'JOURNAL_MODE': 'WAL',
+    'SYNCHRONOUS': 'NORMAL',
+    'MMAP_SIZE': 256 * 1024 * 1024,
+    'CACHE_SIZE': -64000,
+    'BUSY_TIMEOUT': 5000,
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600 if SQLITE_TUNING['ENABLED'] else 0,
+        'CONN_HEALTH_CHECKS': SQLITE_TUNING['ENABLED'],
+        # Take the write lock when a transaction starts so concurrent writers
+        # wait on busy_timeout instead of failing on lock upgrade
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'} if SQLITE_TUNING['ENABLED'] else {},
     }
 }
 
+# Optional read replica for reporting/list views. Locally this is an SQLite
+# copy refreshed with `python manage.py refresh_replica --interval 30`; any
+# second database configured under this alias works the same way.
+DATABASE_REPLICA_ALIAS = 'replica'
+SQLITE_REPLICA_PATH = os.environ.get('SQLITE_REPLICA_PATH')
+if SQLITE_REPLICA_PATH:
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': SQLITE_REPLICA_PATH,
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.db.routing.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -158,7 +202,8 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Django REST Framework + JWT
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication resolving users through JWT_USER_CACHE
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -169,6 +214,18 @@ REST_FRAMEWORK = {
     ),
     'EXCEPTION_HANDLER': 'core.middleware.error_middleware.custom_exception_handler',
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Token buckets of the login, remember-me, password reset and 2FA endpoints (core.throttling)
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.environ.get('AUTH_THROTTLE_IP_RATE', '30/min'),
+        'auth_identifier': os.environ.get('AUTH_THROTTLE_IDENTIFIER_RATE', '5/min'),
+        # Live username/email checks fire on keystrokes
+        'availability': os.environ.get('AVAILABILITY_THROTTLE_RATE', '120/min'),
+    },
+    # Each rejection in a row doubles the lockout, up to an hour
+    'TOKEN_BUCKET': {
+        'ESCALATION_FACTOR': 2.0,
+        'MAX_LOCKOUT': 3600,
+    },
 }
 
 from datetime import timedelta
@@ -179,6 +236,14 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Users resolved from access tokens are cached per user and version; saves and
+# deletes bump the version (users.signals). Point CACHE_ALIAS at a shared cache
+# to make invalidation immediate across processes.
+JWT_USER_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 30,
+}
+
 # Allauth (Social Authentication)
 AUTHENTICATION_BACKENDS = [
     'users.authentication.EmailUsernamePhoneAuthBackend',  # Custom backend for email/username/phone
@@ -244,9 +309,52 @@ CSRF_COOKIE_SAMESITE = 'Lax'
 CSRF_COOKIE_SECURE = False  # Set True in production over HTTPS
 
 # Session configuration (used for Django views and admin)
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Expiry-only refreshes from SESSION_SAVE_EVERY_REQUEST reach the database at
+# most once per interval. Sessions are also read through the cache when it is
+# shared by all workers (Redis, Memcached); with the per-process LocMemCache
+# they are read from the database, so a logout is seen by every worker
+SESSION_ENGINE = 'core.sessions.cached_db'
+SESSION_CACHE_ALIAS = os.environ.get('SESSION_CACHE_ALIAS', 'default')
 SESSION_COOKIE_AGE = 14 * 24 * 60 * 60  # 14 days
 SESSION_SAVE_EVERY_REQUEST = True
+SESSION_WRITES = {
+    'WRITE_INTERVAL': int(os.environ.get('SESSION_WRITE_INTERVAL', 300)),
+    # Rows per DELETE in `manage.py clearsessions`
+    'CLEANUP_BATCH_SIZE': 1000,
+}
+
+# Per-plan API quotas for sellers (payments.services.quota_service): QUOTA
+# requests per WINDOW and BURST per BURST_WINDOW seconds, None = unlimited.
+# Counters live in the cache, so use a shared cache to enforce them across processes.
+API_QUOTAS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'PLAN_CACHE_SECONDS': 300,
+    'PLANS': {
+        'free': {'QUOTA': 1000, 'WINDOW': 3600, 'BURST': 20, 'BURST_WINDOW': 10},
+        'starter': {'QUOTA': 10000, 'WINDOW': 3600, 'BURST': 50, 'BURST_WINDOW': 10},
+        'pro': {'QUOTA': 50000, 'WINDOW': 3600, 'BURST': 200, 'BURST_WINDOW': 10},
+        'enterprise': {'QUOTA': None, 'WINDOW': 3600, 'BURST': None, 'BURST_WINDOW': 10},
+    },
+}
+
+# Username/email availability checks (users.services.availability): per-process
+# Bloom filters, rebuilt from the database every MAX_AGE seconds
+USER_AVAILABILITY = {
+    'CAPACITY': 100_000,
+    'ERROR_RATE': 0.001,
+    'MAX_AGE': 3600,
+    # Built in a thread started at app load; under tests, inline in the first check
+    'BACKGROUND_BUILD': not TESTING,
+}
+
+# Email one-time codes, stored as keyed HMACs (users.services.otp);
+# run `manage.py purge_two_factor` periodically to delete old ones
+TWO_FACTOR = {
+    'TTL_MINUTES': 10,
+    'MAX_ATTEMPTS': 5,
+    'RETENTION_HOURS': 24,
+}
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
 SESSION_COOKIE_SECURE = False  # Set True in production over HTTPS
@@ -288,11 +396,77 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
-# Detect testing mode for test-friendly behavior (kept False in production)
-import sys
-TESTING = 'test' in sys.argv
-
 # Media files configuration
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+
+# Cache (process-local by default; point at a shared backend in production)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shopina-default',
+    }
+}
+
+# Global counters (core.cache.counters), e.g. users per role. In a cache shared
+# by all workers they are updated by deltas on every save/delete and fully
+# recounted after TIMEOUT seconds at most; in the per-process LocMemCache a
+# write drops the writer's copy and other workers recount after LOCAL_TIMEOUT
+GLOBAL_COUNTERS = {
+    'CACHE_ALIAS': os.environ.get('COUNTERS_CACHE_ALIAS', 'default'),
+    'TIMEOUT': 3600,
+    'LOCAL_TIMEOUT': 30,
+}
+
+# Dashboard aggregates: served from cache, refreshed in the background once stale
+DASHBOARD_CACHE = {
+    'FRESH_SECONDS': int(os.environ.get('DASHBOARD_CACHE_FRESH_SECONDS', 30)),
+    'STALE_SECONDS': int(os.environ.get('DASHBOARD_CACHE_STALE_SECONDS', 600)),
+    # Background threads would race the test transaction; refresh inline under tests
+    'BACKGROUND_REFRESH': not TESTING,
+}
+
+# Runtime slow-query log, ranked by fingerprint at /admin/slow-queries/
+SLOW_QUERY_LOG = {
+    'ENABLED': os.environ.get('SLOW_QUERY_LOG', 'True').lower() == 'true' and not TESTING,
+    'THRESHOLD_MS': int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100)),
+    'PATH': BASE_DIR / 'logs' / 'slow_queries.jsonl',
+    'MAX_BYTES': 5 * 1024 * 1024,
+    'BACKUP_COUNT': 3,
+    # EXPLAIN the first occurrence of each fingerprint per process
+    'CAPTURE_PLANS': True,
+}
+
+# Columnar order-facts snapshot (manage.py export_order_facts) queried by analytics
+ORDER_FACTS = {
+    'PATH': BASE_DIR / 'var' / 'order_facts',
+    'CHUNK_SIZE': 50000,
+    # Statuses of orders this recent are re-read and patched on every export
+    'STATUS_REFRESH_DAYS': 30,
+}
+
+# Audit trail behind BaseService.log_operation: events are queued in memory and
+# written in batches by a background thread ('database' table or rotating 'jsonl')
+AUDIT_TRAIL = {
+    'ENABLED': True,
+    'SINK': os.environ.get('AUDIT_TRAIL_SINK', 'database'),
+    'PATH': BASE_DIR / 'logs' / 'audit.jsonl',
+    'QUEUE_SIZE': 10000,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 1.0,
+    # Backpressure: drop (and count) events rather than slow requests down
+    'OVERFLOW': 'drop',
+    # Write inline under tests so assertions see the rows
+    'BACKGROUND': not TESTING,
+}
+
+# Password hashing (logins, password changes) runs on a bounded process pool
+# instead of the request worker, so a login burst cannot starve other requests.
+# Beyond MAX_CONCURRENT, callers queue for QUEUE_TIMEOUT seconds, then get a 503.
+PASSWORD_HASHING = {
+    'EXECUTOR': 'inline' if TESTING else os.environ.get('PASSWORD_HASHING_EXECUTOR', 'process'),
+    'WORKERS': int(os.environ.get('PASSWORD_HASHING_WORKERS', max(1, (os.cpu_count() or 2) // 2))),
+    'MAX_CONCURRENT': 16,
+    'QUEUE_TIMEOUT': 5.0,
+}
@@ -22,6 +22,7 @@ from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 from django.views.generic.base import RedirectView
 
+from core.views import SlowQueryAdminView
 from .views import DashboardView, CreateOrderView, CreateProductView
 from .views import ClientsListPageView, FrontendIndexView
 from shops.views import MyShopRedirectView
@@ -29,6 +30,8 @@ from orders.views import OrdersListPageView
 
 urlpatterns = [
     path('api/templates/', include('templates.urls')),
+    # Registered before the admin catch-all so the page shares its login and chrome
+    path('admin/slow-queries/', admin.site.admin_view(SlowQueryAdminView.as_view()), name='admin-slow-queries'),
     path('admin/', admin.site.urls),
     # Redirect to frontend (React app on port 3000 in dev, or built files in production)
     path('', FrontendIndexView.as_view(), name='home'),
@@ -70,6 +73,7 @@ urlpatterns = [
     path('api/payments/', include('payments.urls')),
     path('api/reviews/', include('reviews.urls')),
     path('api/notifications/', include('notifications.urls')),
+    path('api/core/', include('core.urls')),
     
     # API Documentation
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -1,5 +1,6 @@
 from datetime import timedelta
 from decimal import Decimal
+from urllib.parse import urlencode
 
 from django.contrib import messages
 from django.contrib.auth import get_user_model
@@ -13,8 +14,13 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic.base import RedirectView
 from django.conf import settings
 
+from analytics.models import CustomerSegment
+from core.cache.stale_while_revalidate import dashboard_cache
+from core.db.routing import ReplicaReadMixin, use_replica
+from core.utils.keyset import decode_cursor, encode_cursor
 from orders.models import Order, OrderItem
 from shop.models import Product
+from users.repositories.user_repository import UserRepository
 
 User = get_user_model()
 
@@ -95,23 +101,28 @@ class CreateProductView(View):
             return redirect('create-product')
 
 
-class DashboardView(View):
+class DashboardView(ReplicaReadMixin, View):
     template_name = "dashboard.html"
+    cache_key = "context"
 
     def get(self, request: HttpRequest) -> HttpResponse:
-        self._ensure_demo_data()
-        context = self._build_context()
+        context = dashboard_cache.get(self.cache_key, self._compute_context)
         return render(request, self.template_name, context)
 
     def post(self, request: HttpRequest) -> HttpResponse:
         action = request.POST.get("action")
         if action == "create_order":
             self._create_order()
+            dashboard_cache.invalidate(self.cache_key)
             messages.success(request, "Commande de démonstration ajoutée avec succès.")
         elif action == "create_product":
             self._create_product()
+            dashboard_cache.invalidate(self.cache_key)
             messages.success(request, "Produit de démonstration ajouté avec succès.")
         elif action == "refresh":
+            dashboard_cache.refresh(self.cache_key, self._compute_context)
+            if request.user.is_authenticated:
+                dashboard_cache.invalidate(f"stats:{request.user.pk}")
             messages.info(request, "Statistiques actualisées.")
         else:
             messages.warning(request, "Action inconnue. Rien n'a été modifié.")
@@ -120,6 +131,13 @@ class DashboardView(View):
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
+    def _compute_context(self) -> dict:
+        """Seed demo data if needed and build the dashboard context (cache miss path)."""
+        with use_replica():
+            # Seeding writes pin the rest of the computation to the primary
+            self._ensure_demo_data()
+            return self._build_context()
+
     def _ensure_demo_data(self) -> None:
         """Idempotent demo data seeding for local testing without breaking prod data."""
         if Order.objects.count() >= 3:
@@ -249,50 +267,39 @@ class DashboardView(View):
         return context
 
 
-class ClientsListPageView(View):
-    """Server-rendered clients list page with simple search and pagination-like slicing."""
+class ClientsListPageView(ReplicaReadMixin, View):
+    """Server-rendered clients list page with trigram search and keyset pagination."""
     template_name = "clients/list.html"
+    page_size = 25
 
     def get(self, request: HttpRequest) -> HttpResponse:
         # Require authentication
         if not request.user.is_authenticated:
-            from django.shortcuts import redirect
             return redirect('login')
-        
+
         q = (request.GET.get("q") or "").strip()
-        
-        # Get all customers or filter by shop ownership if needed
-        users_qs = User.objects.filter(role="CUSTOMER").order_by("-date_joined")
-        
-        if q:
-            # Basic search across username, first_name, last_name, email
-            from django.db.models import Q
-            users_qs = users_qs.filter(
-                Q(username__icontains=q) |
-                Q(first_name__icontains=q) |
-                Q(last_name__icontains=q) |
-                Q(email__icontains=q)
-            )
+        segment = request.GET.get("segment", "")
+        segment_labels = dict(CustomerSegment.SEGMENT_CHOICES)
+        if segment not in segment_labels:
+            segment = ""
+        after = decode_cursor(request.GET.get("after", ""))
+
+        repository = UserRepository()
+        users, has_more = repository.get_clients_page(query=q, after=after, limit=self.page_size, segment=segment)
 
-        # Build client data with avatar and order count
         clients = []
-        for u in users_qs.select_related():
-            # Get orders count
-            orders_count = 0
-            try:
-                if hasattr(u, "buyer_orders"):
-                    orders_count = u.buyer_orders.count()
-            except:
-                pass
-            
+        for u in users:
             # Get avatar URL
             avatar_url = None
             if u.avatar:
                 try:
                     avatar_url = u.avatar.url
-                except:
+                except ValueError:
                     pass
-            
+
+            # Customers without orders have no segment row
+            customer_segment = getattr(u, "customer_segment", None)
+
             clients.append({
                 "id": u.id,
                 "name": (u.get_full_name() or u.username),
@@ -300,17 +307,26 @@ class ClientsListPageView(View):
                 "username": u.username,
                 "plan": u.plan,
                 "joined": u.date_joined,
-                "orders_count": orders_count,
+                "orders_count": u.orders_count,
+                "orders_total": u.orders_total,
+                "last_order_at": u.last_order_at,
+                "segment": customer_segment.get_segment_display() if customer_segment else None,
                 "avatar_url": avatar_url,
                 "phone": getattr(u, "phone_number", None),
             })
 
+        stats = repository.get_client_statistics(q, segment)
+        stats["activity_rate"] = round(stats["active"] * 100 / stats["total"]) if stats["total"] else 0
+
         context = {
             "clients": clients,
             "query": q,
-            "stats": {
-                "total": users_qs.count(),
-                "active": users_qs.filter(is_active=True).count(),
-            },
+            "segment": segment,
+            "segments": CustomerSegment.SEGMENT_CHOICES,
+            # Search filters carried over by the pagination links
+            "filter_query": urlencode({k: v for k, v in (("q", q), ("segment", segment)) if v}),
+            "stats": stats,
+            "is_first_page": after is None,
+            "next_cursor": encode_cursor(users[-1].date_joined, users[-1].pk) if has_more else None,
         }
         return render(request, self.template_name, context)
@@ -4,3 +4,25 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+        from users.signals import user_changed, user_deleted, user_identity_saved, user_saved, user_search_saved
+
+        User = get_user_model()
+        # Profile, password and role changes must not be served from the JWT user cache
+        post_save.connect(user_changed, sender=User, dispatch_uid='users.jwt_user_cache.save')
+        post_delete.connect(user_changed, sender=User, dispatch_uid='users.jwt_user_cache.delete')
+        # Admin and dashboard statistics read cached counters updated on every change
+        post_save.connect(user_saved, sender=User, dispatch_uid='users.counters.save')
+        post_delete.connect(user_deleted, sender=User, dispatch_uid='users.counters.delete')
+        # Taken usernames and emails, for availability checks without a query
+        post_save.connect(user_identity_saved, sender=User, dispatch_uid='users.availability.save')
+        # Trigram search index (deleted with the user by the foreign key cascade)
+        post_save.connect(user_search_saved, sender=User, dispatch_uid='users.search_index.save')
+
+        from users.services.availability import availability_index, get_availability_settings
+        if get_availability_settings()['BACKGROUND_BUILD']:
+            # Ready before the first check instead of built inside it
+            availability_index.start_build()
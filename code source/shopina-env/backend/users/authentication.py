@@ -3,10 +3,28 @@ Custom authentication backend that supports login with:
 - Email
 - Username
 - Phone number
+
+and the JWT authentication class used by the API, which resolves users
+through a short-lived cache instead of one query per request.
 """
+import secrets
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
 from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from core.db.routing import use_primary
+from core.hashing import check_password, make_password
+from core.utils.exceptions import HashingBusyError
 
 User = get_user_model()
 
@@ -14,6 +32,11 @@ User = get_user_model()
 class EmailUsernamePhoneAuthBackend(ModelBackend):
     """
     Authenticate using email, username, or phone number with password.
+    
+    Hashing runs on the shared hashing executor (``core.hashing``) rather
+    than on the request worker. Users are always looked up on the primary.
+    A saturated executor raises ``HashingBusyError`` (503) for API requests
+    and ``PermissionDenied`` for other callers such as the admin login.
     """
     
     def authenticate(self, request, username=None, password=None, **kwargs):
@@ -22,19 +45,26 @@ class EmailUsernamePhoneAuthBackend(ModelBackend):
         
         try:
             # Try to find user by email, username, or phone number
-            user = User.objects.get(
-                Q(email__iexact=username) | 
-                Q(username__iexact=username) | 
-                Q(phone_number=username)
-            )
+            with use_primary():
+                user = User.objects.get(
+                    Q(email__iexact=username) | 
+                    Q(username__iexact=username) | 
+                    Q(phone_number=username)
+                )
             
             # Check password
-            if user.check_password(password):
+            if check_password(user, password):
                 return user
                 
+        except HashingBusyError:
+            # API views turn this into a 503; admin and allauth logins would
+            # return a 500, so fail the attempt for them instead
+            if isinstance(request, Request):
+                raise
+            raise PermissionDenied(HashingBusyError.default_detail)
         except User.DoesNotExist:
             # Run default password hasher to reduce timing difference
-            User().set_password(password)
+            make_password(password)
             return None
         except User.MultipleObjectsReturned:
             # If multiple users found, return None for security
@@ -44,6 +74,116 @@ class EmailUsernamePhoneAuthBackend(ModelBackend):
     
     def get_user(self, user_id):
         try:
-            return User.objects.get(pk=user_id)
+            with use_primary():
+                return User.objects.get(pk=user_id)
         except User.DoesNotExist:
             return None
+
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    # Seconds a resolved user is reused. With a per-process cache, changes made
+    # in another process reach this one within TIMEOUT.
+    'TIMEOUT': 30,
+}
+
+
+def get_jwt_user_cache_settings() -> dict:
+    """
+    Get the JWT user cache settings.
+
+    Returns:
+        Settings ``JWT_USER_CACHE`` merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'JWT_USER_CACHE', {})}
+
+
+def _version_key(user_id) -> str:
+    return f'jwt_user:{user_id}:version'
+
+
+def _bump_user_version(user_id) -> None:
+    config = get_jwt_user_cache_settings()
+    # Outlives every entry cached under the previous version
+    caches[config['CACHE_ALIAS']].set(_version_key(user_id), secrets.token_hex(4), config['TIMEOUT'] * 2)
+
+
+def invalidate_cached_user(user_id) -> None:
+    """
+    Stop serving the cached copy of a user.
+
+    Bumps the user's cache version now and again when the current
+    transaction commits, so a request that re-cached the row in between
+    (still reading the old data) is not served afterwards.
+
+    Args:
+        user_id: Primary key of the user
+    """
+    _bump_user_version(user_id)
+    transaction.on_commit(lambda: _bump_user_version(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication resolving users from a cache keyed by user ID and version.
+
+    Users are cached for ``JWT_USER_CACHE['TIMEOUT']`` seconds; saving or
+    deleting a user (profile, password or role change) bumps its version
+    (see ``users.signals``). The active and revoked-token checks still run
+    on every request.
+
+    Views setting ``token_claims_user = True`` get, on safe methods, a
+    lightweight ``TokenUser`` built from the token claims and no lookup at
+    all. It only carries the claims (``id`` and those added at issuance) and
+    cannot be saved, so only opt in read-only endpoints that filter by
+    ``request.user.pk``.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        view = (getattr(request, 'parser_context', None) or {}).get('view')
+        if request.method in SAFE_METHODS and getattr(view, 'token_claims_user', False):
+            return self.get_token_user(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_token_user(self, validated_token):
+        """Build a stateless user from the token claims."""
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        config = get_jwt_user_cache_settings()
+        cache = caches[config['CACHE_ALIAS']]
+        version = cache.get(_version_key(user_id), '0')
+        key = f'jwt_user:{user_id}:{version}'
+        user = cache.get(key)
+        if user is None:
+            # Loads the row (from the primary: the replica may predate a password change)
+            # and runs the active/revoked checks
+            with use_primary():
+                user = super().get_user(validated_token)
+            cache.set(key, user, config['TIMEOUT'])
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
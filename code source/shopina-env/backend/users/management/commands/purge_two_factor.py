@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.repositories.two_factor_repository import TwoFactorRepository
+from users.services.otp import get_otp_settings
+
+
+class Command(BaseCommand):
+    help = 'Delete two-factor codes that expired more than TWO_FACTOR["RETENTION_HOURS"] ago, in batches'
+
+    def add_arguments(self, parser):
+        otp_settings = get_otp_settings()
+        parser.add_argument('--retention-hours', type=float, default=otp_settings['RETENTION_HOURS'],
+                            help='Keep codes that expired less than this many hours ago')
+        parser.add_argument('--batch-size', type=int, default=otp_settings['PURGE_BATCH_SIZE'],
+                            help='Rows per DELETE')
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(hours=options['retention_hours'])
+        deleted = TwoFactorRepository().purge_expired(before, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired two-factor code(s)'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from users.repositories.user_search_repository import UserSearchRepository
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the trigram user search index (after bulk updates that bypass signals)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users per batch')
+
+    def handle(self, *args, **options):
+        indexed = UserSearchRepository().rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} user(s)'))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from core.utils.trigrams import text_trigrams
+
+
+def index_users(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    UserSearchTrigram = apps.get_model('users', 'UserSearchTrigram')
+    batch = []
+    for pk, *values in User.objects.values_list('pk', 'username', 'email', 'first_name', 'last_name').iterator(chunk_size=1000):
+        batch.extend(UserSearchTrigram(user_id=pk, trigram=gram) for gram in text_trigrams(values))
+        if len(batch) >= 5000:
+            UserSearchTrigram.objects.bulk_create(batch)
+            batch = []
+    UserSearchTrigram.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_user_role_joined_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_trigrams', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('trigram', 'user'), name='user_search_trigram_unique')],
+            },
+        ),
+        migrations.RunPython(index_users, migrations.RunPython.noop),
+    ]
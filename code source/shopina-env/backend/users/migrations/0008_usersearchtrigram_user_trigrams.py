@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 20:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def count_user_trigrams(apps, schema_editor):
+    UserSearchTrigram = apps.get_model('users', 'UserSearchTrigram')
+    totals = (
+        UserSearchTrigram.objects.filter(user_id=OuterRef('user_id'))
+        .order_by().values('user_id').annotate(n=Count('pk')).values('n')
+    )
+    UserSearchTrigram.objects.update(user_trigrams=Subquery(totals))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_usersearchtrigram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersearchtrigram',
+            name='user_trigrams',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(count_user_trigrams, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='usersearchtrigram',
+            index=models.Index(fields=['trigram', 'user_trigrams', 'user'], name='user_search_trigram_rank_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 from datetime import timedelta
 import secrets
@@ -57,6 +58,17 @@ class User(AbstractUser):
 
     REQUIRED_FIELDS = ['email']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pagination of the clients page: role filter, newest first
+            models.Index(fields=['role', '-date_joined', '-id'], name='user_role_joined_idx'),
+            # Case-insensitive prefix search (UserRepository.search_clients)
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(Lower('first_name'), name='user_first_name_lower_idx'),
+            models.Index(Lower('last_name'), name='user_last_name_lower_idx'),
+        ]
+
 
 class TwoFactor(models.Model):
     """Stores OTPs for two-factor authentication (email-based)."""
@@ -102,3 +114,27 @@ class TwoFactor(models.Model):
         self.reset_password_token = None
         self.reset_password_expire = None
         self.save()
+
+
+class UserSearchTrigram(models.Model):
+    """
+    Posting list entry of the user search index: one trigram of the username,
+    email or name of one user (see ``UserSearchRepository``).
+    """
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='search_trigrams')
+    trigram = models.CharField(max_length=3)
+    # Number of trigrams of this user, stored with each posting so ranking never recounts them
+    user_trigrams = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Membership probes: does this user have this trigram
+            models.UniqueConstraint(fields=['trigram', 'user'], name='user_search_trigram_unique'),
+        ]
+        indexes = [
+            # Posting lists in rank order: a search walks one list, best matches first
+            models.Index(fields=['trigram', 'user_trigrams', 'user'], name='user_search_trigram_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"UserSearchTrigram(user_id={self.user_id}, trigram={self.trigram!r})"
@@ -0,0 +1,84 @@
+"""
+Two-factor code repository for data access operations.
+"""
+from datetime import datetime
+from typing import Optional
+from django.db.models import F
+from django.utils import timezone
+from core.repositories.base import BaseRepository
+from users.models import TwoFactor
+
+
+class TwoFactorRepository(BaseRepository[TwoFactor]):
+    """
+    Repository for TwoFactor model data access.
+    """
+    
+    def __init__(self):
+        super().__init__(TwoFactor)
+    
+    def get_active(self, user) -> Optional[TwoFactor]:
+        """
+        Get the most recent unverified, unexpired code of a user.
+        
+        Args:
+            user: User instance
+            
+        Returns:
+            TwoFactor instance or None
+        """
+        return self.model.objects.filter(
+            user=user, verified=False, expires_at__gt=timezone.now(),
+        ).order_by('-created_at').first()
+    
+    def register_attempt(self, two_factor: TwoFactor, max_attempts: int) -> bool:
+        """
+        Atomically count a verification attempt if the limit is not reached.
+        
+        Args:
+            two_factor: TwoFactor instance
+            max_attempts: Attempts allowed per code
+            
+        Returns:
+            True if the attempt may proceed, False once the limit is reached
+        """
+        if not self.update_where({'pk': two_factor.pk, 'attempts__lt': max_attempts}, attempts=F('attempts') + 1):
+            return False
+        two_factor.attempts += 1
+        return True
+    
+    def mark_verified(self, two_factor: TwoFactor) -> bool:
+        """
+        Atomically mark a code as used, so it cannot be accepted twice.
+        
+        Args:
+            two_factor: TwoFactor instance
+            
+        Returns:
+            True if this call consumed the code
+        """
+        if not self.update_where({'pk': two_factor.pk, 'verified': False}, verified=True):
+            return False
+        two_factor.verified = True
+        return True
+    
+    def purge_expired(self, before: datetime, batch_size: int = 1000) -> int:
+        """
+        Delete codes that expired before ``before``, in batches.
+        
+        Args:
+            before: Expiry cutoff
+            batch_size: Rows per DELETE
+            
+        Returns:
+            Number of codes deleted
+        """
+        deleted = 0
+        while True:
+            ids = list(self.model.objects.filter(expires_at__lt=before).values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted += self.model.objects.filter(pk__in=ids).delete()[0]
+            if len(ids) < batch_size:
+                break
+        return deleted
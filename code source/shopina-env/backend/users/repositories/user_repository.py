@@ -1,15 +1,42 @@
 """
 User repository for data access operations.
 """
-from typing import Optional, List
+from datetime import datetime
+from typing import Dict, Optional, List, Tuple
 from django.contrib.auth import get_user_model
-from django.db.models import QuerySet, Count, Q
+from django.db.models import QuerySet, Case, Count, DecimalField, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Lower
+from core.hashing import make_password
 from core.repositories.base import BaseRepository
+from core.utils.trigrams import query_trigrams
+from users.repositories.user_search_repository import UserSearchRepository
 
 
 User = get_user_model()
 
 
+def user_statistics(counts: Dict[str, int]) -> dict:
+    """
+    Shape the counters of ``UserRepository.count_users`` for the admin dashboard.
+    
+    Args:
+        counts: User counters by name
+        
+    Returns:
+        Dictionary with ``total_users``, ``users_by_role`` (roles with users),
+        ``verified_users`` and ``unverified_users``
+    """
+    return {
+        'total_users': counts['total_users'],
+        'users_by_role': {
+            name.split(':', 1)[1]: count
+            for name, count in counts.items() if name.startswith('role:') and count
+        },
+        'verified_users': counts['verified_users'],
+        'unverified_users': counts['unverified_users'],
+    }
+
+
 class UserRepository(BaseRepository[User]):
     """
     Repository for User model data access.
@@ -17,7 +44,32 @@ class UserRepository(BaseRepository[User]):
     
     def __init__(self):
         super().__init__(User)
+        self.search_repository = UserSearchRepository()
     
+    def create_user(self, username: str, email: str, password: Optional[str], **extra_fields) -> User:
+        """
+        Create a user like ``User.objects.create_user``, hashing off the request worker.
+
+        Args:
+            username: Username
+            email: Email address
+            password: Raw password (None for an unusable one)
+            **extra_fields: Other model fields
+
+        Returns:
+            Created user instance
+        """
+        if not username:
+            raise ValueError("The given username must be set")
+        user = self.model(
+            username=self.model.normalize_username(username),
+            email=self.model.objects.normalize_email(email),
+            **extra_fields,
+        )
+        user.password = make_password(password)
+        user.save()
+        return user
+
     def get_by_email(self, email: str) -> Optional[User]:
         """
         Get user by email address.
@@ -75,9 +127,16 @@ class UserRepository(BaseRepository[User]):
         """
         return self.model.objects.filter(role=role)
     
+    # Ranked matches returned by search_users
+    SEARCH_LIMIT = 200
+    
     def search_users(self, query: str) -> QuerySet[User]:
         """
-        Search users by username, email, or name.
+        Search users by username, email, or name, best matches first.
+        
+        Queries of 3 characters or more go through the trigram index (a
+        substring match, ranked by similarity, at most ``SEARCH_LIMIT``
+        users); shorter ones fall back to a prefix search.
         
         Args:
             query: Search query
@@ -85,13 +144,142 @@ class UserRepository(BaseRepository[User]):
         Returns:
             QuerySet of matching users
         """
-        return self.model.objects.filter(
-            Q(username__icontains=query) |
-            Q(email__icontains=query) |
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query)
+        grams = query_trigrams(query)
+        if not grams:
+            return self.search_clients(query.strip())
+        ranked = self.search_repository.rank_user_ids(query, self.SEARCH_LIMIT)
+        if not ranked:
+            return self.model.objects.none()
+        return self.model.objects.filter(pk__in=[pk for pk, _ in ranked]).order_by(
+            Case(*[When(pk=pk, then=Value(position)) for position, (pk, _) in enumerate(ranked)])
         )
     
+    # Searched with prefix ranges on LOWER(column), each backed by an expression index
+    CLIENT_SEARCH_FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+    def search_clients(self, query: str, queryset: Optional[QuerySet[User]] = None) -> QuerySet[User]:
+        """
+        Case-insensitive prefix search that can use the ``LOWER(column)`` indexes.
+
+        Unlike ``icontains`` (a full scan on every request), each field is
+        matched with a range on its lowered value.
+
+        Args:
+            query: Search prefix
+            queryset: Queryset to narrow (defaults to all users)
+
+        Returns:
+            QuerySet of users whose username, email, first or last name starts with the query
+        """
+        queryset = self.model.objects.all() if queryset is None else queryset
+        # SQLite's LOWER() only folds ASCII, so fold the query the same way
+        prefix = ''.join(c.lower() if c.isascii() else c for c in query)
+        condition = Q()
+        for name in self.CLIENT_SEARCH_FIELDS:
+            condition |= Q(**{f'{name}_lower__gte': prefix, f'{name}_lower__lt': prefix + '\U0010ffff'})
+        return queryset.alias(**{f'{name}_lower': Lower(name) for name in self.CLIENT_SEARCH_FIELDS}).filter(condition)
+
+    def get_customers(self, query: str = '', segment: str = '') -> QuerySet[User]:
+        """
+        Get customers, optionally narrowed by search prefix and RFM segment.
+
+        Args:
+            query: Optional search text (substring match, or prefix under 3 characters)
+            segment: Optional segment code (see ``analytics.CustomerSegment``)
+
+        Returns:
+            QuerySet of customers
+        """
+        customers = self.model.objects.filter(role='CUSTOMER')
+        if query:
+            grams = query_trigrams(query)
+            if grams:
+                customers = customers.filter(pk__in=self.search_repository.matching_user_ids(query))
+            else:
+                customers = self.search_clients(query, customers)
+        if segment:
+            customers = customers.filter(customer_segment__segment=segment)
+        return customers
+
+    def get_clients_page(
+        self,
+        query: str = '',
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 25,
+        segment: str = '',
+    ) -> Tuple[List[User], bool]:
+        """
+        Get one page of customers, newest first, with their order aggregates.
+
+        Pages are addressed by the ``(date_joined, id)`` of the previous page's
+        last row (keyset pagination), so deep pages cost the same as the first.
+        Aggregates are computed for the page's rows only, in the same query.
+
+        Args:
+            query: Optional search text
+            after: Sort key of the last row of the previous page
+            limit: Page size
+            segment: Optional RFM segment code
+
+        Returns:
+            Tuple of (users annotated with orders_count, orders_total and
+            last_order_at, whether another page follows)
+        """
+        customers = self.get_customers(query, segment)
+        if after is not None:
+            joined, pk = after
+            # Written as a range plus a residual filter: SQLite cannot seek the index on the OR form
+            customers = customers.filter(date_joined__lte=joined).exclude(date_joined=joined, id__gte=pk)
+        page_ids = customers.order_by('-date_joined', '-id').values('pk')[:limit + 1]
+
+        users = list(
+            self.model.objects.filter(pk__in=page_ids)
+            .select_related('customer_segment')
+            .annotate(
+                orders_count=Count('orders'),
+                orders_total=Coalesce(
+                    Sum('orders__total'),
+                    Value(0, output_field=DecimalField(max_digits=10, decimal_places=2)),
+                ),
+                last_order_at=Max('orders__created_at'),
+            )
+            .order_by('-date_joined', '-id')
+        )
+        return users[:limit], len(users) > limit
+
+    def get_client_statistics(self, query: str = '', segment: str = '') -> dict:
+        """
+        Count customers (total and active) in one query.
+
+        Args:
+            query: Optional search text
+            segment: Optional RFM segment code
+
+        Returns:
+            Dictionary with total and active counts
+        """
+        return self.get_customers(query, segment).aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(is_active=True)),
+        )
+
+    def count_users(self) -> Dict[str, int]:
+        """
+        Count users in total, by verification status and by role, in one query.
+        
+        Returns:
+            Dictionary with ``total_users``, ``verified_users``,
+            ``unverified_users`` and ``role:<ROLE>`` for every role
+        """
+        aggregates = {
+            'total_users': Count('id'),
+            'verified_users': Count('id', filter=Q(is_verified=True)),
+            'unverified_users': Count('id', filter=Q(is_verified=False)),
+        }
+        for role, _ in self.model.ROLE_CHOICES:
+            aggregates[f'role:{role}'] = Count('id', filter=Q(role=role))
+        return self.model.objects.aggregate(**aggregates)
+    
     def get_user_statistics(self) -> dict:
         """
         Get user statistics for admin dashboard.
@@ -99,15 +287,7 @@ class UserRepository(BaseRepository[User]):
         Returns:
             Dictionary with user statistics
         """
-        total_users = self.model.objects.count()
-        users_by_role = self.model.objects.values('role').annotate(count=Count('id'))
-        
-        return {
-            'total_users': total_users,
-            'users_by_role': {item['role']: item['count'] for item in users_by_role},
-            'verified_users': self.model.objects.filter(is_verified=True).count(),
-            'unverified_users': self.model.objects.filter(is_verified=False).count(),
-        }
+        return user_statistics(self.count_users())
     
     def email_exists(self, email: str) -> bool:
         """
@@ -0,0 +1,152 @@
+"""
+User search index repository.
+
+Each user's username, email, first and last name are split into trigrams
+stored in ``UserSearchTrigram`` (the posting lists, indexed by trigram),
+each posting carrying the user's total number of trigrams. A search walks
+the posting list of the query's rarest trigram in that order — the share
+of a user's trigrams the query covers, its similarity, decreases along
+it — keeping users that also have the other trigrams and really contain
+the query, until enough are found. Trigrams shared by most users (``com``,
+``exa``) are thus never read in full unless the query has nothing rarer.
+"""
+from typing import Dict, List, Set, Tuple
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from core.repositories.base import BaseRepository
+from core.utils.trigrams import query_trigrams, text_trigrams
+from users.models import User, UserSearchTrigram
+
+
+class UserSearchRepository(BaseRepository[UserSearchTrigram]):
+    """
+    Repository for the trigram user search index.
+    """
+
+    # Fields indexed for search
+    FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+    # Postings counted per query trigram to find the rarest: enough to tell rare from common
+    FREQUENCY_SAMPLE = 1000
+    FREQUENCY_TIMEOUT = 300
+
+    def __init__(self):
+        super().__init__(UserSearchTrigram)
+
+    def _postings(self, user_id: int, values) -> list:
+        grams = text_trigrams(values)
+        return [self.model(user_id=user_id, trigram=gram, user_trigrams=len(grams)) for gram in grams]
+
+    def index_user(self, user: User, created: bool = False) -> None:
+        """
+        Replace the trigrams of a user with those of its current field values.
+
+        Args:
+            user: User instance
+            created: True for a new user (nothing to replace: a single INSERT)
+        """
+        rows = self._postings(user.pk, (getattr(user, name) for name in self.FIELDS))
+        if created:
+            self.model.objects.bulk_create(rows)
+            return
+        with transaction.atomic():
+            self.model.objects.filter(user_id=user.pk).delete()
+            self.model.objects.bulk_create(rows)
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """
+        Rebuild the whole index, streaming users in batches.
+
+        Args:
+            batch_size: Users per batch
+
+        Returns:
+            Number of users indexed
+        """
+        indexed = 0
+        self.model.objects.all().delete()
+        rows = User.objects.order_by('pk').values_list('pk', *self.FIELDS).iterator(chunk_size=batch_size)
+        batch = []
+        for pk, *values in rows:
+            batch.extend(self._postings(pk, values))
+            indexed += 1
+            if indexed % batch_size == 0:
+                self.model.objects.bulk_create(batch, batch_size=5000)
+                batch = []
+        self.model.objects.bulk_create(batch, batch_size=5000)
+        return indexed
+
+    def trigram_frequencies(self, grams: Set[str]) -> Dict[str, int]:
+        """
+        Posting list lengths, capped at ``FREQUENCY_SAMPLE``, in one query.
+
+        Frequencies are cached for ``FREQUENCY_TIMEOUT`` seconds: they only
+        decide which list a search walks, never its results.
+
+        Args:
+            grams: Trigrams
+
+        Returns:
+            Dictionary of trigram to number of postings
+        """
+        keys = {gram: f'user-search:frequency:{gram.encode().hex()}' for gram in grams}
+        cached = cache.get_many(list(keys.values()))
+        frequencies = {gram: cached[key] for gram, key in keys.items() if key in cached}
+        missing = sorted(set(grams) - set(frequencies))
+        if missing:
+            # Capped counts: a common trigram costs FREQUENCY_SAMPLE index entries, not its whole list
+            connection = connections[self.model.objects.db]
+            table = connection.ops.quote_name(self.model._meta.db_table)
+            sample = f'SELECT %s, COUNT(*) FROM (SELECT 1 FROM {table} WHERE trigram = %s LIMIT %s) AS sample'
+            params = []
+            for gram in missing:
+                params += [gram, gram, self.FREQUENCY_SAMPLE]
+            with connection.cursor() as cursor:
+                cursor.execute(' UNION ALL '.join([sample] * len(missing)), params)
+                counted = dict(cursor.fetchall())
+            cache.set_many({keys[gram]: count for gram, count in counted.items()}, self.FREQUENCY_TIMEOUT)
+            frequencies.update(counted)
+        return frequencies
+
+    def _matches(self, query: str) -> QuerySet:
+        grams = query_trigrams(query)
+        frequencies = self.trigram_frequencies(grams)
+        rarest = min(sorted(grams), key=frequencies.__getitem__)
+        if not frequencies[rarest]:
+            return self.model.objects.none()
+        postings = self.model.objects.filter(trigram=rarest)
+        for gram in grams - {rarest}:
+            postings = postings.filter(Exists(self.model.objects.filter(user_id=OuterRef('user_id'), trigram=gram)))
+        # Having every trigram does not make a substring ('bobo' vs 'bob' + 'obo@'): confirm on the user
+        contains = Q()
+        for name in self.FIELDS:
+            contains |= Q(**{f'user__{name}__icontains': query.strip()})
+        return postings.filter(contains)
+
+    def matching_user_ids(self, query: str) -> QuerySet:
+        """
+        Users whose indexed fields contain the query.
+
+        Args:
+            query: Search text of at least 3 characters
+
+        Returns:
+            ``values`` queryset of ``user_id``, usable as a subquery
+        """
+        return self._matches(query).values('user_id')
+
+    def rank_user_ids(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        """
+        Best matching users, most similar first.
+
+        Args:
+            query: Search text of at least 3 characters
+            limit: Maximum number of users
+
+        Returns:
+            List of (user id, similarity between 0 and 1)
+        """
+        grams = query_trigrams(query)
+        rows = self._matches(query).order_by('user_trigrams', 'user_id').values_list('user_id', 'user_trigrams')
+        return [(user_id, round(len(grams) / total, 4)) for user_id, total in rows[:limit]]
@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
+from users.repositories.user_repository import UserRepository
 
 User = get_user_model()
 
@@ -69,7 +70,8 @@ class RegisterSerializer(serializers.ModelSerializer):
         validated_data.pop('password_confirm')
         password = validated_data.pop('password')
         
-        user = User.objects.create_user(
+        # Hashed on the hashing executor, not on the request worker
+        user = UserRepository().create_user(
             password=password,
             **validated_data
         )
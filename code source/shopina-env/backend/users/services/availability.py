@@ -0,0 +1,189 @@
+"""
+Username and email availability.
+
+Every process keeps a Bloom filter of the normalized usernames and emails
+of all users, built by streaming them from the database in a background
+thread started when the app loads, rebuilt the same way once older than
+``MAX_AGE`` seconds, and extended as users are created or renamed in this
+process. A miss means the value is free without touching the database;
+only a possible hit is confirmed with a query. Until the first build
+completes every check is a query, so no request waits for the build.
+Users created by other processes reach the filter at its next rebuild,
+so a miss is advisory: registration still checks the database.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+
+from core.db.routing import routing_scope
+from core.utils.bloom import BloomFilter
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Filters are sized for max(CAPACITY, 2 * users) keys
+    'CAPACITY': 100_000,
+    'ERROR_RATE': 0.001,
+    'MAX_AGE': 3600,  # seconds before the filters are rebuilt from the database
+    'BATCH_SIZE': 2000,  # rows fetched per round trip while building
+    # Build in a background thread (inline in the first check when off)
+    'BACKGROUND_BUILD': True,
+    'RETRY_DELAY': 60,  # seconds before a failed build is retried
+}
+
+FIELDS = ('username', 'email')
+
+
+def get_availability_settings() -> dict:
+    """
+    Get the availability check settings.
+
+    Returns:
+        Settings ``USER_AVAILABILITY`` merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'USER_AVAILABILITY', {})}
+
+
+def normalize(value: Optional[str]) -> str:
+    """
+    Normalize a username or email the way ``__iexact`` lookups compare them.
+
+    Args:
+        value: Raw value
+
+    Returns:
+        Stripped, lower-cased value
+    """
+    return (value or '').strip().lower()
+
+
+class AvailabilityIndex:
+    """Bloom filters of taken usernames and emails, one per field."""
+
+    def __init__(self):
+        self._filters = None
+        self._built_at = 0.0
+        self._retry_at = 0.0
+        # Held while a build runs, by the building thread
+        self._lock = threading.Lock()
+        # Guards the pending list and the swap to new filters, held only briefly
+        self._pending_lock = threading.Lock()
+        # Values added while a build streams users; replayed into the new filters
+        self._pending = None
+        # Bumped by reset(): filters from a build started before are discarded
+        self._generation = 0
+
+    def _get_filters(self) -> Optional[dict]:
+        filters = self._filters
+        if filters is None or time.monotonic() - self._built_at > get_availability_settings()['MAX_AGE']:
+            self.start_build()
+            filters = self._filters
+        return filters
+
+    def start_build(self) -> None:
+        """
+        Build the filters from the database, unless a build is already running.
+
+        Runs in a background thread (``BACKGROUND_BUILD``); checks keep
+        using the current filters, or the database before the first build.
+        """
+        config = get_availability_settings()
+        if time.monotonic() < self._retry_at or not self._lock.acquire(blocking=False):
+            return
+        if not config['BACKGROUND_BUILD']:
+            try:
+                self._rebuild()
+            finally:
+                self._lock.release()
+            return
+
+        def run():
+            try:
+                # Started from AppConfig.ready(): wait for the app registry before querying
+                while not apps.ready:
+                    time.sleep(0.05)
+                with routing_scope():
+                    self._rebuild()
+            except Exception:
+                self._retry_at = time.monotonic() + config['RETRY_DELAY']
+                logger.exception("Building the availability filters failed")
+            finally:
+                self._lock.release()
+                # Never keep the build thread's connections open
+                connections.close_all()
+
+        threading.Thread(target=run, name='availability-index', daemon=True).start()
+
+    def _rebuild(self) -> None:
+        with self._pending_lock:
+            self._pending = []
+            generation = self._generation
+        try:
+            built = self._build()
+            with self._pending_lock:
+                if generation == self._generation:
+                    for field, value in self._pending:
+                        built[field].add(value)
+                    self._filters, self._built_at = built, time.monotonic()
+        finally:
+            with self._pending_lock:
+                self._pending = None
+
+    def _build(self) -> dict:
+        config = get_availability_settings()
+        users = get_user_model().objects.all()
+        capacity = max(config['CAPACITY'], users.count() * 2)
+        filters = {field: BloomFilter(capacity, config['ERROR_RATE']) for field in FIELDS}
+        for username, email in users.values_list(*FIELDS).iterator(chunk_size=config['BATCH_SIZE']):
+            filters['username'].add(normalize(username))
+            filters['email'].add(normalize(email))
+        return filters
+
+    def add(self, username: Optional[str], email: Optional[str]) -> None:
+        """
+        Record a user's username and email as taken.
+
+        Args:
+            username: Username
+            email: Email address
+        """
+        values = [(field, normalize(value)) for field, value in zip(FIELDS, (username, email)) if value]
+        # Under the lock, so a build cannot replay its pending values and swap in between
+        with self._pending_lock:
+            if self._filters is not None:
+                for field, value in values:
+                    self._filters[field].add(value)
+            if self._pending is not None:
+                self._pending.extend(values)
+
+    def might_exist(self, field: str, value: str) -> bool:
+        """
+        Check whether a value may be taken.
+
+        Args:
+            field: ``'username'`` or ``'email'``
+            value: Value to check
+
+        Returns:
+            False if no user has it, True if one possibly does (always
+            True until the filters are first built)
+        """
+        filters = self._get_filters()
+        return filters is None or normalize(value) in filters[field]
+
+    def reset(self) -> None:
+        """Drop the filters, and those of a running build; the next check rebuilds them."""
+        with self._pending_lock:
+            self._filters = None
+            self._retry_at = 0.0
+            self._generation += 1
+
+
+availability_index = AvailabilityIndex()
@@ -0,0 +1,66 @@
+"""
+One-time codes for email two-factor authentication.
+
+A 6-digit code lives for minutes and is protected by an attempt limit, so
+it does not need a slow password hasher: it is stored as a keyed HMAC
+(SHA-256 over the user id and the code, keyed by ``SECRET_KEY``) and
+checked with a constant-time comparison. Without the key a leaked hash
+cannot be brute-forced offline.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+
+DEFAULTS = {
+    'TTL_MINUTES': 10,
+    'MAX_ATTEMPTS': 5,
+    # Expired codes are kept this long before `purge_two_factor` deletes them
+    'RETENTION_HOURS': 24,
+    'PURGE_BATCH_SIZE': 1000,
+}
+
+PREFIX = 'hmac_sha256$'
+
+
+def get_otp_settings() -> dict:
+    """
+    Get the two-factor code settings.
+
+    Returns:
+        Settings ``TWO_FACTOR`` merged over the defaults
+    """
+    return {**DEFAULTS, **getattr(settings, 'TWO_FACTOR', {})}
+
+
+def hash_otp(user_id: int, otp: str) -> str:
+    """
+    Hash a code for storage.
+
+    Args:
+        user_id: Owner of the code, bound into the hash
+        otp: Plaintext code
+
+    Returns:
+        Prefixed hex digest
+    """
+    digest = salted_hmac('users.two_factor', f'{user_id}:{otp}', algorithm='sha256').hexdigest()
+    return f'{PREFIX}{digest}'
+
+
+def otp_matches(user_id: int, otp: str, stored: str) -> bool:
+    """
+    Check a submitted code against its stored hash in constant time.
+
+    Args:
+        user_id: Owner of the code
+        otp: Submitted code
+        stored: Value of ``TwoFactor.otp_hash``
+
+    Returns:
+        True if the code matches
+    """
+    if not stored.startswith(PREFIX):
+        # Codes issued before the switch were PBKDF2 hashes; they expire within the TTL
+        return check_password(otp, stored)
+    return constant_time_compare(hash_otp(user_id, otp), stored)
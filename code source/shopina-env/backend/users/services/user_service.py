@@ -5,6 +5,9 @@ from typing import Optional, Dict, Any
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
 from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from core.cache.counters import CachedCounters
+from core.hashing import check_password, make_password
 from core.services.base import BaseService
 from core.utils.exceptions import (
     BusinessLogicError, 
@@ -12,11 +15,17 @@ from core.utils.exceptions import (
     ResourceNotFoundError,
     ValidationError
 )
-from users.repositories.user_repository import UserRepository
+from users.repositories.two_factor_repository import TwoFactorRepository
+from users.repositories.user_repository import UserRepository, user_statistics
+from users.services.availability import availability_index
+from users.services.otp import get_otp_settings, hash_otp, otp_matches
 
 
 User = get_user_model()
 
+# Counters of UserRepository.count_users, kept current by users.signals
+user_counters = CachedCounters('users')
+
 
 class UserService(BaseService[User]):
     """
@@ -26,6 +35,7 @@ class UserService(BaseService[User]):
     
     def __init__(self):
         self.repository = UserRepository()
+        self.two_factor_repository = TwoFactorRepository()
         super().__init__(self.repository)
     
     def register_user(self, username: str, email: str, password: str, 
@@ -57,7 +67,7 @@ class UserService(BaseService[User]):
             raise DuplicateResourceError("Username already taken")
         
         # Create user
-        user = User.objects.create_user(
+        user = self.repository.create_user(
             username=username,
             email=email,
             password=password,
@@ -142,8 +152,8 @@ class UserService(BaseService[User]):
         if not user.is_reset_token_valid(token):
             raise ValidationError("Reset token has expired")
         
-        # Set new password
-        user.set_password(new_password)
+        # Set new password (hashed on the hashing executor)
+        user.password = make_password(new_password)
         user.clear_reset_token()
         
         self.log_operation('password_reset', {'user_id': user.id})
@@ -160,12 +170,14 @@ class UserService(BaseService[User]):
             ValidationError: If the old password is incorrect or the new password
                              fails validation or is the same as the old password.
         """
-        # Verify current password using Django's secure check (constant-time)
-        if not user.check_password(old_password):
+        # Verify current password using Django's secure check (constant-time),
+        # on the hashing executor rather than the request worker
+        if not check_password(user, old_password):
             raise ValidationError("Old password is incorrect")
 
-        # Prevent reusing the same password
-        if user.check_password(new_password):
+        # Prevent reusing the same password; the old one was just verified,
+        # so comparing the raw strings spares a second hash
+        if constant_time_compare(new_password, old_password):
             raise ValidationError("New password must be different from the old password")
 
         # Validate the new password using Django validators
@@ -181,11 +193,11 @@ class UserService(BaseService[User]):
 
         # Perform password set inside a transaction to ensure atomicity
         with transaction.atomic():
-            user.set_password(new_password)
             # Record the time of password change
             from django.utils import timezone
-            user.last_password_change = timezone.now()
-            user.save()
+            user = self.repository.update(
+                user, password=make_password(new_password), last_password_change=timezone.now()
+            )
 
         self.log_operation('password_changed', {'user_id': user.id})
         return user
@@ -212,30 +224,25 @@ class UserService(BaseService[User]):
         self.log_operation('role_changed', {'user_id': user.id, 'new_role': new_role})
         return user
 
-    def start_two_factor(self, user: User, ttl_minutes: int = 10) -> str | None:
+    def start_two_factor(self, user: User, ttl_minutes: int | None = None) -> str | None:
         """
         Start an email-based OTP flow for the given user.
 
+        The code is stored as a keyed HMAC (see ``users.services.otp``).
         Returns the plaintext OTP only when settings.DEBUG is True (useful for tests).
         Otherwise returns None.
         """
         import secrets
         from django.utils import timezone
         from datetime import timedelta
-        from django.contrib.auth.hashers import make_password
-        from django.conf import settings
 
+        ttl_minutes = ttl_minutes or get_otp_settings()['TTL_MINUTES']
         # Create 6-digit numeric OTP
         otp = f"{secrets.randbelow(10**6):06d}"
-        expires_at = timezone.now() + timedelta(minutes=ttl_minutes)
-        otp_hash = make_password(otp)
-
-        # Save the OTP record
-        from users.models import TwoFactor
-        TwoFactor.objects.create(
+        self.two_factor_repository.create(
             user=user,
-            otp_hash=otp_hash,
-            expires_at=expires_at
+            otp_hash=hash_otp(user.pk, otp),
+            expires_at=timezone.now() + timedelta(minutes=ttl_minutes),
         )
 
         # Send email (in production use an email template)
@@ -247,7 +254,6 @@ class UserService(BaseService[User]):
             return otp
         else:
             try:
-                from django.core.mail import send_mail
                 send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email], fail_silently=False)
             except Exception as e:
                 # Do not reveal internal errors to caller
@@ -257,45 +263,87 @@ class UserService(BaseService[User]):
     def verify_two_factor(self, user: User, otp: str) -> bool:
         """
         Verify the provided OTP for the user. Raises ValidationError on failure.
-        Uses constant-time hash checking and transaction for atomic update.
-        """
-        from django.utils import timezone
-        from django.db import transaction
-        from django.contrib.auth.hashers import check_password
-        from users.models import TwoFactor
 
-        # Get the most recent unverified OTP for this user
-        tf = TwoFactor.objects.filter(user=user, verified=False, expires_at__gt=timezone.now()).order_by('-created_at').first()
+        The attempt is counted and the code consumed with conditional
+        updates, so concurrent requests can neither exceed the attempt
+        limit nor use the same code twice.
+        """
+        tf = self.two_factor_repository.get_active(user)
         if not tf:
             raise ValidationError("No active verification code found. Please request a new code.")
 
         # Prevent too many attempts
-        if tf.attempts >= 5:
+        if not self.two_factor_repository.register_attempt(tf, get_otp_settings()['MAX_ATTEMPTS']):
             raise ValidationError("Too many verification attempts. Request a new code.")
 
         # Check OTP (constant-time)
-        if not check_password(otp, tf.otp_hash):
-            tf.attempts += 1
-            tf.save(update_fields=['attempts'])
+        if not otp_matches(user.pk, otp, tf.otp_hash):
             raise ValidationError("Invalid verification code")
 
-        # Mark verified atomically
-        with transaction.atomic():
-            tf.verified = True
-            tf.attempts += 1
-            tf.save(update_fields=['verified', 'attempts'])
-            # Optional: record last 2fa time on user
-            from django.utils import timezone
-            user.last_password_change = getattr(user, 'last_password_change', None)
-        return True    
+        if not self.two_factor_repository.mark_verified(tf):
+            raise ValidationError("No active verification code found. Please request a new code.")
+        return True
+
+    def search_users(self, query: str):
+        """
+        Search users by username, email, or name, best matches first.
+        
+        Args:
+            query: Search text
+            
+        Returns:
+            QuerySet of matching users
+        """
+        return self.repository.search_users(query)
+    
+    def check_availability(self, username: Optional[str] = None,
+                           email: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Check whether a username and/or email can still be registered.
+        
+        Values the availability Bloom filter has never seen are reported
+        free without a query; possible hits are confirmed in the database.
+        
+        Args:
+            username: Username to check (optional)
+            email: Email to check (optional)
+            
+        Returns:
+            Per given field, the checked ``value`` and whether it is ``available``
+            
+        Raises:
+            ValidationError: If neither value is given
+        """
+        checks = {'username': (username, self.repository.username_exists),
+                  'email': (email, self.repository.email_exists)}
+        result = {}
+        for field, (value, exists) in checks.items():
+            value = (value or '').strip()
+            if not value:
+                continue
+            taken = availability_index.might_exist(field, value) and exists(value)
+            result[field] = {'value': value, 'available': not taken}
+        if not result:
+            raise ValidationError("Provide a username or an email to check")
+        return result
+    
     def get_user_statistics(self) -> Dict[str, Any]:
         """
-        Get user statistics for admin dashboard.
+        Get user statistics for admin dashboard, from the cached user counters.
         
         Returns:
             Dictionary with user statistics
         """
-        return self.repository.get_user_statistics()
+        return user_statistics(self.count_users())
+    
+    def count_users(self) -> Dict[str, int]:
+        """
+        Get the cached user counters (see ``UserRepository.count_users``).
+        
+        Returns:
+            Counter values by name
+        """
+        return user_counters.get(self.repository.count_users)
     
     def _send_password_reset_email(self, user: User, token: str):
         """
@@ -0,0 +1,63 @@
+"""
+Signal receivers for the users app.
+"""
+from users.authentication import invalidate_cached_user
+from users.repositories.user_search_repository import UserSearchRepository
+from users.services.availability import availability_index
+from users.services.user_service import user_counters
+
+
+# Fields the user counters depend on
+COUNTED_FIELDS = frozenset({'role', 'is_verified'})
+# Fields of the availability index
+IDENTITY_FIELDS = frozenset({'username', 'email'})
+# Fields of the search index
+SEARCH_FIELDS = frozenset(UserSearchRepository.FIELDS)
+
+
+def user_changed(sender, instance, **kwargs):
+    """``post_save``/``post_delete`` receiver dropping the cached JWT user."""
+    if kwargs.get('raw'):
+        return
+    invalidate_cached_user(instance.pk)
+
+
+def _counter_deltas(user, amount: int) -> dict:
+    return {
+        'total_users': amount,
+        'verified_users' if user.is_verified else 'unverified_users': amount,
+        f'role:{user.role}': amount,
+    }
+
+
+def user_saved(sender, instance, created, raw=False, update_fields=None, using=None, **kwargs):
+    """``post_save`` receiver keeping the user counters current."""
+    if raw:
+        return
+    if created:
+        user_counters.add_on_commit(_counter_deltas(instance, 1), using=using)
+    elif update_fields is None or COUNTED_FIELDS & set(update_fields):
+        # The previous role and status are unknown: recount on the next read
+        user_counters.invalidate_on_commit(using=using)
+
+
+def user_deleted(sender, instance, using=None, **kwargs):
+    """``post_delete`` receiver keeping the user counters current."""
+    user_counters.add_on_commit(_counter_deltas(instance, -1), using=using)
+
+
+def user_identity_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """``post_save`` receiver adding new usernames and emails to the availability index."""
+    if raw:
+        return
+    if created or update_fields is None or IDENTITY_FIELDS & set(update_fields):
+        # Old values stay in the filter: possible hits are confirmed in the database
+        availability_index.add(instance.username, instance.email)
+
+
+def user_search_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """``post_save`` receiver re-indexing the searchable fields of a user."""
+    if raw:
+        return
+    if created or update_fields is None or SEARCH_FIELDS & set(update_fields):
+        UserSearchRepository().index_user(instance, created=created)
@@ -2,12 +2,13 @@
 Social authentication endpoints for Google and GitHub
 """
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from allauth.socialaccount.models import SocialAccount
 from django.contrib.auth import get_user_model
+from core.throttling import AuthIdentifierThrottle, AuthIPThrottle
 
 User = get_user_model()
 
@@ -102,6 +103,7 @@ def github_login(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthIdentifierThrottle])
 def remember_me_login(request):
     """
     Extended session login (Remember Me)
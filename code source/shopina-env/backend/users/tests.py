@@ -1,7 +1,36 @@
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import authenticate
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpRequest
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import get_user_model
 
+from core.hashing import make_password
+from core.utils.bloom import BloomFilter
+from core.utils.exceptions import HashingBusyError, ValidationError
+from notifications.models import Notification
+from orders.models import Order
+from users.authentication import CachedJWTAuthentication
+from users.models import TwoFactor
+from users.repositories.user_repository import UserRepository
+from users.repositories.user_search_repository import UserSearchRepository
+from users.services.availability import AvailabilityIndex, availability_index
+from users.services.user_service import UserService, user_counters
+
 
 class UserTests(APITestCase):
     def test_register_and_token(self):
@@ -128,3 +157,316 @@ class UserTests(APITestCase):
         user = User.objects.get(username='twofauser')
         self.assertTrue(user.two_factor_enabled)
 
+
+class ClientsPageTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        now = timezone.now()
+        self.customers = [
+            User.objects.create_user(username=f'client{i}', email=f'client{i}@example.com', password='pass',
+                                     date_joined=now - timedelta(days=i))
+            for i in range(5)
+        ]
+        Order.objects.create(user=self.customers[0], total=10)
+        Order.objects.create(user=self.customers[0], total=15)
+        self.client.force_login(User.objects.create_user(username='owner', email='owner@example.com',
+                                                         password='pass', role='SELLER'))
+
+    def test_keyset_pages_with_annotated_orders(self):
+        repository = UserRepository()
+        first, has_more = repository.get_clients_page(limit=3)
+        self.assertTrue(has_more)
+        self.assertEqual([u.username for u in first], ['client0', 'client1', 'client2'])
+        self.assertEqual((first[0].orders_count, first[0].orders_total), (2, 25))
+
+        last = first[-1]
+        second, has_more = repository.get_clients_page(after=(last.date_joined, last.pk), limit=3)
+        self.assertFalse(has_more)
+        self.assertEqual([u.username for u in second], ['client3', 'client4'])
+        self.assertEqual([u.username for u in repository.get_clients_page('CLIENT4@')[0]], ['client4'])
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'sessions': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                         'LOCATION': os.path.join(tempfile.gettempdir(), 'shopina-test-sessions')},
+        },
+        SESSION_CACHE_ALIAS='sessions',
+    )
+    def test_page_renders_in_constant_queries(self):
+        # user, search trigram frequencies, one page query, one stats query; the session
+        # is read from the shared cache and its expiry-only save is coalesced
+        cache.clear()
+        self.client.force_login(get_user_model().objects.get(username='owner'))
+        with self.assertNumQueries(4):
+            resp = self.client.get(reverse('clients-page'), {'q': 'client'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context['stats'], {'total': 5, 'active': 5, 'activity_rate': 100})
+
+
+class TwoFactorCodeTests(APITestCase):
+    def setUp(self):
+        self.service = UserService()
+        self.user = get_user_model().objects.create_user(username='otp', email='otp@example.com', password='pass')
+
+    def test_code_is_stored_as_hmac_and_single_use(self):
+        otp = self.service.start_two_factor(self.user)
+        self.assertTrue(TwoFactor.objects.get(user=self.user).otp_hash.startswith('hmac_sha256$'))
+
+        with self.assertRaises(ValidationError):
+            self.service.verify_two_factor(self.user, 'nope')
+        self.assertTrue(self.service.verify_two_factor(self.user, otp))
+        with self.assertRaises(ValidationError):
+            self.service.verify_two_factor(self.user, otp)
+
+    def test_attempts_are_limited(self):
+        otp = self.service.start_two_factor(self.user)
+        for _ in range(5):
+            with self.assertRaisesMessage(ValidationError, 'Invalid verification code'):
+                self.service.verify_two_factor(self.user, 'wrong')
+        with self.assertRaisesMessage(ValidationError, 'Too many verification attempts'):
+            self.service.verify_two_factor(self.user, otp)
+
+    def test_purge_deletes_old_codes(self):
+        now = timezone.now()
+        old = TwoFactor.objects.create(user=self.user, otp_hash='x', expires_at=now - timedelta(days=2))
+        recent = TwoFactor.objects.create(user=self.user, otp_hash='x', expires_at=now - timedelta(hours=1))
+        live = TwoFactor.objects.create(user=self.user, otp_hash='x', expires_at=now + timedelta(minutes=5))
+
+        call_command('purge_two_factor', batch_size=1, stdout=StringIO())
+        self.assertEqual(set(TwoFactor.objects.values_list('pk', flat=True)), {recent.pk, live.pk})
+        self.assertFalse(TwoFactor.objects.filter(pk=old.pk).exists())
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='jwt', email='jwt@example.com', password='pass')
+        self.token = AccessToken.for_user(self.user)
+
+    def test_user_is_cached_until_changed(self):
+        auth = CachedJWTAuthentication()
+        self.assertEqual(auth.get_user(self.token).pk, self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(auth.get_user(self.token).role, 'CUSTOMER')
+
+        UserService().change_role(self.user, 'SELLER')
+        self.assertEqual(auth.get_user(self.token).role, 'SELLER')
+
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        with self.assertRaises(AuthenticationFailed):
+            auth.get_user(self.token)
+
+    @override_settings(API_QUOTAS={'ENABLED': False})
+    def test_read_only_view_uses_token_claims(self):
+        Notification.objects.create(user=self.user, type='ORDER', title='Shipped', message='On its way')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        # The notification query only: no user lookup
+        with self.assertNumQueries(1):
+            resp = self.client.get(reverse('notifications:notification_list'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data), 1)
+
+
+class PasswordHashingTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='busy', email='busy@example.com', password='pass')
+
+    def test_busy_executor_fails_non_api_logins_cleanly(self):
+        with patch('users.authentication.check_password', side_effect=HashingBusyError):
+            # Admin and allauth logins: a failed attempt, not a 500
+            self.assertIsNone(authenticate(HttpRequest(), username='busy', password='pass'))
+            # API logins: surfaced as a 503
+            with self.assertRaises(HashingBusyError):
+                authenticate(Request(HttpRequest()), username='busy', password='pass')
+
+    def test_registration_hashes_on_the_executor(self):
+        with patch('users.repositories.user_repository.make_password', wraps=make_password) as hashed:
+            UserService().register_user('newuser', 'new@example.com', 'Str0ng!Passw0rd')
+            resp = self.client.post(reverse('users:register'), {
+                'username': 'other', 'email': 'other@example.com',
+                'password': 'Str0ng!Passw0rd', 'password_confirm': 'Str0ng!Passw0rd',
+            })
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(hashed.call_count, 2)
+        for username in ('newuser', 'other'):
+            self.assertTrue(get_user_model().objects.get(username=username).check_password('Str0ng!Passw0rd'))
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    # Stands in for a cache shared by all workers
+    'counters': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                 'LOCATION': os.path.join(tempfile.gettempdir(), 'shopina-test-counters')},
+})
+class UserStatisticsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        caches['counters'].clear()
+        get_user_model().objects.create_user(username='s1', email='s1@example.com', password='pass', role='SELLER')
+
+    @override_settings(GLOBAL_COUNTERS={'CACHE_ALIAS': 'counters'})
+    def test_counters_follow_changes_without_recounting(self):
+        service = UserService()
+        with self.assertNumQueries(1):
+            stats = service.get_user_statistics()
+        self.assertEqual(stats['total_users'], 1)
+        self.assertEqual(stats['users_by_role'], {'SELLER': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user = get_user_model().objects.create_user(username='c1', email='c1@example.com', password='pass')
+        with self.assertNumQueries(0):
+            stats = service.get_user_statistics()
+        self.assertEqual(stats['total_users'], 2)
+        self.assertEqual(stats['users_by_role'], {'SELLER': 1, 'CUSTOMER': 1})
+        self.assertEqual(stats['unverified_users'], 2)
+
+        # A role change cannot be applied as a delta: recounted on the next read
+        with self.captureOnCommitCallbacks(execute=True):
+            service.change_role(user, 'SELLER')
+        self.assertEqual(service.get_user_statistics()['users_by_role'], {'SELLER': 2})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(service.get_user_statistics()['total_users'], 1)
+
+    def test_per_process_cache_recounts_after_writes(self):
+        service = UserService()
+        self.assertEqual(service.get_user_statistics()['total_users'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            get_user_model().objects.create_user(username='c1', email='c1@example.com', password='pass')
+        # No delta in a LocMemCache: this process recounts, others after LOCAL_TIMEOUT
+        with self.assertNumQueries(1):
+            self.assertEqual(service.get_user_statistics()['total_users'], 2)
+
+    @override_settings(GLOBAL_COUNTERS={'CACHE_ALIAS': 'counters'})
+    def test_recount_racing_a_change_is_not_cached(self):
+        def recount_during_signup():
+            counts = {'total_users': 1}
+            # A signup commits after the count: its add() finds nothing cached
+            user_counters.add({'total_users': 1})
+            return counts
+
+        self.assertEqual(user_counters.get(recount_during_signup), {'total_users': 1})
+        # The stale count was not cached: the next read counts again
+        self.assertEqual(user_counters.get(lambda: {'total_users': 2}), {'total_users': 2})
+
+
+class AvailabilityTests(APITestCase):
+    def setUp(self):
+        availability_index.reset()
+        self.addCleanup(availability_index.reset)
+        get_user_model().objects.create_user(username='Taken', email='taken@example.com', password='pass')
+        self.url = reverse('users:availability')
+
+    def test_misses_skip_the_database_and_hits_are_confirmed(self):
+        # First check builds the filters
+        self.client.get(self.url, {'username': 'warmup'})
+        with self.assertNumQueries(0):
+            resp = self.client.get(self.url, {'username': 'free-name', 'email': 'free@example.com'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.data['username']['available'])
+        self.assertTrue(resp.data['email']['available'])
+
+        resp = self.client.get(self.url, {'username': 'taken ', 'email': 'TAKEN@example.com'})
+        self.assertFalse(resp.data['username']['available'])
+        self.assertFalse(resp.data['email']['available'])
+
+        # Users created after the build are added on save
+        get_user_model().objects.create_user(username='newcomer', email='new@example.com', password='pass')
+        self.assertFalse(self.client.get(self.url, {'username': 'Newcomer'}).data['username']['available'])
+
+    def test_requires_a_value(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+    def test_rebuild_serves_current_filters_and_keeps_concurrent_adds(self):
+        index = AvailabilityIndex()
+        self.assertTrue(index.might_exist('username', 'taken'))
+
+        # Stale while another build runs: answered from the current filters, without waiting
+        index._built_at = 0.0
+        with index._lock, self.assertNumQueries(0):
+            self.assertFalse(index.might_exist('username', 'other'))
+
+        # Added while the build streams users: replayed into the new filters
+        build = index._build
+
+        def build_with_signup():
+            built = build()
+            index.add('latecomer', 'late@example.com')
+            return built
+
+        with patch.object(index, '_build', build_with_signup):
+            self.assertTrue(index.might_exist('username', 'LATECOMER'))
+        self.assertIsNone(index._pending)
+
+    @override_settings(USER_AVAILABILITY={'BACKGROUND_BUILD': True})
+    def test_checks_query_the_database_until_the_background_build_ends(self):
+        index = AvailabilityIndex()
+        release = threading.Event()
+
+        def slow_build():
+            release.wait(5)
+            return {'username': BloomFilter(10), 'email': BloomFilter(10)}
+
+        with patch.object(index, '_build', slow_build):
+            index.start_build()
+            # Not built yet: no waiting, a possible hit to confirm in the database
+            self.assertTrue(index.might_exist('username', 'free-name'))
+            release.set()
+            with index._lock:
+                pass
+        self.assertFalse(index.might_exist('username', 'free-name'))
+
+
+class UserSearchIndexTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', email='alice.martin@example.com', password='pass',
+                                              first_name='Alice', last_name='Martin')
+        self.alicia = User.objects.create_user(username='alicia_long_username', email='al@shop.example.com',
+                                               password='pass')
+        User.objects.create_user(username='bob', email='bob@example.com', password='pass', last_name='Martinez')
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='pass', role='ADMIN')
+        self.client.force_authenticate(admin)
+
+    def test_substring_matches_ranked_by_similarity(self):
+        repository = UserRepository()
+        self.assertEqual([u.username for u in repository.search_users('ALIC')], ['alice', 'alicia_long_username'])
+        self.assertEqual({u.username for u in repository.search_users('artin')}, {'alice', 'bob'})
+        self.assertEqual(list(repository.search_users('zzz')), [])
+        # Every trigram of 'bobo' ('bob' and 'obo'), in different fields: not a substring match
+        get_user_model().objects.create_user(username='bobby', email='obo@x.io', password='pass')
+        self.assertEqual(list(repository.search_users('bobo')), [])
+        self.assertEqual(list(repository.get_customers('bobo')), [])
+
+        # Near misses ranked ahead do not push real matches out of the limit
+        get_user_model().objects.create_user(username='bobo_with_a_much_longer_name', email='b@x.io', password='pass')
+        with patch.object(UserRepository, 'SEARCH_LIMIT', 1):
+            self.assertEqual([u.username for u in repository.search_users('bobo')], ['bobo_with_a_much_longer_name'])
+
+        # Renames are re-indexed on save
+        self.alice.last_name = 'Durand'
+        self.alice.save(update_fields=['last_name'])
+        self.assertEqual([u.username for u in repository.search_users('durand')], ['alice'])
+
+    def test_search_walks_the_rarest_posting_list_in_rank_order(self):
+        cache.clear()
+        repository = UserSearchRepository()
+        # 'exa' is posted by every user here, 'rti' by two
+        self.assertEqual(repository.trigram_frequencies({'exa', 'rti'}), {'exa': 4, 'rti': 2})
+
+        query = repository._matches('martin').order_by('user_trigrams', 'user_id').values('user_id')[:10]
+        sql, params = query.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('user_search_trigram_rank_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_user_list_search(self):
+        resp = self.client.get(reverse('users:user_list'), {'search': 'martinez'})
+        self.assertEqual(resp.status_code, 200)
+        results = resp.data['results'] if isinstance(resp.data, dict) else resp.data
+        self.assertEqual([u['username'] for u in results], ['bob'])
@@ -2,6 +2,7 @@ from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     RegisterView, 
+    AvailabilityView,
     ProfileView, 
     CustomTokenObtainPairView,
     PasswordResetRequestView,
@@ -20,6 +21,7 @@ app_name = 'users'
 urlpatterns = [
     # Authentication
     path('register/', RegisterView.as_view(), name='register'),
+    path('availability/', AvailabilityView.as_view(), name='availability'),
     path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
@@ -4,8 +4,11 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from core.db.routing import ReplicaReadMixin
 from core.permissions.custom_permissions import IsAdmin, IsOwnerOrAdmin
 from core.utils.exceptions import ValidationError as CustomValidationError
+from core.container import Inject
+from core.throttling import AuthIdentifierThrottle, AuthIPThrottle, AvailabilityThrottle
 from users.services.user_service import UserService
 from .serializers import (
     UserSerializer, 
@@ -32,9 +35,7 @@ class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.user_service = UserService()
+    user_service = Inject(UserService)
 
     def create(self, request, *args, **kwargs):
         """Create user and return tokens."""
@@ -52,15 +53,33 @@ class RegisterView(generics.CreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
+class AvailabilityView(APIView):
+    """
+    Check whether a username and/or email is still free, e.g. as the user types.
+
+    Query parameters: ``username``, ``email``.
+    """
+    permission_classes = [permissions.AllowAny]
+    # Bounds enumeration of registered emails
+    throttle_classes = [AvailabilityThrottle]
+
+    user_service = Inject(UserService)
+
+    def get(self, request):
+        result = self.user_service.check_availability(
+            username=request.query_params.get('username'),
+            email=request.query_params.get('email'),
+        )
+        return Response(result, status=status.HTTP_200_OK)
+
+
 class ProfileView(generics.RetrieveUpdateAPIView):
     """
     Get and update current user profile.
     """
     permission_classes = [permissions.IsAuthenticated]
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.user_service = UserService()
+    user_service = Inject(UserService)
 
     def get_serializer_class(self):
         """Return appropriate serializer based on request method."""
@@ -94,10 +113,9 @@ class PasswordResetRequestView(APIView):
     Sends reset token to user's email.
     """
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [AuthIPThrottle, AuthIdentifierThrottle]
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.user_service = UserService()
+    user_service = Inject(UserService)
     
     def post(self, request):
         """Request password reset."""
@@ -124,9 +142,7 @@ class PasswordResetConfirmView(APIView):
     """
     permission_classes = [permissions.AllowAny]
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.user_service = UserService()
+    user_service = Inject(UserService)
     
     def post(self, request):
         """Reset password with token."""
@@ -151,9 +167,7 @@ class TwoFactorStartView(APIView):
     """Start a two-factor flow by sending an OTP to the user's email."""
     permission_classes = [permissions.IsAuthenticated]
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.user_service = UserService()
+    user_service = Inject(UserService)
 
     def post(self, request):
         serializer = TwoFactorStartSerializer(data=request.data)
@@ -176,10 +190,9 @@ class TwoFactorStartView(APIView):
 class TwoFactorVerifyView(APIView):
     """Verify an OTP and mark the session as 2FA-verified."""
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [AuthIPThrottle, AuthIdentifierThrottle]
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.user_service = UserService()
+    user_service = Inject(UserService)
 
     def post(self, request):
         serializer = TwoFactorVerifySerializer(data=request.data)
@@ -198,7 +211,7 @@ class TwoFactorVerifyView(APIView):
             # Optionally enable 2FA on the user's account if requested
             if serializer.validated_data.get('enable'):
                 user.two_factor_enabled = True
-                user.save()
+                user.save(update_fields=['two_factor_enabled'])
 
             return Response({'message': 'OTP verified successfully.'}, status=status.HTTP_200_OK)
         except CustomValidationError as e:
@@ -213,9 +226,7 @@ class ChangePasswordView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated,]
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.user_service = UserService()
+    user_service = Inject(UserService)
     
     def post(self, request):
         """Change user password."""
@@ -244,7 +255,7 @@ class ChangePasswordView(APIView):
             return Response({'error': 'An unexpected error occurred.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class UserListView(generics.ListAPIView):
+class UserListView(ReplicaReadMixin, generics.ListAPIView):
     """
     List all users (admin only).
     """
@@ -252,9 +263,17 @@ class UserListView(generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAdmin]
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.user_service = UserService()
+    user_service = Inject(UserService)
+
+    def get_queryset(self):
+        # ?search=<text> lists the best matches of the trigram index, most similar first
+        search = (self.request.query_params.get('search') or '').strip()
+        queryset = self.user_service.search_users(search) if search else super().get_queryset()
+        # ?segment=<code> restricts the list to one RFM segment
+        segment = self.request.query_params.get('segment')
+        if segment:
+            queryset = queryset.filter(customer_segment__segment=segment)
+        return queryset
 
 
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -265,20 +284,16 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserDetailSerializer
     permission_classes = [IsAdmin]
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.user_service = UserService()
+    user_service = Inject(UserService)
 
 
-class UserStatisticsView(APIView):
+class UserStatisticsView(ReplicaReadMixin, APIView):
     """
     Get user statistics for admin dashboard.
     """
     permission_classes = [IsAdmin]
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.user_service = UserService()
+    user_service = Inject(UserService)
     
     def get(self, request):
         """Get user statistics."""
@@ -291,6 +306,8 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     Custom token obtain view that allows email, username, or phone number login.
     """
     serializer_class = EmailOrUsernameTokenObtainSerializer
+    # Rejected before the serializer runs, so throttled attempts never hash a password
+    throttle_classes = [AuthIPThrottle, AuthIdentifierThrottle]
 
     def post(self, request, *args, **kwargs):
         """Issue JWT tokens and also create a Django session for template views."""
@@ -299,11 +316,12 @@ class CustomTokenObtainPairView(TokenObtainPairView):
 
         # Create Django session so HTML views (admin/Django templates) recognize the user
         try:
-            from django.contrib.auth import login
+            from django.contrib.auth import SESSION_KEY, login
             # DRF wraps the HttpRequest; use underlying request for session operations
             http_request = getattr(request, '_request', request)
             user = getattr(serializer, 'user', None)
-            if user is not None:
+            # Already logged in as this user: skip the key rotation (a session delete + insert)
+            if user is not None and http_request.session.get(SESSION_KEY) != str(user.pk):
                 login(http_request, user)
         except Exception:
             # Do not break JWT issuance if session creation fails